@@ -0,0 +1,86 @@
+"""
+Fit the score weights and grade thresholds to teacher marks
+
+Reads a CSV file with one graded answer per row, with the columns
+rubric_score, semantic_score, nli_score and teacher_mark, plus total_marks
+unless --total-marks is given (component scores as returned by the API).
+Prints the fitted weights and their error against the weights in use; with
+--apply, saves them to SCORE_WEIGHTS_PATH, where running servers and job
+workers pick them up without a restart.
+
+Usage (from the backend directory):
+    python -m app.calibrate scores.csv [--total-marks MARKS] [--apply]
+"""
+from typing import Dict, List, Optional
+import argparse
+import csv
+import json
+import logging
+import sys
+
+from app.config import settings
+from app.services.calibration import ScoreWeightsFile, calibrate
+
+logger = logging.getLogger(__name__)
+
+SCORE_COLUMNS = ("rubric_score", "semantic_score", "nli_score", "teacher_mark")
+
+
+def read_scores(path: str, total_marks: Optional[float] = None) -> Dict[str, List[float]]:
+    """
+    Read component scores and teacher marks from a CSV file
+    
+    Args:
+        path: CSV file with a header row
+        total_marks: Total marks of every answer, instead of a total_marks column
+    
+    Returns:
+        Dict of calibrate() arguments
+    
+    Raises:
+        ValueError: If a column is missing or a value is not a number
+    """
+    with open(path, newline="") as csv_file:
+        reader = csv.DictReader(csv_file)
+        required = SCORE_COLUMNS + (() if total_marks is not None else ("total_marks",))
+        missing = [column for column in required if column not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"{path} has no column {', '.join(missing)}")
+        columns: Dict[str, List[float]] = {column: [] for column in required}
+        for line, row in enumerate(reader, start=2):
+            try:
+                for column in required:
+                    columns[column].append(float(row[column]))
+            except (TypeError, ValueError):
+                raise ValueError(f"{path}, line {line}: expected numbers in {', '.join(required)}")
+    return {
+        "rubric_scores": columns["rubric_score"],
+        "semantic_scores": columns["semantic_score"],
+        "nli_scores": columns["nli_score"],
+        "teacher_marks": columns["teacher_mark"],
+        "total_marks": total_marks if total_marks is not None else columns["total_marks"]
+    }
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Fit the score weights and grade thresholds to teacher marks")
+    parser.add_argument("scores", help="CSV file of component scores and teacher marks")
+    parser.add_argument("--total-marks", type=float, help="Total marks of every answer, instead of a total_marks column")
+    parser.add_argument("--apply", action="store_true", help=f"Save the fitted weights to {settings.score_weights_path}")
+    args = parser.parse_args()
+    
+    weights = ScoreWeightsFile(settings.score_weights_path, settings.score_weights())
+    try:
+        result = calibrate(**read_scores(args.scores, args.total_marks), baseline=weights.aggregator())
+        if args.apply:
+            weights.save(result["weights"])
+            logger.info(f"Saved score weights to {settings.score_weights_path}")
+    except (OSError, ValueError) as e:
+        logger.error(str(e))
+        sys.exit(1)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+from dataclasses import dataclass
+from typing import Dict, Tuple
+import os
+
+from dotenv import load_dotenv
+
+# Load variables from backend/.env (existing environment variables take precedence)
+load_dotenv()
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    """Read a boolean environment variable (1/true/yes/on)"""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Application settings read from the environment / .env file"""
+    host: str = "0.0.0.0"
+    port: int = 8000
+    server_workers: int = 0
+    service_loading: str = "startup"
+    metrics_enabled: bool = True
+    eval_timing_header: bool = False
+    analysis_executor: str = "thread"
+    analysis_workers: int = 4
+    result_cache_backend: str = "memory"
+    result_cache_size: int = 10000
+    result_cache_ttl: float = 3600
+    result_cache_path: str = "evaluation_cache.sqlite3"
+    component_cache_backend: str = "memory"
+    component_cache_size: int = 200000
+    component_cache_path: str = "component_cache.sqlite3"
+    question_store_backend: str = "memory"
+    question_store_path: str = "questions.sqlite3"
+    microbatch_enabled: bool = True
+    microbatch_window_ms: float = 5.0
+    microbatch_max_size: int = 32
+    max_concurrent_evaluations: int = 32
+    admission_queue_size: int = 128
+    request_deadline_ms: float = 0.0
+    degrade_queue_depth: int = 0
+    degraded_skip: Tuple[str, ...] = ("semantic",)
+    job_workers: int = 0
+    job_store_path: str = "jobs.sqlite3"
+    job_chunk_size: int = 32
+    job_queue_limit: int = 100000
+    max_text_chars: int = 20000
+    oversize_policy: str = "reject"
+    stream_batch_size: int = 32
+    stream_queue_size: int = 256
+    gradebook_chunk_rows: int = 1000
+    rubric_stemming: bool = False
+    rubric_synonyms_path: str = ""
+    rubric_loose_phrase_credit: float = 1.0
+    nli_mode: str = "document"
+    semantic_backend: str = "tfidf"
+    semantic_model: str = "sentence-transformers/all-MiniLM-L6-v2"
+    embedding_cache_path: str = "embedding_cache.sqlite3"
+    embedding_batch_size: int = 32
+    semantic_idf: str = "pair"
+    idf_model_dir: str = "idf_models"
+    idf_min_documents: int = 50
+    duplicate_threshold: float = 0.8
+    duplicate_permutations: int = 128
+    score_weights_path: str = "score_weights.json"
+    rubric_weight: float = 0.5
+    semantic_weight: float = 0.3
+    nli_weight: float = 0.2
+    
+    def score_weights(self) -> Dict:
+        """ScoreAggregator weights used until calibrated weights are saved"""
+        return {
+            "rubric_weight": self.rubric_weight,
+            "semantic_weight": self.semantic_weight,
+            "nli_weight": self.nli_weight
+        }
+    
+    @classmethod
+    def from_env(cls) -> "Settings":
+        """Build settings from environment variables, falling back to defaults"""
+        service_loading = os.getenv("SERVICE_LOADING", cls.service_loading).strip().lower()
+        if service_loading not in ("startup", "background", "lazy"):
+            raise ValueError(f"SERVICE_LOADING must be 'startup', 'background' or 'lazy', got '{service_loading}'")
+        
+        executor_type = os.getenv("ANALYSIS_EXECUTOR", cls.analysis_executor).strip().lower()
+        if executor_type not in ("thread", "process"):
+            raise ValueError(f"ANALYSIS_EXECUTOR must be 'thread' or 'process', got '{executor_type}'")
+        
+        cache_backend = os.getenv("RESULT_CACHE_BACKEND", cls.result_cache_backend).strip().lower()
+        if cache_backend not in ("memory", "sqlite", "none"):
+            raise ValueError(f"RESULT_CACHE_BACKEND must be 'memory', 'sqlite' or 'none', got '{cache_backend}'")
+        
+        component_cache_backend = os.getenv("COMPONENT_CACHE_BACKEND", cls.component_cache_backend).strip().lower()
+        if component_cache_backend not in ("memory", "sqlite", "none"):
+            raise ValueError(
+                f"COMPONENT_CACHE_BACKEND must be 'memory', 'sqlite' or 'none', got '{component_cache_backend}'"
+            )
+        
+        question_store = os.getenv("QUESTION_STORE_BACKEND", cls.question_store_backend).strip().lower()
+        if question_store not in ("memory", "sqlite"):
+            raise ValueError(f"QUESTION_STORE_BACKEND must be 'memory' or 'sqlite', got '{question_store}'")
+        
+        oversize_policy = os.getenv("OVERSIZE_POLICY", cls.oversize_policy).strip().lower()
+        if oversize_policy not in ("reject", "truncate"):
+            raise ValueError(f"OVERSIZE_POLICY must be 'reject' or 'truncate', got '{oversize_policy}'")
+        
+        nli_mode = os.getenv("NLI_MODE", cls.nli_mode).strip().lower()
+        if nli_mode not in ("document", "sentence"):
+            raise ValueError(f"NLI_MODE must be 'document' or 'sentence', got '{nli_mode}'")
+        
+        semantic_backend = os.getenv("SEMANTIC_BACKEND", cls.semantic_backend).strip().lower()
+        if semantic_backend not in ("tfidf", "embedding"):
+            raise ValueError(f"SEMANTIC_BACKEND must be 'tfidf' or 'embedding', got '{semantic_backend}'")
+        
+        semantic_idf = os.getenv("SEMANTIC_IDF", cls.semantic_idf).strip().lower()
+        if semantic_idf not in ("pair", "corpus"):
+            raise ValueError(f"SEMANTIC_IDF must be 'pair' or 'corpus', got '{semantic_idf}'")
+        
+        degraded_skip = tuple(
+            name.strip().lower() for name in os.getenv("DEGRADED_SKIP", ",".join(cls.degraded_skip)).split(",")
+            if name.strip()
+        )
+        if not degraded_skip or not set(degraded_skip) <= {"semantic", "nli"}:
+            raise ValueError(f"DEGRADED_SKIP must list 'semantic' and/or 'nli', got '{','.join(degraded_skip)}'")
+        
+        weights = {
+            name: float(os.getenv(name.upper(), getattr(cls, name)))
+            for name in ("rubric_weight", "semantic_weight", "nli_weight")
+        }
+        if min(weights.values()) < 0 or sum(weights.values()) <= 0:
+            raise ValueError(
+                "RUBRIC_WEIGHT, SEMANTIC_WEIGHT and NLI_WEIGHT must not be negative and one must be positive"
+            )
+        
+        return cls(
+            host=os.getenv("HOST", cls.host),
+            port=int(os.getenv("PORT", cls.port)),
+            server_workers=max(0, int(os.getenv("SERVER_WORKERS", cls.server_workers))),
+            service_loading=service_loading,
+            metrics_enabled=_env_flag("METRICS_ENABLED", cls.metrics_enabled),
+            eval_timing_header=_env_flag("EVAL_TIMING_HEADER", cls.eval_timing_header),
+            analysis_executor=executor_type,
+            analysis_workers=max(1, int(os.getenv("ANALYSIS_WORKERS", cls.analysis_workers))),
+            result_cache_backend=cache_backend,
+            result_cache_size=int(os.getenv("RESULT_CACHE_SIZE", cls.result_cache_size)),
+            result_cache_ttl=float(os.getenv("RESULT_CACHE_TTL", cls.result_cache_ttl)),
+            result_cache_path=os.getenv("RESULT_CACHE_PATH", cls.result_cache_path),
+            component_cache_backend=component_cache_backend,
+            component_cache_size=max(1, int(os.getenv("COMPONENT_CACHE_SIZE", cls.component_cache_size))),
+            component_cache_path=os.getenv("COMPONENT_CACHE_PATH", cls.component_cache_path),
+            question_store_backend=question_store,
+            question_store_path=os.getenv("QUESTION_STORE_PATH", cls.question_store_path),
+            microbatch_enabled=_env_flag("MICROBATCH_ENABLED", cls.microbatch_enabled),
+            microbatch_window_ms=max(0.0, float(os.getenv("MICROBATCH_WINDOW_MS", cls.microbatch_window_ms))),
+            microbatch_max_size=max(1, int(os.getenv("MICROBATCH_MAX_SIZE", cls.microbatch_max_size))),
+            max_concurrent_evaluations=max(0, int(
+                os.getenv("MAX_CONCURRENT_EVALUATIONS", cls.max_concurrent_evaluations)
+            )),
+            admission_queue_size=max(0, int(os.getenv("ADMISSION_QUEUE_SIZE", cls.admission_queue_size))),
+            request_deadline_ms=max(0.0, float(os.getenv("REQUEST_DEADLINE_MS", cls.request_deadline_ms))),
+            degrade_queue_depth=max(0, int(os.getenv("DEGRADE_QUEUE_DEPTH", cls.degrade_queue_depth))),
+            degraded_skip=degraded_skip,
+            job_workers=max(0, int(os.getenv("JOB_WORKERS", cls.job_workers))),
+            job_store_path=os.getenv("JOB_STORE_PATH", cls.job_store_path),
+            job_chunk_size=max(1, int(os.getenv("JOB_CHUNK_SIZE", cls.job_chunk_size))),
+            job_queue_limit=max(1, int(os.getenv("JOB_QUEUE_LIMIT", cls.job_queue_limit))),
+            max_text_chars=max(0, int(os.getenv("MAX_TEXT_CHARS", cls.max_text_chars))),
+            oversize_policy=oversize_policy,
+            stream_batch_size=max(1, int(os.getenv("STREAM_BATCH_SIZE", cls.stream_batch_size))),
+            stream_queue_size=max(1, int(os.getenv("STREAM_QUEUE_SIZE", cls.stream_queue_size))),
+            gradebook_chunk_rows=max(1, int(os.getenv("GRADEBOOK_CHUNK_ROWS", cls.gradebook_chunk_rows))),
+            rubric_stemming=_env_flag("RUBRIC_STEMMING", cls.rubric_stemming),
+            rubric_synonyms_path=os.getenv("RUBRIC_SYNONYMS_PATH", cls.rubric_synonyms_path),
+            rubric_loose_phrase_credit=min(1.0, max(0.0, float(
+                os.getenv("RUBRIC_LOOSE_PHRASE_CREDIT", cls.rubric_loose_phrase_credit)
+            ))),
+            nli_mode=nli_mode,
+            semantic_backend=semantic_backend,
+            semantic_model=os.getenv("SEMANTIC_MODEL", cls.semantic_model),
+            embedding_cache_path=os.getenv("EMBEDDING_CACHE_PATH", cls.embedding_cache_path),
+            embedding_batch_size=max(1, int(os.getenv("EMBEDDING_BATCH_SIZE", cls.embedding_batch_size))),
+            semantic_idf=semantic_idf,
+            idf_model_dir=os.getenv("IDF_MODEL_DIR", cls.idf_model_dir),
+            idf_min_documents=max(0, int(os.getenv("IDF_MIN_DOCUMENTS", cls.idf_min_documents))),
+            duplicate_threshold=min(1.0, max(0.0, float(os.getenv("DUPLICATE_THRESHOLD", cls.duplicate_threshold)))),
+            duplicate_permutations=max(16, int(os.getenv("DUPLICATE_PERMUTATIONS", cls.duplicate_permutations))),
+            score_weights_path=os.getenv("SCORE_WEIGHTS_PATH", cls.score_weights_path),
+            **weights
+        )
+
+
+settings = Settings.from_env()
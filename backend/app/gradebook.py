@@ -0,0 +1,147 @@
+"""
+Grade a CSV or Parquet gradebook of answers to one question
+
+Reads the answers in chunks of GRADEBOOK_CHUNK_ROWS rows, scores them with
+locally loaded analyzers and writes one results row per answer: the score
+breakdown, suggested grade and a covered/partial/missing flag per rubric.
+Memory use does not grow with the size of the gradebook. The question file
+is JSON with question, rubrics, correct_answer and total_marks (and
+optionally course), as in the first line of POST /evaluate/stream.
+
+Usage (from the backend directory):
+    python -m app.gradebook answers.csv --question question.json -o results.parquet
+"""
+from typing import List
+import argparse
+import asyncio
+import logging
+import sys
+
+from pydantic import ValidationError
+
+from app.config import settings
+from app.models import EvaluationResponse, StreamQuestionHeader
+from app.services.calibration import ScoreWeightsFile
+from app.services.component_cache import create_component_cache
+from app.services.evaluation_pipeline import EvaluationPipeline, analyzer_factories
+from app.services.gradebook_grader import grade_gradebook, read_chunks
+from app.services.question_store import StoredQuestion
+from app.services.stream_evaluator import StreamEvaluator
+from app.utils.gradebook_files import GradebookWriter, gradebook_format, iter_gradebook
+from app.utils.text_preprocessing import clean_text, limit_text
+
+logger = logging.getLogger(__name__)
+
+
+async def grade_file(
+    answers_path: str,
+    question: StreamQuestionHeader,
+    output_path: str,
+    answer_column: str = "student_answer",
+    id_column: str = "id"
+) -> int:
+    """
+    Grade a gradebook file into a results file
+    
+    Args:
+        answers_path: CSV or Parquet file of answers
+        question: The question every answer belongs to
+        output_path: Results file, CSV or Parquet according to its extension
+        answer_column: Column of the student answers
+        id_column: Column of the student identifiers
+    
+    Returns:
+        Number of answers graded
+    
+    Raises:
+        ValueError: If a file cannot be read or the correct answer is too long
+    """
+    correct_answer = limit_text(question.correct_answer, settings.max_text_chars, settings.oversize_policy == "truncate")
+    if correct_answer is None:
+        raise ValueError(f"Correct answer is longer than {settings.max_text_chars} characters")
+    
+    logger.info("Loading analyzers...")
+    score_weights = ScoreWeightsFile(settings.score_weights_path, settings.score_weights())
+    pipeline = EvaluationPipeline(
+        **{name: factory() for name, factory in analyzer_factories(score_weights.aggregator).items()},
+        component_cache=create_component_cache(
+            backend=settings.component_cache_backend,
+            max_entries=settings.component_cache_size,
+            path=settings.component_cache_path
+        )
+    )
+    artifacts = pipeline.prepare_question(StoredQuestion(
+        id="",
+        question=question.question,
+        rubrics=question.rubrics,
+        correct_answer=clean_text(correct_answer),
+        total_marks=question.total_marks,
+        created_at=0.0,
+        course=question.course
+    ))
+    
+    async def evaluate(student_answers: List[str]) -> List[EvaluationResponse]:
+        return await asyncio.to_thread(
+            pipeline.evaluate_batch,
+            student_answers=student_answers,
+            rubrics=artifacts.compiled_rubric,
+            correct_answer=artifacts.correct_answer,
+            total_marks=question.total_marks,
+            course=question.course
+        )
+    
+    stream_evaluator = StreamEvaluator(
+        evaluate_batch=evaluate,
+        max_batch_size=settings.stream_batch_size,
+        queue_size=settings.stream_queue_size,
+        max_answer_chars=settings.max_text_chars,
+        truncate=settings.oversize_policy == "truncate"
+    )
+    
+    graded = 0
+    with open(answers_path, "rb") as answers_file, open(output_path, "wb") as output_file:
+        chunks = iter_gradebook(
+            answers_file, gradebook_format(answers_path), answer_column, id_column, settings.gradebook_chunk_rows
+        )
+        writer = GradebookWriter(output_file, gradebook_format(output_path), len(question.rubrics))
+        async for rows in grade_gradebook(
+            read_chunks(chunks, asyncio.to_thread),
+            stream_evaluator,
+            writer,
+            question.rubrics,
+            settings.gradebook_chunk_rows
+        ):
+            graded += rows
+            if rows:
+                logger.info(f"Graded {graded} answers")
+    
+    if pipeline.component_cache is not None:
+        pipeline.component_cache.close()
+    return graded
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Grade a CSV or Parquet gradebook of answers to one question")
+    parser.add_argument("answers", help="CSV or Parquet file with one answer per row")
+    parser.add_argument("--question", required=True, help="JSON file with question, rubrics, correct_answer and total_marks")
+    parser.add_argument("-o", "--output", required=True, help="Results file (.csv or .parquet)")
+    parser.add_argument("--answer-column", default="student_answer", help="Column of the student answers")
+    parser.add_argument("--id-column", default="id", help="Column of the student identifiers")
+    args = parser.parse_args()
+    
+    try:
+        with open(args.question) as question_file:
+            question = StreamQuestionHeader.model_validate_json(question_file.read())
+        graded = asyncio.run(grade_file(args.answers, question, args.output, args.answer_column, args.id_column))
+    except ValidationError as e:
+        logger.error(f"Invalid question file: {e}")
+        sys.exit(1)
+    except (OSError, ValueError) as e:
+        logger.error(str(e))
+        sys.exit(1)
+    logger.info(f"Wrote {graded} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
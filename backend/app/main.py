@@ -1,15 +1,65 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
+from starlette.datastructures import UploadFile
+from starlette.requests import ClientDisconnect
 from contextlib import asynccontextmanager
+import asyncio
+import itertools
+import json
 import logging
-from typing import Dict
+import os
+from typing import Any, AsyncIterator, Dict, FrozenSet, List, Optional, Union
 
-from app.models import EvaluationRequest, EvaluationResponse, ScoreBreakdown
-from app.services.rubric_matcher import RubricMatcher
-from app.services.semantic_analyzer import SemanticAnalyzer
-from app.services.nli_analyzer import NLIAnalyzer
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # columnar responses fall back to the standard json encoder
+    orjson = None
+
+from app.models import (
+    EvaluationRequest,
+    EvaluationResponse,
+    ScoreBreakdown,
+    BatchEvaluationRequest,
+    BatchEvaluationResponse,
+    SimilarityFlag,
+    StreamQuestionHeader,
+    QuestionCreateRequest,
+    QuestionResponse,
+    QuestionEvaluationRequest,
+    QuestionBatchEvaluationRequest,
+    JobCreateRequest,
+    JobAnswerResult,
+    JobResponse,
+    ScoreWeights,
+    CalibrationRequest,
+    CalibrationFit,
+    CalibrationResponse
+)
+from app.services.rubric_matcher import CompiledRubric
+from app.services.evaluation_pipeline import EvaluationPipeline, analyzer_factories
+from app.services.admission import AdmissionRejected, create_admission_controller
+from app.services.analysis_executor import AnalysisExecutor
+from app.services.result_cache import create_result_cache, evaluation_cache_key
+from app.services.component_cache import create_component_cache
+from app.services.stream_evaluator import StreamEvaluator, queued_lines
+from app.services.gradebook_grader import grade_gradebook, read_chunks
+from app.services.metrics import Gauge, Histogram, MetricsMiddleware, SharedSnapshots, metrics
+from app.services.micro_batcher import MicroBatcher
+from app.services.service_loader import ServiceLoader
+from app.services.question_store import QuestionArtifacts, StoredQuestion, create_question_registry
+from app.services.job_queue import INVALID_ANSWER_ERROR, JobQueue, JobQueueFullError
+from app.services.duplicate_detector import DuplicateDetector
+from app.services.calibration import ScoreWeightsFile, calibrate
 from app.services.score_aggregator import ScoreAggregator
-from app.utils.text_preprocessing import clean_text
+from app.config import settings
+from app.utils.text_preprocessing import TokenizedText, clean_text, is_valid_answer, limit_text, tokenize
+from app.utils.ndjson import iter_ndjson
+from app.utils.gradebook_files import ChunkSink, GradebookWriter, gradebook_format, iter_gradebook
+from app.utils.process_memory import process_memory
 
 # Configure logging
 logging.basicConfig(
@@ -21,6 +71,109 @@ logger = logging.getLogger(__name__)
 # Global service instances
 services: Dict = {}
 
+# Set by the multi-process server (app.server) before forking the workers:
+# "analyzers" already loaded in the parent, "worker_pids" of all workers and
+# "metrics_dir" where the workers share their metrics
+preforked: Dict = {}
+
+ANALYZER_SERVICES = ("rubric_matcher", "semantic_analyzer", "nli_analyzer", "score_aggregator")
+# Analyzer each skippable analysis needs
+SKIPPABLE_SERVICES = {"semantic": "semantic_analyzer", "nli": "nli_analyzer"}
+
+# Weights in use: the defaults until calibrated weights are saved, then reloaded on change
+score_weights = ScoreWeightsFile(settings.score_weights_path, settings.score_weights())
+
+# Fields of an evaluation, those kept with ?slim=true, and those that need feedback generation
+RESPONSE_FIELDS = tuple(EvaluationResponse.model_fields)
+SLIM_FIELDS = frozenset({"scores", "suggested_grade", "total_marks", "percentage", "skipped_components"})
+DETAIL_FIELDS = frozenset({"feedback", "rubric_analysis"})
+
+GRADEBOOK_MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "parquet": "application/vnd.apache.parquet"}
+
+
+def _cache_stat(key: str) -> float:
+    """Read one statistic of the result cache (0 when caching is off)"""
+    result_cache = services.get("result_cache")
+    return result_cache.stats()[key] if result_cache is not None else 0.0
+
+
+def _admission_stat(key: str) -> float:
+    """Read one statistic of admission control (0 when concurrency is unlimited)"""
+    admission = services.get("admission")
+    return admission.stats()[key] if admission is not None else 0.0
+
+
+metrics.enabled = settings.metrics_enabled
+metrics.add(Gauge("eval_result_cache_hits", "Result cache hits", lambda: _cache_stat("hits")))
+metrics.add(Gauge("eval_result_cache_misses", "Result cache misses", lambda: _cache_stat("misses")))
+metrics.add(Gauge("eval_result_cache_hit_ratio", "Result cache hit ratio", lambda: _cache_stat("hit_ratio")))
+metrics.add(Gauge("eval_result_cache_entries", "Responses held by the result cache", lambda: _cache_stat("entries")))
+metrics.add(Gauge(
+    "eval_executor_pending_tasks", "Analysis calls queued or running on the executor",
+    lambda: services["executor"].pending if "executor" in services else 0
+))
+metrics.add(Gauge("eval_stream_queued_lines", "Lines waiting in streaming evaluation queues", queued_lines))
+metrics.add(Gauge("eval_admission_active", "Evaluation requests being served", lambda: _admission_stat("active")))
+metrics.add(Gauge("eval_admission_queued", "Evaluation requests waiting for a slot", lambda: _admission_stat("queued")))
+metrics.add(Gauge(
+    "eval_admission_rejected", "Evaluation requests turned away with 503", lambda: _admission_stat("rejected")
+))
+metrics.add(Gauge(
+    "eval_admission_degraded", "Evaluation requests served without the DEGRADED_SKIP analyses",
+    lambda: _admission_stat("degraded")
+))
+microbatch_sizes = metrics.add(Histogram(
+    "eval_microbatch_size", "Single-answer evaluations coalesced into one batch",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128)
+))
+metrics.add(Gauge(
+    "eval_job_queued_answers", "Answers waiting in the job queue or being scored",
+    lambda: services["job_queue"].pending() if "job_queue" in services else 0
+))
+metrics.add(Gauge(
+    "eval_models_ready", "Analyzers loaded and ready",
+    lambda: sum(state["status"] == "ready" for state in services["loader"].status().values())
+    if "loader" in services else 0
+))
+
+
+def preload_analyzers() -> Dict[str, Any]:
+    """
+    Load the analyzers in this process so forked workers inherit them
+    
+    Model weights are moved to shared memory where the analyzer supports it.
+    
+    Returns:
+        Loaded analyzers by service name
+    """
+    analyzers = {}
+    for name, factory in analyzer_factories(score_weights.aggregator).items():
+        logger.info(f"Preloading service {name}...")
+        analyzers[name] = factory()
+        if hasattr(analyzers[name], "share_memory"):
+            analyzers[name].share_memory()
+    preforked["analyzers"] = analyzers
+    return analyzers
+
+
+def check_degraded_weights(weights: Dict):
+    """
+    Make sure requests served degraded can still be scored with these weights
+    
+    Args:
+        weights: ScoreAggregator arguments
+    
+    Raises:
+        ValueError: If the DEGRADED_SKIP analyses carry all of the weight
+    """
+    try:
+        ScoreAggregator(**weights).without(settings.degraded_skip)
+    except ValueError:
+        raise ValueError(
+            f"DEGRADED_SKIP ({','.join(settings.degraded_skip)}) would leave degraded requests "
+            f"with no score weight: {weights}"
+        ) from None
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -30,17 +183,80 @@ async def lifespan(app: FastAPI):
     logger.info("Starting application and loading models...")
     
     try:
-        # Initialize all services
-        services["rubric_matcher"] = RubricMatcher()
-        services["semantic_analyzer"] = SemanticAnalyzer()
-        services["nli_analyzer"] = NLIAnalyzer()
-        services["score_aggregator"] = ScoreAggregator(
-            rubric_weight=0.5,
-            semantic_weight=0.3,
-            nli_weight=0.2
-        )
-        logger.info("All models loaded successfully!")
+        # Analyzers load on background threads, in parallel, unless a
+        # multi-process server already loaded them before forking this worker
+        loader = ServiceLoader(
+            factories=analyzer_factories(score_weights.aggregator),
+            services=services,
+            max_workers=len(ANALYZER_SERVICES),
+            preloaded=preforked.get("analyzers")
+        )
+        services["loader"] = loader
+        if preforked.get("metrics_dir") and settings.metrics_enabled:
+            # Every worker's counters and histograms are merged into each scrape
+            services["metrics_snapshots"] = SharedSnapshots(metrics, preforked["metrics_dir"])
+            services["metrics_snapshots"].start()
+        services["executor"] = AnalysisExecutor(
+            analyzers=services,
+            executor_type=settings.analysis_executor,
+            max_workers=settings.analysis_workers
+        )
+        services["result_cache"] = create_result_cache(
+            backend=settings.result_cache_backend,
+            max_entries=settings.result_cache_size,
+            ttl_seconds=settings.result_cache_ttl,
+            path=settings.result_cache_path
+        )
+        services["component_cache"] = create_component_cache(
+            backend=settings.component_cache_backend,
+            max_entries=settings.component_cache_size,
+            path=settings.component_cache_path
+        )
+        services["question_registry"] = create_question_registry(
+            backend=settings.question_store_backend,
+            path=settings.question_store_path
+        )
+        services["duplicate_detector"] = DuplicateDetector(
+            threshold=settings.duplicate_threshold,
+            num_perm=settings.duplicate_permutations
+        )
+        if settings.microbatch_enabled:
+            services["micro_batcher"] = MicroBatcher(
+                max_batch_size=settings.microbatch_max_size,
+                max_window=settings.microbatch_window_ms / 1000,
+                size_histogram=microbatch_sizes if settings.metrics_enabled else None
+            )
+        services["admission"] = create_admission_controller(
+            max_concurrent=settings.max_concurrent_evaluations,
+            max_queue=settings.admission_queue_size,
+            degrade_queue_depth=settings.degrade_queue_depth
+        )
+        if services["admission"] is not None and settings.degrade_queue_depth:
+            # Fails startup, instead of every degraded request, if the skipped analyses carry all the weight
+            check_degraded_weights(score_weights.aggregator().weights())
+        if settings.job_workers > 0:
+            # Under the multi-process server the parent runs the job workers
+            services["job_queue"] = JobQueue(
+                path=settings.job_store_path,
+                workers=0 if preforked else settings.job_workers,
+                chunk_size=settings.job_chunk_size,
+                max_queued=settings.job_queue_limit,
+                score_weights=settings.score_weights(),
+                score_weights_path=settings.score_weights_path
+            )
+            if not preforked:
+                services["job_queue"].start()
         
+        if settings.service_loading == "startup":
+            if not await loader.ensure(ANALYZER_SERVICES):
+                raise RuntimeError(f"Failed to load services: {loader.status()}")
+            logger.info("All models loaded successfully!")
+        elif settings.service_loading == "background":
+            loader.start(ANALYZER_SERVICES)
+            logger.info("Loading models in the background")
+        else:
+            logger.info("Models will be loaded on first use")
+    
     except Exception as e:
         logger.error(f"Error loading models: {e}")
         raise
@@ -49,6 +265,22 @@ async def lifespan(app: FastAPI):
     
     # Cleanup
     logger.info("Shutting down application...")
+    if "loader" in services:
+        services["loader"].shutdown()
+    if "metrics_snapshots" in services:
+        services["metrics_snapshots"].stop()
+    if "executor" in services:
+        services["executor"].shutdown()
+    if "job_queue" in services:
+        services["job_queue"].shutdown()
+    if services.get("result_cache") is not None:
+        services["result_cache"].close()
+    if services.get("component_cache") is not None:
+        services["component_cache"].close()
+    if "question_registry" in services:
+        services["question_registry"].close()
+    if "semantic_analyzer" in services:
+        services["semantic_analyzer"].close()
     services.clear()
 
 
@@ -60,6 +292,12 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+app.add_middleware(
+    MetricsMiddleware,
+    metrics=metrics,
+    timing_header=settings.eval_timing_header
+)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -82,132 +320,1246 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Detailed health check"""
+    """Detailed health check, including the readiness of each analyzer and worker memory"""
+    loader = services.get("loader")
+    result_cache = services.get("result_cache")
+    component_cache = services.get("component_cache")
+    worker_pids = preforked.get("worker_pids")
     return {
         "status": "healthy",
-        "models_loaded": len(services) == 4,
-        "services": list(services.keys())
+        "models_loaded": loader is not None and loader.is_ready(ANALYZER_SERVICES),
+        "models": loader.status() if loader is not None else {},
+        "services": list(services.keys()),
+        "cache": result_cache.stats() if result_cache is not None else None,
+        "component_cache": component_cache.stats() if component_cache is not None else None,
+        "admission": services["admission"].stats() if services.get("admission") is not None else None,
+        "score_weights": score_weights.aggregator().weights(),
+        "worker": {"pid": os.getpid(), "memory": process_memory()},
+        "workers": [
+            {"pid": pid, "memory": process_memory(pid)}
+            for pid in (worker_pids or [])
+            if pid
+        ]
     }
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """
+    Request, stage latency, cache and queue metrics in the Prometheus text format
+    
+    Under the multi-process server, counters and histograms cover all workers;
+    gauges are those of the worker answering.
+    """
+    snapshots = services.get("metrics_snapshots")
+    text = snapshots.render() if snapshots is not None else metrics.render()
+    return PlainTextResponse(text, media_type="text/plain; version=0.0.4")
+
+
+def json_response(model: BaseModel, include: Optional[Any] = None) -> Response:
+    """
+    Serialize a response model, timed as the serialization stage
+    
+    Args:
+        model: Response model
+        include: Fields to serialize, as pydantic's include argument (default: all)
+    """
+    with metrics.stage("serialization"):
+        return Response(content=model.model_dump_json(include=include), media_type="application/json")
+
+
+def response_fields(
+    slim: bool = Query(False, description="Return only scores and grades, skipping feedback generation"),
+    fields: Optional[str] = Query(
+        None,
+        description=f"Comma-separated evaluation fields to return, out of {', '.join(RESPONSE_FIELDS)}"
+    )
+) -> Optional[FrozenSet[str]]:
+    """
+    Evaluation fields selected by the slim and fields query parameters
+    
+    Returns:
+        The selected fields, or None for all of them
+    
+    Raises:
+        HTTPException: 400 for unknown fields
+    """
+    if fields is not None:
+        selected = frozenset(field.strip() for field in fields.split(",") if field.strip())
+        unknown = selected.difference(RESPONSE_FIELDS)
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown response fields {sorted(unknown)}, expected some of {list(RESPONSE_FIELDS)}"
+            )
+        return selected
+    return SLIM_FIELDS if slim else None
+
+
+def loading_analyses() -> FrozenSet[str]:
+    """
+    Analyses whose analyzer is not loaded yet, starting loads that were deferred
+    
+    With SERVICE_LOADING=background or lazy, requests are served without
+    them, like degraded requests, instead of waiting for the slowest model.
+    """
+    loader = services.get("loader")
+    if loader is None or settings.service_loading == "startup":
+        return frozenset()
+    loading = frozenset(
+        analysis for analysis, name in SKIPPABLE_SERVICES.items() if not loader.is_ready([name])
+    )
+    if loading:
+        loader.start(SKIPPABLE_SERVICES[analysis] for analysis in loading)
+    return loading
+
+
+async def admission(request: Request) -> AsyncIterator[FrozenSet[str]]:
+    """
+    Hold an evaluation slot while a request is served (endpoint dependency)
+    
+    The request's deadline is its X-Deadline-Ms header, in milliseconds from
+    arrival, or REQUEST_DEADLINE_MS; past it, a queued request is turned away.
+    
+    Yields:
+        Analyses to skip: DEGRADED_SKIP if the request was admitted from a
+        queue at least DEGRADE_QUEUE_DEPTH deep, and those whose analyzer
+        is still loading (see loading_analyses)
+    
+    Raises:
+        HTTPException: 400 for an invalid X-Deadline-Ms header, 503 with
+            Retry-After if the request cannot be served in time
+    """
+    controller = services.get("admission")
+    if controller is None:
+        yield loading_analyses()
+        return
+    
+    deadline_ms = settings.request_deadline_ms
+    header = request.headers.get("x-deadline-ms")
+    if header is not None:
+        try:
+            deadline_ms = float(header)
+        except ValueError:
+            deadline_ms = 0.0
+        if not deadline_ms > 0:
+            raise HTTPException(
+                status_code=400,
+                detail=f"X-Deadline-Ms must be a positive number of milliseconds, got '{header}'"
+            )
+    deadline = asyncio.get_running_loop().time() + deadline_ms / 1000 if deadline_ms else None
+    
+    try:
+        async with controller.admit(deadline) as degraded:
+            yield (frozenset(settings.degraded_skip) if degraded else frozenset()) | loading_analyses()
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Server overloaded: {e}",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+
+def needs_detail(fields: Optional[FrozenSet[str]]) -> bool:
+    """Whether the selected fields need the feedback text or rubric concept lists"""
+    return fields is None or not fields.isdisjoint(DETAIL_FIELDS)
+
+
+def batch_response(
+    response: BatchEvaluationResponse,
+    fields: Optional[FrozenSet[str]] = None,
+    columnar: bool = False
+) -> Response:
+    """
+    Serialize a batch response, as one object per answer or as one array per field
+    
+    The columnar form is built from plain lists and encoded with orjson,
+    without going through the response models:
+    {"total_answers": 2, "columns": {"final_score": [0.8, 0.4], ...}, "similarity_flags": null}
+    
+    Args:
+        response: Batch evaluation response
+        fields: Evaluation fields to include (default: all)
+        columnar: Return one array per field instead of one object per answer
+    """
+    if not columnar:
+        include = None
+        if fields is not None:
+            include = {"results": {"__all__": set(fields)}, "total_answers": True, "similarity_flags": True}
+        return json_response(response, include)
+    
+    with metrics.stage("serialization"):
+        results = response.results
+        selected = fields if fields is not None else RESPONSE_FIELDS
+        columns = {}
+        for field in RESPONSE_FIELDS:
+            if field not in selected:
+                continue
+            if field == "scores":
+                for score in ScoreBreakdown.model_fields:
+                    columns[score] = [getattr(result.scores, score) for result in results]
+            else:
+                columns[field] = [getattr(result, field) for result in results]
+        content = {
+            "total_answers": response.total_answers,
+            "columns": columns,
+            "similarity_flags": [flag.model_dump() for flag in response.similarity_flags]
+            if response.similarity_flags is not None else None
+        }
+        body = orjson.dumps(content) if orjson is not None else json.dumps(content).encode("utf-8")
+        return Response(content=body, media_type="application/json")
+
+
+def limit_length(text: str, what: str = "Student answer") -> str:
+    """
+    Apply MAX_TEXT_CHARS to a raw text before it is cleaned or analyzed
+    
+    Args:
+        text: Raw text from the request
+        what: Name of the text in the error message
+    
+    Returns:
+        The text, cut at a sentence end if it is too long and OVERSIZE_POLICY is truncate
+    
+    Raises:
+        HTTPException: 413 if the text is too long and OVERSIZE_POLICY is reject
+    """
+    limited = limit_text(text, settings.max_text_chars, settings.oversize_policy == "truncate")
+    if limited is None:
+        raise HTTPException(
+            status_code=413,
+            detail=f"{what} is longer than {settings.max_text_chars} characters"
+        )
+    return limited
+
+
+def limit_lengths(texts: List[str]) -> List[str]:
+    """
+    Apply MAX_TEXT_CHARS to raw student answers, see limit_length
+    
+    Raises:
+        HTTPException: 413 listing the positions of the answers that are too long
+    """
+    limited = [limit_text(text, settings.max_text_chars, settings.oversize_policy == "truncate") for text in texts]
+    rejected = [i for i, text in enumerate(limited) if text is None]
+    if rejected:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Student answers at positions {rejected} are longer than {settings.max_text_chars} characters"
+        )
+    return limited
+
+
+async def get_pipeline(skip: FrozenSet[str] = frozenset()) -> EvaluationPipeline:
+    """
+    Build an evaluation pipeline from the loaded services
+    
+    Waits for the analyzers the request uses that are still loading, and
+    loads deferred ones. Analyzers of skipped analyses are not waited for;
+    they are None in the pipeline until loaded.
+    
+    Args:
+        skip: Analyses the request leaves out
+    
+    Raises:
+        HTTPException: 503 if the services are not initialized or failed to load
+    """
+    skipped = {SKIPPABLE_SERVICES[analysis] for analysis in skip}
+    needed = [name for name in ANALYZER_SERVICES if name not in skipped]
+    loader = services.get("loader")
+    if loader is None or "executor" not in services or not await loader.ensure(needed):
+        raise HTTPException(
+            status_code=503,
+            detail="Services not initialized. Please try again."
+        )
+    
+    # Swapped in place when calibrated weights were saved
+    services["score_aggregator"] = score_weights.aggregator()
+    return EvaluationPipeline(
+        rubric_matcher=services["rubric_matcher"],
+        semantic_analyzer=services.get("semantic_analyzer"),
+        nli_analyzer=services.get("nli_analyzer"),
+        score_aggregator=services["score_aggregator"],
+        component_cache=services.get("component_cache")
+    )
+
+
+async def evaluate_cleaned_answers(
+    pipeline: EvaluationPipeline,
+    student_answers: List[Union[str, TokenizedText]],
+    rubrics: Union[List[str], CompiledRubric],
+    correct_answer: TokenizedText,
+    total_marks: float,
+    cohort_idf: bool = False,
+    course: Optional[str] = None,
+    detail: bool = True,
+    skip: FrozenSet[str] = frozenset()
+) -> List[EvaluationResponse]:
+    """
+    Evaluate validated, cleaned answers to one question, reusing cached results
+    
+    Args:
+        pipeline: Evaluation pipeline
+        student_answers: Cleaned students' responses, optionally already tokenized
+        rubrics: List of key concepts/rubrics, or their compiled form
+        correct_answer: Tokenized cleaned model/correct answer
+        total_marks: Total marks for the question
+        cohort_idf: Weight semantic similarity with IDF fitted over these answers
+        course: Course or question bank the question belongs to
+        detail: Also build the feedback text and rubric concept lists
+        skip: Analyses to leave out under load; such results are not cached
+    
+    Returns:
+        List of EvaluationResponse, one per answer, in input order
+    """
+    # Cohort IDF scores depend on the whole batch, so only per-answer results are cached
+    result_cache = services.get("result_cache") if not cohort_idf else None
+    fingerprint = pipeline.fingerprint() if result_cache is not None else None
+    results = [None] * len(student_answers)
+    cache_keys = []
+    if fingerprint is not None:
+        rubric_list = rubrics.rubrics if isinstance(rubrics, CompiledRubric) else rubrics
+        for i, answer in enumerate(student_answers):
+            cache_key = evaluation_cache_key(
+                student_answer=answer.text if isinstance(answer, TokenizedText) else answer,
+                rubrics=rubric_list,
+                correct_answer=correct_answer.text,
+                total_marks=total_marks,
+                fingerprint=fingerprint,
+                course=course,
+                detail=detail
+            )
+            cache_keys.append(cache_key)
+            results[i] = result_cache.get(cache_key)
+    
+    pending = [i for i, result in enumerate(results) if result is None]
+    if pending:
+        evaluated = await pipeline.evaluate_batch_async(
+            executor=services["executor"],
+            student_answers=[student_answers[i] for i in pending],
+            rubrics=rubrics,
+            correct_answer=correct_answer,
+            total_marks=total_marks,
+            cohort_idf=cohort_idf,
+            course=course,
+            detail=detail,
+            skip=skip
+        )
+        for i, response in zip(pending, evaluated):
+            results[i] = response
+            if result_cache is not None and not skip:
+                result_cache.set(cache_keys[i], response)
+    
+    return results
+
+
+async def find_duplicates(
+    student_answers: List[Union[str, TokenizedText]],
+    correct_answer: Union[str, TokenizedText],
+    positions: Optional[List[int]] = None
+) -> List[SimilarityFlag]:
+    """
+    Group near-duplicate answers of a cohort and answers copying the correct answer
+    
+    Args:
+        student_answers: Cleaned students' responses, optionally already tokenized
+        correct_answer: Cleaned model/correct answer
+        positions: Position reported for each answer (default: its index)
+    
+    Returns:
+        List of SimilarityFlag, one per group
+    """
+    flags = await metrics.timed("duplicates", services["executor"].run(
+        services["duplicate_detector"].find_duplicates, student_answers, correct_answer, positions
+    ))
+    return [SimilarityFlag(**flag) for flag in flags]
+
+
+async def evaluate_cohort(
+    pipeline: EvaluationPipeline,
+    student_answers: List[str],
+    rubrics: Union[List[str], CompiledRubric],
+    correct_answer: TokenizedText,
+    total_marks: float,
+    cohort_idf: bool = False,
+    course: Optional[str] = None,
+    detect_duplicates: bool = False,
+    detail: bool = True,
+    skip: FrozenSet[str] = frozenset()
+) -> BatchEvaluationResponse:
+    """
+    Evaluate validated, cleaned answers to one question as a batch response
+    
+    With detect_duplicates, answers are tokenized once and near-duplicates
+    are searched concurrently with scoring.
+    
+    Args:
+        pipeline: Evaluation pipeline
+        student_answers: Cleaned students' responses
+        rubrics: List of key concepts/rubrics, or their compiled form
+        correct_answer: Tokenized cleaned model/correct answer
+        total_marks: Total marks for the question
+        cohort_idf: Weight semantic similarity with IDF fitted over these answers
+        course: Course or question bank the question belongs to
+        detect_duplicates: Also report groups of near-duplicate answers
+        detail: Also build the feedback text and rubric concept lists
+        skip: Analyses to leave out under load
+    
+    Returns:
+        BatchEvaluationResponse with one evaluation per answer
+    """
+    if detect_duplicates:
+        student_answers = await metrics.timed("tokenize", services["executor"].run(
+            lambda: [tokenize(answer) for answer in student_answers]
+        ))
+    
+    evaluation = evaluate_cleaned_answers(
+        pipeline=pipeline,
+        student_answers=student_answers,
+        rubrics=rubrics,
+        correct_answer=correct_answer,
+        total_marks=total_marks,
+        cohort_idf=cohort_idf,
+        course=course,
+        detail=detail,
+        skip=skip
+    )
+    if detect_duplicates:
+        results, similarity_flags = await asyncio.gather(evaluation, find_duplicates(student_answers, correct_answer))
+    else:
+        results, similarity_flags = await evaluation, None
+    return BatchEvaluationResponse(results=results, total_answers=len(results), similarity_flags=similarity_flags)
+
+
 @app.post("/evaluate", response_model=EvaluationResponse)
-async def evaluate_answer(request: EvaluationRequest):
+async def evaluate_answer(
+    request: EvaluationRequest,
+    fields: Optional[FrozenSet[str]] = Depends(response_fields),
+    skip: FrozenSet[str] = Depends(admission)
+):
     """
     Evaluate a student's answer against rubrics and correct answer
     
     Args:
         request: EvaluationRequest containing question, rubrics, answers, etc.
-        
+        fields: Evaluation fields to return (?slim=true or ?fields=...)
+        skip: Analyses skipped because the server is overloaded or their analyzer is still loading
+    
     Returns:
         EvaluationResponse with scores and feedback
     """
     try:
         logger.info("Received evaluation request")
         
-        # Clean inputs
-        student_answer = clean_text(request.student_answer)
-        correct_answer = clean_text(request.correct_answer)
+        # Enforce length limits before any processing, then clean inputs
+        student_answer = limit_length(request.student_answer)
+        correct_answer = limit_length(request.correct_answer, "Correct answer")
+        with metrics.stage("clean_text"):
+            student_answer = clean_text(student_answer)
+            correct_answer = clean_text(correct_answer)
         
         # Validate inputs
-        if not student_answer or len(student_answer) < 10:
+        if not is_valid_answer(student_answer):
             raise HTTPException(
                 status_code=400,
                 detail="Student answer is too short or empty"
             )
         
-        # Get services
-        rubric_matcher = services.get("rubric_matcher")
-        semantic_analyzer = services.get("semantic_analyzer")
-        nli_analyzer = services.get("nli_analyzer")
-        score_aggregator = services.get("score_aggregator")
+        pipeline = await get_pipeline(skip)
+        detail = needs_detail(fields)
         
-        if not all([rubric_matcher, semantic_analyzer, nli_analyzer, score_aggregator]):
-            raise HTTPException(
-                status_code=503,
-                detail="Services not initialized. Please try again."
+        # Identical inputs under the same weights/analyzer versions give identical results
+        result_cache = services.get("result_cache")
+        fingerprint = pipeline.fingerprint() if result_cache is not None else None
+        if fingerprint is not None:
+            cache_key = evaluation_cache_key(
+                student_answer=student_answer,
+                rubrics=request.rubrics,
+                correct_answer=correct_answer,
+                total_marks=request.total_marks,
+                fingerprint=fingerprint,
+                course=request.course,
+                detail=detail
             )
+            cached = result_cache.get(cache_key)
+            if cached is not None:
+                logger.info("Returning cached evaluation")
+                return json_response(cached, fields)
         
-        # 1. Rubric Analysis
-        logger.info("Performing rubric analysis...")
-        rubric_analysis = rubric_matcher.analyze_rubric_coverage(
-            student_answer=student_answer,
-            rubrics=request.rubrics,
-            correct_answer=correct_answer
-        )
-        rubric_score = rubric_analysis["score"]
-        rubric_feedback = rubric_matcher.get_detailed_feedback(rubric_analysis)
+        micro_batcher = services.get("micro_batcher")
+        if micro_batcher is not None:
+            # Concurrent requests for the same question are scored as one batch
+            response = await micro_batcher.submit(
+                key=(correct_answer, tuple(request.rubrics), request.total_marks, request.course, detail, skip),
+                item=student_answer,
+                evaluate_batch=lambda answers: pipeline.evaluate_batch_async(
+                    executor=services["executor"],
+                    student_answers=answers,
+                    rubrics=request.rubrics,
+                    correct_answer=correct_answer,
+                    total_marks=request.total_marks,
+                    course=request.course,
+                    detail=detail,
+                    skip=skip
+                )
+            )
+        else:
+            response = await pipeline.evaluate_async(
+                executor=services["executor"],
+                student_answer=student_answer,
+                rubrics=request.rubrics,
+                correct_answer=correct_answer,
+                total_marks=request.total_marks,
+                course=request.course,
+                detail=detail,
+                skip=skip
+            )
         
-        # 2. Semantic Similarity Analysis
-        logger.info("Calculating semantic similarity...")
-        semantic_score = semantic_analyzer.calculate_similarity(
-            student_answer=student_answer,
-            correct_answer=correct_answer
+        if result_cache is not None and not skip:
+            result_cache.set(cache_key, response)
+        
+        logger.info(f"Evaluation complete. Final score: {response.scores.final_score:.3f}")
+        return json_response(response, fields)
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error during evaluation: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Internal server error during evaluation: {str(e)}"
         )
-        semantic_feedback = semantic_analyzer.get_similarity_feedback(semantic_score)
+
+
+@app.post("/evaluate/batch", response_model=BatchEvaluationResponse)
+async def evaluate_batch(
+    request: BatchEvaluationRequest,
+    fields: Optional[FrozenSet[str]] = Depends(response_fields),
+    skip: FrozenSet[str] = Depends(admission),
+    output_format: str = Query(
+        "rows", alias="format", pattern="^(rows|columnar)$", description="rows, or columnar for one array per field"
+    )
+):
+    """
+    Evaluate many students' answers to the same question in one call
+    
+    The correct answer and rubrics are processed once for the whole batch.
+    
+    Args:
+        request: BatchEvaluationRequest containing the question and all answers
+        fields: Evaluation fields to return (?slim=true or ?fields=...)
+        skip: Analyses skipped because the server is overloaded or their analyzer is still loading
+        output_format: "rows" for one object per answer, "columnar" for one array per field
+    
+    Returns:
+        BatchEvaluationResponse with one evaluation per answer
+    """
+    try:
+        logger.info(f"Received batch evaluation request ({len(request.student_answers)} answers)")
         
-        # 3. NLI Analysis (Contradiction Detection)
-        logger.info("Performing NLI analysis...")
-        nli_analysis = nli_analyzer.analyze_entailment(
-            student_answer=student_answer,
-            correct_answer=correct_answer
-        )
-        nli_score = nli_analysis["score"]
-        nli_feedback = nli_analyzer.get_entailment_feedback(nli_analysis)
+        # Enforce length limits before any processing, then clean inputs (correct answer only once)
+        correct_answer = limit_length(request.correct_answer, "Correct answer")
+        student_answers = limit_lengths(request.student_answers)
+        with metrics.stage("clean_text"):
+            correct_answer = clean_text(correct_answer)
+            student_answers = [clean_text(answer) for answer in student_answers]
         
-        # 4. Aggregate Scores
-        logger.info("Aggregating scores...")
-        final_score = score_aggregator.aggregate_scores(
-            rubric_score=rubric_score,
-            semantic_score=semantic_score,
-            nli_score=nli_score
+        # Validate inputs
+        invalid = [i for i, answer in enumerate(student_answers) if not is_valid_answer(answer)]
+        if invalid:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Student answers at positions {invalid} are too short or empty"
+            )
+        
+        pipeline = await get_pipeline(skip)
+        response = await evaluate_cohort(
+            pipeline=pipeline,
+            student_answers=student_answers,
+            rubrics=request.rubrics,
+            correct_answer=await services["executor"].run(tokenize, correct_answer),
+            total_marks=request.total_marks,
+            cohort_idf=request.cohort_idf,
+            course=request.course,
+            detect_duplicates=request.detect_duplicates,
+            detail=needs_detail(fields),
+            skip=skip
         )
         
-        # 5. Generate Comprehensive Feedback
-        comprehensive_feedback = score_aggregator.generate_comprehensive_feedback(
-            rubric_feedback=rubric_feedback,
-            semantic_feedback=semantic_feedback,
-            nli_feedback=nli_feedback,
-            final_score=final_score,
-            total_marks=request.total_marks
+        logger.info(f"Batch evaluation complete. {response.total_answers} answers evaluated")
+        return batch_response(response, fields, columnar=output_format == "columnar")
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error during batch evaluation: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Internal server error during evaluation: {str(e)}"
         )
+
+
+class RequestBodyReader:
+    """
+    Read a request body chunk by chunk as it arrives, for iter_ndjson
+    
+    A client disconnect ends the input. body_read is set once the whole
+    body has been received.
+    """
+    
+    def __init__(self, request: Request):
+        self._chunks = request.stream()
+        self.body_read = asyncio.Event()
+    
+    async def read(self, size: int) -> bytes:
+        """
+        Return the next received chunk, b"" at the end of the body
         
-        # Calculate final grades
-        suggested_grade = final_score * request.total_marks
-        percentage = final_score * 100
+        Args:
+            size: Ignored: chunks are returned as the server received them
         
-        # Prepare response
-        response = EvaluationResponse(
-            scores=ScoreBreakdown(
-                rubric_score=rubric_score,
-                semantic_score=semantic_score,
-                nli_score=nli_score,
-                final_score=final_score
-            ),
-            suggested_grade=round(suggested_grade, 2),
-            total_marks=request.total_marks,
-            percentage=round(percentage, 2),
-            feedback=comprehensive_feedback,
-            rubric_analysis={
-                "covered_concepts": rubric_analysis["covered_concepts"],
-                "partial_concepts": rubric_analysis["partial_concepts"],
-                "missing_concepts": rubric_analysis["missing_concepts"],
-                "total_rubrics": rubric_analysis["total_rubrics"]
-            }
+        Returns:
+            Next non-empty chunk of the body, or b""
+        """
+        try:
+            async for chunk in self._chunks:
+                if chunk:
+                    return chunk
+        except ClientDisconnect:
+            logger.info("Client disconnected while uploading a stream")
+        self.body_read.set()
+        return b""
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse that can be sent while the request body is still read
+    
+    StreamingResponse watches receive() for a client disconnect, which would
+    swallow the body chunks still to come. This one only starts watching once
+    the body has been read; until then RequestBodyReader sees the disconnect.
+    """
+    
+    def __init__(self, content: AsyncIterator[str], body_read: asyncio.Event, **kwargs):
+        super().__init__(content, **kwargs)
+        self.body_read = body_read
+    
+    async def listen_for_disconnect(self, receive) -> None:
+        await self.body_read.wait()
+        await super().listen_for_disconnect(receive)
+
+
+@app.post("/evaluate/stream")
+async def evaluate_stream(request: Request, fields: Optional[FrozenSet[str]] = Depends(response_fields)):
+    """
+    Evaluate a newline-delimited JSON stream of answers to one question
+    
+    The body (or a multipart upload in the "file" field) holds one JSON
+    object per line. The first line is the question (question, rubrics,
+    correct_answer, total_marks); every following line is an answer
+    ({"student_answer": ..., "id": ...}). One StreamEvaluationResult line is
+    emitted per answer as soon as it is scored.
+    
+    A plain NDJSON body is parsed as it arrives, so results flow back while
+    the client is still uploading. A multipart upload is only parsed once it
+    has been received in full.
+    
+    Args:
+        request: Request with an NDJSON body or multipart upload
+        fields: Evaluation fields to return (?slim=true or ?fields=...)
+    
+    Returns:
+        StreamingResponse of application/x-ndjson result lines
+    """
+    pipeline = await get_pipeline()
+    executor = services["executor"]
+    
+    if request.headers.get("content-type", "").startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if not isinstance(upload, UploadFile):
+            raise HTTPException(status_code=400, detail="Multipart upload must contain a 'file' field")
+        read = upload.read
+        close = upload.close
+        body_read = asyncio.Event()
+        body_read.set()
+    else:
+        reader = RequestBodyReader(request)
+        read = reader.read
+        close = None
+        body_read = reader.body_read
+    
+    async def close_upload() -> None:
+        if close is not None:
+            await close()
+    
+    lines = iter_ndjson(read)
+    header_line = await anext(lines, None)
+    if header_line is None or header_line[1]:
+        await close_upload()
+        raise HTTPException(status_code=400, detail="First line must be the question as a JSON object")
+    try:
+        header = StreamQuestionHeader.model_validate(header_line[0])
+    except ValueError as e:
+        await close_upload()
+        raise HTTPException(status_code=400, detail=f"Invalid question line: {e}")
+    
+    logger.info("Received streaming evaluation request")
+    
+    # Per-question work shared by every micro-batch of the stream
+    try:
+        correct_answer = limit_length(header.correct_answer, "Correct answer")
+    except HTTPException:
+        await close_upload()
+        raise
+    correct_answer = await executor.run(tokenize, clean_text(correct_answer))
+    
+    async def evaluate(student_answers: List[str]) -> List[EvaluationResponse]:
+        return await evaluate_cleaned_answers(
+            pipeline=pipeline,
+            student_answers=student_answers,
+            rubrics=header.rubrics,
+            correct_answer=correct_answer,
+            total_marks=header.total_marks,
+            course=header.course,
+            detail=needs_detail(fields)
         )
+    
+    stream_evaluator = StreamEvaluator(
+        evaluate_batch=evaluate,
+        max_batch_size=settings.stream_batch_size,
+        queue_size=settings.stream_queue_size,
+        max_answer_chars=settings.max_text_chars,
+        truncate=settings.oversize_policy == "truncate",
+        result_fields=fields
+    )
+    return DuplexStreamingResponse(
+        stream_evaluator.stream(lines),
+        body_read=body_read,
+        media_type="application/x-ndjson",
+        background=BackgroundTask(close_upload)
+    )
+
+
+@app.post("/gradebook")
+async def grade_gradebook_file(
+    request: Request,
+    question_id: Optional[str] = Query(None, description="Registered question the answers belong to"),
+    output_format: Optional[str] = Query(
+        None, alias="format", pattern="^(csv|parquet)$", description="Results file format (default: the upload's)"
+    ),
+    answer_column: str = Query("student_answer", description="Column of the student answers"),
+    id_column: str = Query("id", description="Column of the student identifiers")
+):
+    """
+    Grade a CSV or Parquet gradebook of answers to one question
+    
+    The multipart upload holds the gradebook in the "file" field and, unless
+    question_id is given, the question as JSON (question, rubrics,
+    correct_answer, total_marks) in the "question" field. The file is read
+    and graded in chunks of GRADEBOOK_CHUNK_ROWS rows, and the results file is
+    streamed back as each chunk is written.
+    
+    Args:
+        request: Multipart request with the gradebook file
+        question_id: Id returned by POST /questions, instead of a "question" field
+        output_format: "csv" or "parquet"
+        answer_column: Column of the student answers
+        id_column: Column of the student identifiers, echoed in the results
+    
+    Returns:
+        StreamingResponse of the results file, one row per answer
+    """
+    if not request.headers.get("content-type", "").startswith("multipart/form-data"):
+        raise HTTPException(status_code=415, detail="Gradebooks must be uploaded as multipart/form-data")
+    form = await request.form()
+    upload = form.get("file")
+    if not isinstance(upload, UploadFile):
+        raise HTTPException(status_code=400, detail="Multipart upload must contain a 'file' field")
+    
+    pipeline = await get_pipeline()
+    executor = services["executor"]
+    input_format = gradebook_format(upload.filename)
+    output_format = output_format or input_format
+    try:
+        if question_id is not None:
+            artifacts = await get_question(pipeline, question_id)
+        else:
+            question_field = form.get("question") or ""
+            if isinstance(question_field, UploadFile):
+                question_field = await question_field.read()
+            try:
+                header = StreamQuestionHeader.model_validate_json(question_field)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=f"Invalid 'question' field: {e}")
+            correct_answer = clean_text(limit_length(header.correct_answer, "Correct answer"))
+            artifacts = await executor.run(pipeline.prepare_question, StoredQuestion(
+                id="",
+                question=header.question,
+                rubrics=header.rubrics,
+                correct_answer=correct_answer,
+                total_marks=header.total_marks,
+                created_at=0.0,
+                course=header.course
+            ))
         
-        logger.info(f"Evaluation complete. Final score: {final_score:.3f}")
-        return response
-        
+        # Read the first chunk now so a wrong column or file type is a 400, not a broken download
+        chunks = iter_gradebook(upload.file, input_format, answer_column, id_column, settings.gradebook_chunk_rows)
+        first_chunk = await executor.run(next, chunks, None)
+        sink = ChunkSink()
+        writer = GradebookWriter(sink, output_format, len(artifacts.question.rubrics))
+    except ValueError as e:
+        await upload.close()
+        raise HTTPException(status_code=400, detail=f"Invalid gradebook: {e}")
     except HTTPException:
+        await upload.close()
         raise
+    
+    question = artifacts.question
+    logger.info(f"Received gradebook {upload.filename or ''} ({input_format} -> {output_format})")
+    
+    async def evaluate(student_answers: List[str]) -> List[EvaluationResponse]:
+        return await evaluate_cleaned_answers(
+            pipeline=pipeline,
+            student_answers=student_answers,
+            rubrics=artifacts.compiled_rubric,
+            correct_answer=artifacts.correct_answer,
+            total_marks=question.total_marks,
+            course=question.course
+        )
+    
+    stream_evaluator = StreamEvaluator(
+        evaluate_batch=evaluate,
+        max_batch_size=settings.stream_batch_size,
+        queue_size=settings.stream_queue_size,
+        max_answer_chars=settings.max_text_chars,
+        truncate=settings.oversize_policy == "truncate"
+    )
+    rows = grade_gradebook(
+        read_chunks(itertools.chain([first_chunk] if first_chunk else [], chunks), executor.run),
+        stream_evaluator,
+        writer,
+        question.rubrics,
+        settings.gradebook_chunk_rows
+    )
+    
+    async def results_file():
+        async for _ in rows:
+            data = sink.take()
+            if data:
+                yield data
+    
+    stem = os.path.splitext(os.path.basename(upload.filename or "gradebook"))[0]
+    return StreamingResponse(
+        results_file(),
+        media_type=GRADEBOOK_MEDIA_TYPES[output_format],
+        headers={"Content-Disposition": f'attachment; filename="{stem}-results.{output_format}"'},
+        background=BackgroundTask(upload.close)
+    )
+
+
+def question_response(artifacts: QuestionArtifacts) -> QuestionResponse:
+    """Public view of a registered question"""
+    question = artifacts.question
+    return QuestionResponse(
+        id=question.id,
+        question=question.question,
+        rubrics=question.rubrics,
+        correct_answer=question.correct_answer,
+        total_marks=question.total_marks,
+        course=question.course,
+        created_at=question.created_at
+    )
+
+
+async def get_question(pipeline: EvaluationPipeline, question_id: str) -> QuestionArtifacts:
+    """
+    Look up a registered question's artifacts
+    
+    Raises:
+        HTTPException: 404 if the question is not registered
+    """
+    artifacts = await services["executor"].run(
+        services["question_registry"].get, question_id, pipeline.prepare_question
+    )
+    if artifacts is None:
+        raise HTTPException(status_code=404, detail=f"Question {question_id} not found")
+    return artifacts
+
+
+@app.post("/questions", response_model=QuestionResponse, status_code=201)
+async def create_question(request: QuestionCreateRequest):
+    """
+    Register a question so answers can be evaluated without resending it
+    
+    The correct answer is cleaned and tokenized, the rubrics compiled and the
+    reference features computed once, here, instead of on every evaluation.
+    
+    Args:
+        request: QuestionCreateRequest with the question, rubrics and correct answer
+    
+    Returns:
+        QuestionResponse with the id to evaluate answers against
+    """
+    pipeline = await get_pipeline()
+    artifacts = await services["executor"].run(
+        services["question_registry"].register,
+        question=request.question,
+        rubrics=request.rubrics,
+        correct_answer=clean_text(limit_length(request.correct_answer, "Correct answer")),
+        total_marks=request.total_marks,
+        prepare=pipeline.prepare_question,
+        course=request.course
+    )
+    return question_response(artifacts)
+
+
+@app.get("/questions/{question_id}", response_model=QuestionResponse)
+async def read_question(question_id: str):
+    """Return a registered question"""
+    pipeline = await get_pipeline()
+    return question_response(await get_question(pipeline, question_id))
+
+
+@app.delete("/questions/{question_id}", status_code=204)
+async def delete_question(question_id: str):
+    """Remove a registered question"""
+    if not await services["executor"].run(services["question_registry"].delete, question_id):
+        raise HTTPException(status_code=404, detail=f"Question {question_id} not found")
+    return Response(status_code=204)
+
+
+@app.post("/questions/{question_id}/evaluate", response_model=EvaluationResponse)
+async def evaluate_question_answer(
+    question_id: str,
+    request: QuestionEvaluationRequest,
+    fields: Optional[FrozenSet[str]] = Depends(response_fields),
+    skip: FrozenSet[str] = Depends(admission)
+):
+    """
+    Evaluate a student's answer to a registered question
+    
+    Args:
+        question_id: Id returned by POST /questions
+        request: QuestionEvaluationRequest with the student's answer
+        fields: Evaluation fields to return (?slim=true or ?fields=...)
+        skip: Analyses skipped because the server is overloaded or their analyzer is still loading
+    
+    Returns:
+        EvaluationResponse with scores and feedback
+    """
+    student_answer = limit_length(request.student_answer)
+    with metrics.stage("clean_text"):
+        student_answer = clean_text(student_answer)
+    if not is_valid_answer(student_answer):
+        raise HTTPException(
+            status_code=400,
+            detail="Student answer is too short or empty"
+        )
+    
+    pipeline = await get_pipeline(skip)
+    artifacts = await get_question(pipeline, question_id)
+    detail = needs_detail(fields)
+    
+    def evaluate_answers(answers: List[str]):
+        return evaluate_cleaned_answers(
+            pipeline=pipeline,
+            student_answers=answers,
+            rubrics=artifacts.compiled_rubric,
+            correct_answer=artifacts.correct_answer,
+            total_marks=artifacts.question.total_marks,
+            course=artifacts.question.course,
+            detail=detail,
+            skip=skip
+        )
+    
+    try:
+        micro_batcher = services.get("micro_batcher")
+        if micro_batcher is not None:
+            result = await micro_batcher.submit(("question", question_id, detail, skip), student_answer, evaluate_answers)
+        else:
+            result = (await evaluate_answers([student_answer]))[0]
     except Exception as e:
         logger.error(f"Error during evaluation: {e}", exc_info=True)
         raise HTTPException(
             status_code=500,
             detail=f"Internal server error during evaluation: {str(e)}"
         )
+    return json_response(result, fields)
+
+
+@app.post("/questions/{question_id}/evaluate/batch", response_model=BatchEvaluationResponse)
+async def evaluate_question_batch(
+    question_id: str,
+    request: QuestionBatchEvaluationRequest,
+    fields: Optional[FrozenSet[str]] = Depends(response_fields),
+    skip: FrozenSet[str] = Depends(admission),
+    output_format: str = Query(
+        "rows", alias="format", pattern="^(rows|columnar)$", description="rows, or columnar for one array per field"
+    )
+):
+    """
+    Evaluate many students' answers to a registered question
+    
+    Args:
+        question_id: Id returned by POST /questions
+        request: QuestionBatchEvaluationRequest with the students' answers
+        fields: Evaluation fields to return (?slim=true or ?fields=...)
+        skip: Analyses skipped because the server is overloaded or their analyzer is still loading
+        output_format: "rows" for one object per answer, "columnar" for one array per field
+    
+    Returns:
+        BatchEvaluationResponse with one evaluation per answer
+    """
+    student_answers = limit_lengths(request.student_answers)
+    with metrics.stage("clean_text"):
+        student_answers = [clean_text(answer) for answer in student_answers]
+    invalid = [i for i, answer in enumerate(student_answers) if not is_valid_answer(answer)]
+    if invalid:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Student answers at positions {invalid} are too short or empty"
+        )
+    
+    pipeline = await get_pipeline(skip)
+    artifacts = await get_question(pipeline, question_id)
+    try:
+        response = await evaluate_cohort(
+            pipeline=pipeline,
+            student_answers=student_answers,
+            rubrics=artifacts.compiled_rubric,
+            correct_answer=artifacts.correct_answer,
+            total_marks=artifacts.question.total_marks,
+            cohort_idf=request.cohort_idf,
+            course=artifacts.question.course,
+            detect_duplicates=request.detect_duplicates,
+            detail=needs_detail(fields),
+            skip=skip
+        )
+    except Exception as e:
+        logger.error(f"Error during batch evaluation: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Internal server error during evaluation: {str(e)}"
+        )
+    return batch_response(response, fields, columnar=output_format == "columnar")
+
+
+def get_job_queue() -> JobQueue:
+    """
+    Return the job queue
+    
+    Raises:
+        HTTPException: 503 if grading jobs are disabled
+    """
+    job_queue = services.get("job_queue")
+    if job_queue is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Grading jobs are disabled (JOB_WORKERS=0)"
+        )
+    return job_queue
+
+
+@app.post("/jobs", response_model=JobResponse, status_code=202)
+async def create_job(request: JobCreateRequest):
+    """
+    Queue a batch of answers for grading in the background
+    
+    Returns immediately; poll GET /jobs/{id} for progress and results.
+    Answers too short or too long to evaluate are recorded as failed
+    instead of rejecting the whole job.
+    Near-duplicates, when requested, are found before the job is queued.
+    
+    Args:
+        request: JobCreateRequest with question details and students' answers
+    
+    Returns:
+        JobResponse with the job id
+    """
+    job_queue = get_job_queue()
+    
+    correct_answer = limit_length(request.correct_answer, "Correct answer")
+    truncate = settings.oversize_policy == "truncate"
+    with metrics.stage("clean_text"):
+        correct_answer = clean_text(correct_answer)
+        answers = []
+        for answer in request.student_answers:
+            limited = limit_text(answer, settings.max_text_chars, truncate)
+            if limited is None:
+                answers.append(("", f"Student answer is longer than {settings.max_text_chars} characters"))
+                continue
+            answer = clean_text(limited)
+            answers.append((answer, None if is_valid_answer(answer) else INVALID_ANSWER_ERROR))
+    
+    similarity_flags = None
+    if request.detect_duplicates:
+        # Found over the whole cohort here, since workers only see chunks of it
+        valid = [position for position, (_, error) in enumerate(answers) if error is None]
+        flags = await find_duplicates([answers[position][0] for position in valid], correct_answer, valid)
+        similarity_flags = [flag.model_dump() for flag in flags]
+    
+    try:
+        job = await services["executor"].run(
+            job_queue.submit,
+            question=request.question,
+            rubrics=request.rubrics,
+            correct_answer=correct_answer,
+            total_marks=request.total_marks,
+            answers=answers,
+            cohort_idf=request.cohort_idf,
+            course=request.course,
+            similarity_flags=similarity_flags
+        )
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    return JobResponse(**job)
+
+
+@app.get("/jobs/{job_id}", response_model=JobResponse)
+async def read_job(
+    job_id: str,
+    offset: int = Query(0, ge=0, description="Position of the first result to return"),
+    limit: int = Query(1000, ge=0, le=10000, description="Most results to return")
+):
+    """
+    Report a job's progress and the answers finished so far
+    
+    Args:
+        job_id: Id returned by POST /jobs
+        offset: Position of the first result to return
+        limit: Most results to return (0 for progress only)
+    
+    Returns:
+        JobResponse with progress and a page of finished results
+    """
+    job_queue = get_job_queue()
+    job = await services["executor"].run(job_queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    
+    rows = await services["executor"].run(job_queue.results, job_id, offset, limit) if limit else []
+    with metrics.stage("serialization"):
+        results = [
+            JobAnswerResult(
+                index=position,
+                result=EvaluationResponse.model_validate_json(result) if result is not None else None,
+                error=error
+            )
+            for position, result, error in rows
+        ]
+    return json_response(JobResponse(**job, results=results))
+
+
+def job_component_scores(job_id: str, teacher_marks: List[float]) -> Dict[str, List[float]]:
+    """
+    Collect the stored component scores of a completed job's answers
+    
+    Answers that could not be scored are left out, with their teacher marks.
+    
+    Args:
+        job_id: Id returned by POST /jobs
+        teacher_marks: Teacher mark of each answer of the job, by position
+    
+    Returns:
+        Dict of calibrate() arguments: rubric, semantic and NLI scores,
+        teacher marks and total marks of the scored answers
+    
+    Raises:
+        HTTPException: 404 if the job is unknown, 409 if it is not completed,
+            422 if the number of teacher marks does not match the job
+    """
+    job_queue = get_job_queue()
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    if job["status"] != "completed":
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is still {job['status']}")
+    if len(teacher_marks) != job["total_answers"]:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Job {job_id} has {job['total_answers']} answers but {len(teacher_marks)} teacher marks were given"
+        )
+    
+    columns: Dict[str, List[float]] = {
+        "rubric_scores": [], "semantic_scores": [], "nli_scores": [], "teacher_marks": [], "total_marks": []
+    }
+    for position, result, _ in job_queue.results(job_id, 0, job["total_answers"]):
+        if result is None:
+            continue
+        result = json.loads(result)
+        scores = result["scores"]
+        columns["rubric_scores"].append(scores["rubric_score"])
+        columns["semantic_scores"].append(scores["semantic_score"])
+        columns["nli_scores"].append(scores["nli_score"])
+        columns["teacher_marks"].append(teacher_marks[position])
+        columns["total_marks"].append(result["total_marks"])
+    return columns
+
+
+@app.post("/calibration", response_model=CalibrationResponse)
+async def calibrate_scores(request: CalibrationRequest):
+    """
+    Fit the score weights and grade thresholds to teacher marks
+    
+    Component scores come from a completed job or are given directly. With
+    apply, the fitted weights are saved and every worker scores with them
+    within a second, without a restart; cached results of the old weights
+    are no longer served.
+    
+    Args:
+        request: CalibrationRequest with component scores or a job id, and teacher marks
+    
+    Returns:
+        CalibrationResponse with the fitted weights and their error against the current ones
+    """
+    if request.job_id is not None:
+        columns = await services["executor"].run(job_component_scores, request.job_id, request.teacher_marks)
+        if request.total_marks is not None:
+            columns["total_marks"] = request.total_marks
+    else:
+        if request.rubric_scores is None or request.semantic_scores is None or request.nli_scores is None:
+            raise HTTPException(
+                status_code=422,
+                detail="Either job_id or rubric_scores, semantic_scores and nli_scores are required"
+            )
+        if request.total_marks is None:
+            raise HTTPException(status_code=422, detail="total_marks is required without job_id")
+        columns = {
+            "rubric_scores": request.rubric_scores,
+            "semantic_scores": request.semantic_scores,
+            "nli_scores": request.nli_scores,
+            "teacher_marks": request.teacher_marks,
+            "total_marks": request.total_marks
+        }
+    
+    try:
+        result = await services["executor"].run(lambda: calibrate(**columns, baseline=score_weights.aggregator()))
+        if request.apply:
+            if services.get("admission") is not None and settings.degrade_queue_depth:
+                check_degraded_weights(result["weights"])
+            await services["executor"].run(score_weights.save, result["weights"])
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except OSError as e:
+        logger.error(f"Error saving score weights: {e}")
+        raise HTTPException(status_code=500, detail=f"Could not save the score weights: {str(e)}")
+    
+    baseline = result["baseline"]
+    return CalibrationResponse(
+        weights=ScoreWeights(**result["weights"]),
+        mean_absolute_error=result["mean_absolute_error"],
+        band_agreement=result["band_agreement"],
+        answers=result["answers"],
+        baseline=CalibrationFit(
+            weights=ScoreWeights(**baseline["weights"]),
+            mean_absolute_error=baseline["mean_absolute_error"],
+            band_agreement=baseline["band_agreement"]
+        ),
+        applied=request.apply
+    )
 
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run(app, host=settings.host, port=settings.port)
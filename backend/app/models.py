@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from pydantic import BaseModel, Field, field_validator
+from typing import Any, List, Optional
 
 
 class EvaluationRequest(BaseModel):
@@ -9,6 +9,10 @@ class EvaluationRequest(BaseModel):
     correct_answer: str = Field(..., description="The model/correct answer")
     student_answer: str = Field(..., description="The student's response")
     total_marks: float = Field(..., gt=0, description="Total marks for the question")
+    course: Optional[str] = Field(
+        None,
+        description="Course or question bank the question belongs to; selects the IDF model of corpus TF-IDF scoring"
+    )
     
     class Config:
         json_schema_extra = {
@@ -30,8 +34,12 @@ class EvaluationRequest(BaseModel):
 class ScoreBreakdown(BaseModel):
     """Detailed breakdown of evaluation scores"""
     rubric_score: float = Field(..., ge=0, le=1, description="Score from rubric matching (0-1)")
-    semantic_score: float = Field(..., ge=0, le=1, description="Semantic similarity score (0-1)")
-    nli_score: float = Field(..., ge=0, le=1, description="Entailment/consistency score (0-1)")
+    semantic_score: float = Field(
+        ..., ge=0, le=1, description="Semantic similarity score (0-1), 0 if listed in skipped_components"
+    )
+    nli_score: float = Field(
+        ..., ge=0, le=1, description="Entailment/consistency score (0-1), 0 if listed in skipped_components"
+    )
     final_score: float = Field(..., ge=0, le=1, description="Weighted final score (0-1)")
 
 
@@ -41,8 +49,12 @@ class EvaluationResponse(BaseModel):
     suggested_grade: float = Field(..., description="Suggested marks out of total")
     total_marks: float = Field(..., description="Total marks for the question")
     percentage: float = Field(..., ge=0, le=100, description="Percentage score")
-    feedback: str = Field(..., description="Detailed evaluation feedback")
-    rubric_analysis: dict = Field(..., description="Analysis of rubric coverage")
+    feedback: Optional[str] = Field(None, description="Detailed evaluation feedback (omitted in slim mode)")
+    rubric_analysis: Optional[dict] = Field(None, description="Analysis of rubric coverage (omitted in slim mode)")
+    skipped_components: Optional[List[str]] = Field(
+        None,
+        description="Analyses skipped because the server was overloaded; the final score reweights the others"
+    )
     
     class Config:
         json_schema_extra = {
@@ -63,3 +75,224 @@ class EvaluationResponse(BaseModel):
                 }
             }
         }
+
+
+class BatchEvaluationRequest(BaseModel):
+    """Request model for evaluating many student answers to the same question"""
+    question: str = Field(..., description="The question statement")
+    rubrics: List[str] = Field(..., description="List of key points/concepts to evaluate")
+    correct_answer: str = Field(..., description="The model/correct answer")
+    student_answers: List[str] = Field(..., min_length=1, description="The students' responses")
+    total_marks: float = Field(..., gt=0, description="Total marks for the question")
+    cohort_idf: bool = Field(
+        False,
+        description="Fit TF-IDF weights over all answers in the batch instead of per answer pair"
+    )
+    detect_duplicates: bool = Field(
+        False,
+        description="Flag groups of near-duplicate answers and answers copying the correct answer"
+    )
+    course: Optional[str] = Field(
+        None,
+        description="Course or question bank the question belongs to; selects the IDF model of corpus TF-IDF scoring"
+    )
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "question": "Explain the concept of machine learning",
+                "rubrics": [
+                    "Definition of machine learning",
+                    "Types of machine learning"
+                ],
+                "correct_answer": "Machine learning is a subset of artificial intelligence that enables systems to learn and improve from experience without being explicitly programmed.",
+                "student_answers": [
+                    "Machine learning allows computers to learn from data.",
+                    "Machine learning includes supervised and unsupervised learning."
+                ],
+                "total_marks": 10.0
+            }
+        }
+
+
+class SimilarityFlag(BaseModel):
+    """A group of near-duplicate answers"""
+    answers: List[int] = Field(..., description="Positions of the answers in the group")
+    reference: bool = Field(..., description="Whether the answers are near-copies of the correct answer")
+    similarity: float = Field(..., ge=0, le=1, description="Lowest estimated similarity linking the group (0-1)")
+
+
+class BatchEvaluationResponse(BaseModel):
+    """Response model for batch answer evaluation"""
+    results: List[EvaluationResponse] = Field(..., description="One evaluation per student answer, in request order")
+    total_answers: int = Field(..., description="Number of answers evaluated")
+    similarity_flags: Optional[List[SimilarityFlag]] = Field(
+        None,
+        description="Groups of near-duplicate answers, when detect_duplicates was requested"
+    )
+
+
+class StreamQuestionHeader(BaseModel):
+    """First line of an NDJSON evaluation stream: the question all answers belong to"""
+    question: str = Field(..., description="The question statement")
+    rubrics: List[str] = Field(..., description="List of key points/concepts to evaluate")
+    correct_answer: str = Field(..., description="The model/correct answer")
+    total_marks: float = Field(..., gt=0, description="Total marks for the question")
+    course: Optional[str] = Field(
+        None,
+        description="Course or question bank the question belongs to; selects the IDF model of corpus TF-IDF scoring"
+    )
+
+
+class StreamAnswer(BaseModel):
+    """One student answer line of an NDJSON evaluation stream"""
+    student_answer: str = Field(..., description="The student's response")
+    id: Optional[str] = Field(None, description="Caller's identifier for the answer, echoed back")
+    
+    @field_validator("id", mode="before")
+    @classmethod
+    def numeric_id_as_str(cls, value: Any) -> Any:
+        """Accept numeric ids, such as student numbers, as their string form"""
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return str(value)
+        return value
+
+
+class StreamEvaluationResult(BaseModel):
+    """One output line of an NDJSON evaluation stream"""
+    index: int = Field(..., description="Position of the answer in the stream, starting at 0")
+    id: Optional[str] = Field(None, description="Identifier sent with the answer")
+    result: Optional[EvaluationResponse] = Field(None, description="Evaluation, if the answer could be scored")
+    error: Optional[str] = Field(None, description="Why the answer could not be scored")
+
+
+class QuestionCreateRequest(BaseModel):
+    """Request model for registering a question once and evaluating answers against it later"""
+    question: str = Field(..., description="The question statement")
+    rubrics: List[str] = Field(..., description="List of key points/concepts to evaluate")
+    correct_answer: str = Field(..., description="The model/correct answer")
+    total_marks: float = Field(..., gt=0, description="Total marks for the question")
+    course: Optional[str] = Field(
+        None,
+        description="Course or question bank the question belongs to; selects the IDF model of corpus TF-IDF scoring"
+    )
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "question": "Explain the concept of machine learning",
+                "rubrics": [
+                    "Definition of machine learning",
+                    "Types of machine learning"
+                ],
+                "correct_answer": "Machine learning is a subset of artificial intelligence that enables systems to learn and improve from experience without being explicitly programmed.",
+                "total_marks": 10.0
+            }
+        }
+
+
+class QuestionResponse(BaseModel):
+    """A registered question"""
+    id: str = Field(..., description="Question identifier used to evaluate answers")
+    question: str = Field(..., description="The question statement")
+    rubrics: List[str] = Field(..., description="List of key points/concepts to evaluate")
+    correct_answer: str = Field(..., description="The cleaned model/correct answer")
+    total_marks: float = Field(..., description="Total marks for the question")
+    course: Optional[str] = Field(None, description="Course or question bank the question belongs to")
+    created_at: float = Field(..., description="Registration time (Unix seconds)")
+
+
+class QuestionEvaluationRequest(BaseModel):
+    """Request model for evaluating one answer to a registered question"""
+    student_answer: str = Field(..., description="The student's response")
+
+
+class QuestionBatchEvaluationRequest(BaseModel):
+    """Request model for evaluating many answers to a registered question"""
+    student_answers: List[str] = Field(..., min_length=1, description="The students' responses")
+    cohort_idf: bool = Field(
+        False,
+        description="Fit TF-IDF weights over all answers in the batch instead of per answer pair"
+    )
+    detect_duplicates: bool = Field(
+        False,
+        description="Flag groups of near-duplicate answers and answers copying the correct answer"
+    )
+
+
+class JobCreateRequest(BatchEvaluationRequest):
+    """Request model for grading many student answers in the background"""
+
+
+class JobAnswerResult(BaseModel):
+    """Outcome of one answer of a grading job"""
+    index: int = Field(..., description="Position of the answer in the job, starting at 0")
+    result: Optional[EvaluationResponse] = Field(None, description="Evaluation, if the answer could be scored")
+    error: Optional[str] = Field(None, description="Why the answer could not be scored")
+
+
+class JobResponse(BaseModel):
+    """Progress and finished results of a grading job"""
+    id: str = Field(..., description="Job identifier used to poll for progress")
+    status: str = Field(..., description="queued, running, completed or failed")
+    total_answers: int = Field(..., description="Number of answers in the job")
+    completed: int = Field(..., description="Answers scored so far")
+    failed: int = Field(..., description="Answers that could not be scored")
+    progress: float = Field(..., ge=0, le=1, description="Fraction of answers finished (0-1)")
+    created_at: float = Field(..., description="Submission time (Unix seconds)")
+    updated_at: float = Field(..., description="Time of the last progress (Unix seconds)")
+    similarity_flags: Optional[List[SimilarityFlag]] = Field(
+        None,
+        description="Groups of near-duplicate answers, when detect_duplicates was requested"
+    )
+    results: List[JobAnswerResult] = Field(
+        default_factory=list,
+        description="Finished answers, by position, within the requested page"
+    )
+
+
+class ScoreWeights(BaseModel):
+    """Weights of the component scores in the final score, and the assessment thresholds"""
+    rubric_weight: float = Field(..., ge=0, description="Weight of the rubric score")
+    semantic_weight: float = Field(..., ge=0, description="Weight of the semantic similarity score")
+    nli_weight: float = Field(..., ge=0, description="Weight of the NLI score")
+    grade_thresholds: List[float] = Field(
+        ...,
+        description="Lowest percentage of an excellent, good, satisfactory and needs-improvement answer"
+    )
+
+
+class CalibrationRequest(BaseModel):
+    """Request model for fitting score weights to teacher marks"""
+    job_id: Optional[str] = Field(
+        None,
+        description="Completed grading job whose stored component scores are calibrated on"
+    )
+    rubric_scores: Optional[List[float]] = Field(None, description="Rubric score of each answer, without job_id")
+    semantic_scores: Optional[List[float]] = Field(None, description="Semantic score of each answer, without job_id")
+    nli_scores: Optional[List[float]] = Field(None, description="NLI score of each answer, without job_id")
+    teacher_marks: List[float] = Field(
+        ...,
+        min_length=1,
+        description="Mark the teacher gave each answer (by job position with job_id)"
+    )
+    total_marks: Optional[float] = Field(
+        None,
+        gt=0,
+        description="Total marks of the question (default with job_id: the job's)"
+    )
+    apply: bool = Field(False, description="Start scoring with the fitted weights right away")
+
+
+class CalibrationFit(BaseModel):
+    """How closely a set of weights reproduces the teacher marks"""
+    weights: ScoreWeights = Field(..., description="Weights and grade thresholds")
+    mean_absolute_error: float = Field(..., description="Mean distance from the teacher marks, in percentage points")
+    band_agreement: float = Field(..., description="Fraction of answers given the teacher's assessment band")
+
+
+class CalibrationResponse(CalibrationFit):
+    """Response model for score calibration"""
+    answers: int = Field(..., description="Number of answers calibrated on")
+    baseline: CalibrationFit = Field(..., description="The same measures for the weights in use before")
+    applied: bool = Field(..., description="Whether the fitted weights are now in use")
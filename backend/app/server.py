@@ -0,0 +1,173 @@
+"""
+Multi-process production server
+
+The analyzers are loaded once, in this parent process. N workers are then
+forked from it and serve the same listening socket, each running the app's
+normal lifespan with the inherited analyzers adopted as ready. Loaded models
+are shared copy-on-write: gc.freeze() keeps the garbage collector from
+writing to the inherited objects (which would copy their pages into every
+worker), and model weights are moved to shared memory. The parent restarts
+workers that die and runs the grading job workers. Workers share their
+metrics through snapshot files, so a scrape of /metrics covers all of them.
+
+Usage (from the backend directory):
+    python -m app.server [--workers N] [--host HOST] [--port PORT]
+"""
+from multiprocessing.sharedctypes import RawArray
+from typing import Dict
+import argparse
+import gc
+import logging
+import os
+import shutil
+import signal
+import socket
+import tempfile
+import time
+
+import uvicorn
+
+from app import main as api
+from app.config import settings
+from app.services.job_queue import JobQueue
+
+logger = logging.getLogger(__name__)
+
+# Seconds workers get to finish in-flight requests on shutdown
+SHUTDOWN_TIMEOUT = 30.0
+
+
+def _bind(host: str, port: int) -> socket.socket:
+    """Open the listening socket shared by all workers"""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _serve(sock: socket.socket, host: str, port: int):
+    """Worker body: serve the app on the inherited socket until told to stop"""
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    config = uvicorn.Config(api.app, host=host, port=port, lifespan="on")
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def serve(workers: int, host: str, port: int):
+    """
+    Preload the analyzers, fork the workers and supervise them
+    
+    Args:
+        workers: Number of worker processes
+        host: Address to listen on
+        port: Port to listen on
+    """
+    started = time.perf_counter()
+    api.preload_analyzers()
+    logger.info(f"Analyzers preloaded in {time.perf_counter() - started:.2f}s")
+    
+    job_queue = None
+    if settings.job_workers > 0:
+        job_queue = JobQueue(
+            path=settings.job_store_path,
+            workers=settings.job_workers,
+            chunk_size=settings.job_chunk_size,
+            max_queued=settings.job_queue_limit,
+            score_weights=settings.score_weights(),
+            score_weights_path=settings.score_weights_path
+        )
+        job_queue.start()
+    
+    sock = _bind(host, port)
+    # Shared memory: every worker sees the pids of its siblings in /health
+    worker_pids = RawArray("i", workers)
+    api.preforked["worker_pids"] = worker_pids
+    # Every worker writes its metrics here and merges the others' into /metrics
+    metrics_dir = tempfile.mkdtemp(prefix="eval-metrics-")
+    api.preforked["metrics_dir"] = metrics_dir
+    
+    # Everything allocated so far is shared with the workers; keep the
+    # collector from touching it (and so copying its pages) in each of them
+    gc.collect()
+    gc.freeze()
+    
+    children: Dict[int, int] = {}
+    
+    def spawn(slot: int):
+        pid = os.fork()
+        if pid == 0:
+            status = 0
+            try:
+                _serve(sock, host, port)
+            except BaseException:
+                logger.exception("Worker failed")
+                status = 1
+            finally:
+                os._exit(status)
+        worker_pids[slot] = pid
+        children[pid] = slot
+        logger.info(f"Started worker {pid}")
+    
+    stopping = False
+    
+    def stop(signum, frame):
+        nonlocal stopping
+        if not stopping:
+            logger.info("Stopping workers...")
+            stopping = True
+            for pid in children:
+                os.kill(pid, signal.SIGTERM)
+    
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    
+    for slot in range(workers):
+        spawn(slot)
+    logger.info(f"Serving on http://{host}:{port} with {workers} workers")
+    
+    deadline = None
+    while children:
+        # Wait on the workers by pid: the job queue reaps its own processes
+        for pid in list(children):
+            try:
+                finished, _ = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                finished = pid
+            if finished:
+                slot = children.pop(pid)
+                worker_pids[slot] = 0
+                if not stopping:
+                    logger.warning(f"Worker {pid} exited, restarting it")
+                    spawn(slot)
+        
+        if stopping:
+            deadline = deadline or time.monotonic() + SHUTDOWN_TIMEOUT
+            if time.monotonic() > deadline:
+                for pid in children:
+                    os.kill(pid, signal.SIGKILL)
+        elif job_queue is not None:
+            job_queue.supervise()
+        time.sleep(0.5)
+    
+    if job_queue is not None:
+        job_queue.shutdown()
+    sock.close()
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    logger.info("Server stopped")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the evaluation API from several forked worker processes")
+    parser.add_argument("--workers", type=int, default=settings.server_workers, help="Worker processes (0 = one per CPU core)")
+    parser.add_argument("--host", default=settings.host, help="Address to listen on")
+    parser.add_argument("--port", type=int, default=settings.port, help="Port to listen on")
+    args = parser.parse_args()
+    
+    serve(args.workers or os.cpu_count() or 1, args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, Optional
+import asyncio
+import logging
+import math
+
+logger = logging.getLogger(__name__)
+
+# Weight of the newest service time in the moving average
+SERVICE_TIME_SMOOTHING = 0.2
+
+
+class AdmissionRejected(Exception):
+    """A request that cannot be served in time and should be retried later"""
+    
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Bounds the evaluations running at once and sheds load it cannot serve in time
+    Up to max_concurrent requests run; later ones wait in a FIFO queue of at
+    most max_queue requests. A request is turned away immediately when the
+    queue is full or when, from the moving average of service times, its
+    deadline would pass before it leaves the queue, and turned away when its
+    deadline passes while it waits. Requests admitted while the queue is at
+    least degrade_queue_depth deep should be served in a cheaper, degraded way
+    so the queue drains faster.
+    """
+    
+    def __init__(self, max_concurrent: int, max_queue: int = 0, degrade_queue_depth: int = 0):
+        """
+        Initialize the admission controller
+        
+        Args:
+            max_concurrent: Most requests served at once
+            max_queue: Most requests waiting for a slot (0: none wait)
+            degrade_queue_depth: Queue depth from which admitted requests run
+                degraded (0: never)
+        """
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent must be at least 1")
+        logger.info(
+            f"Initializing admission control ({max_concurrent} concurrent, queue of {max_queue}"
+            + (f", degraded from a depth of {degrade_queue_depth})" if degrade_queue_depth else ")")
+        )
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.degrade_queue_depth = degrade_queue_depth
+        self.active = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.degraded_admissions = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        # Moving average of how long an admitted request holds its slot
+        self._service_time: Optional[float] = None
+    
+    def queue_depth(self) -> int:
+        """Requests waiting for a slot"""
+        return len(self._waiters)
+    
+    def expected_wait(self, position: Optional[int] = None) -> float:
+        """
+        Estimated seconds until a request at a queue position gets a slot
+        
+        Args:
+            position: Requests ahead of it in the queue (default: the whole queue)
+        """
+        if self._service_time is None:
+            return 0.0
+        if position is None:
+            position = len(self._waiters)
+        return (position + 1) * self._service_time / self.max_concurrent
+    
+    def retry_after(self) -> int:
+        """Seconds a rejected client should wait before retrying, at least 1"""
+        return max(1, math.ceil(self.expected_wait()))
+    
+    def _reject(self, message: str) -> AdmissionRejected:
+        """Count a rejection and build its exception"""
+        self.rejected += 1
+        logger.warning(f"Rejected request: {message}")
+        return AdmissionRejected(message, self.retry_after())
+    
+    async def acquire(self, deadline: Optional[float] = None) -> bool:
+        """
+        Wait for a slot
+        
+        Args:
+            deadline: Event loop time by which the request must be admitted
+        
+        Returns:
+            Whether the request should be served degraded
+        
+        Raises:
+            AdmissionRejected: If the queue is full or the deadline cannot be met
+        """
+        loop = asyncio.get_running_loop()
+        if self.active < self.max_concurrent and not self._waiters:
+            self.active += 1
+            self.admitted += 1
+            return False
+        
+        if len(self._waiters) >= self.max_queue:
+            raise self._reject(f"{len(self._waiters)} requests already waiting")
+        remaining = None
+        if deadline is not None:
+            remaining = deadline - loop.time()
+            if remaining <= self.expected_wait():
+                raise self._reject(
+                    f"expected wait of {self.expected_wait() * 1000:.0f} ms exceeds the deadline"
+                )
+        
+        waiter = loop.create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, remaining)
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # Handed a slot just as the wait ended: pass it on
+                self.release()
+            else:
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+            if isinstance(e, asyncio.TimeoutError):
+                raise self._reject("deadline passed while waiting") from None
+            raise
+        
+        # The releasing request handed its slot over, so active is unchanged
+        self.admitted += 1
+        degraded = bool(self.degrade_queue_depth) and len(self._waiters) >= self.degrade_queue_depth
+        if degraded:
+            self.degraded_admissions += 1
+        return degraded
+    
+    def release(self):
+        """Free a slot, handing it to the longest-waiting request if any"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+    
+    def _record_service_time(self, seconds: float):
+        """Update the moving average of service times"""
+        if self._service_time is None:
+            self._service_time = seconds
+        else:
+            self._service_time += SERVICE_TIME_SMOOTHING * (seconds - self._service_time)
+    
+    @asynccontextmanager
+    async def admit(self, deadline: Optional[float] = None) -> AsyncIterator[bool]:
+        """
+        Hold a slot for the duration of a block
+        
+        Args:
+            deadline: Event loop time by which the request must be admitted
+        
+        Yields:
+            Whether the request should be served degraded
+        
+        Raises:
+            AdmissionRejected: If the request cannot be admitted in time
+        """
+        degraded = await self.acquire(deadline)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        try:
+            yield degraded
+        finally:
+            self._record_service_time(loop.time() - start)
+            self.release()
+    
+    def stats(self) -> Dict:
+        """Current load and admission counts"""
+        return {
+            "active": self.active,
+            "queued": self.queue_depth(),
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "degraded": self.degraded_admissions,
+            "service_time_ms": round(self._service_time * 1000, 2) if self._service_time is not None else None
+        }
+
+
+def create_admission_controller(
+    max_concurrent: int,
+    max_queue: int = 0,
+    degrade_queue_depth: int = 0
+) -> Optional[AdmissionController]:
+    """
+    Create the admission controller for the configured limits
+    
+    Args:
+        max_concurrent: Most requests served at once (0: unlimited)
+        max_queue: Most requests waiting for a slot
+        degrade_queue_depth: Queue depth from which admitted requests run degraded (0: never)
+    
+    Returns:
+        AdmissionController, or None when concurrency is unlimited
+    """
+    if max_concurrent <= 0:
+        return None
+    return AdmissionController(max_concurrent, max_queue, degrade_queue_depth)
@@ -0,0 +1,135 @@
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Optional
+import asyncio
+import contextvars
+import logging
+import multiprocessing
+
+logger = logging.getLogger(__name__)
+
+# Analyzer instances owned by a worker process
+_worker_analyzers: Dict[str, Any] = {}
+
+
+def load_worker_analyzers() -> Dict[str, Any]:
+    """
+    Load the private analyzers of a worker process, once per process
+    
+    Process pool workers and job workers cannot share the server's analyzers;
+    theirs are built by the same analyzer_factories.
+    
+    Returns:
+        The rubric matcher, semantic analyzer and NLI analyzer by service name
+    """
+    if not _worker_analyzers:
+        # Imported here: the pipeline module imports this one
+        from app.services.evaluation_pipeline import analyzer_factories
+        
+        for name, factory in analyzer_factories().items():
+            _worker_analyzers[name] = factory()
+    return _worker_analyzers
+
+
+def _call_worker_analyzer(name: str, method: str, *args, **kwargs):
+    """Run an analyzer method on the worker's own analyzer instance"""
+    return getattr(_worker_analyzers[name], method)(*args, **kwargs)
+
+
+class AnalysisExecutor:
+    """
+    Runs CPU-bound analysis off the asyncio event loop
+    Analyzer calls go to a thread pool sharing the loaded analyzers, or to a
+    process pool where every worker loads its own analyzers
+    """
+    
+    def __init__(
+        self,
+        analyzers: Dict[str, Any],
+        executor_type: str = "thread",
+        max_workers: int = 4
+    ):
+        """
+        Initialize the worker pool
+        
+        Args:
+            analyzers: Loaded analyzers by service name, used in thread mode
+            executor_type: "thread" or "process"
+            max_workers: Number of pool workers
+        """
+        logger.info(f"Initializing {executor_type} pool analysis executor with {max_workers} workers")
+        self.analyzers = analyzers
+        self.executor_type = executor_type
+        self.max_workers = max_workers
+        # Calls submitted and not finished yet, queued or running
+        self.pending = 0
+        
+        # Glue work (tokenizing, aggregation) always runs on threads
+        self._thread_pool = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="analysis"
+        )
+        self._process_pool: Optional[Executor] = None
+        if executor_type == "process":
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=load_worker_analyzers
+            )
+        elif executor_type != "thread":
+            raise ValueError(f"Unknown executor type: {executor_type}")
+    
+    async def run(self, func: Callable, *args, **kwargs):
+        """
+        Run a function on the thread pool
+        
+        The function runs in a copy of the caller's context, so stages it
+        times are recorded into the calling request's timings.
+        
+        Args:
+            func: Function to call
+            *args, **kwargs: Arguments for the function
+        
+        Returns:
+            The function's result
+        """
+        loop = asyncio.get_running_loop()
+        self.pending += 1
+        try:
+            return await loop.run_in_executor(
+                self._thread_pool, partial(contextvars.copy_context().run, func, *args, **kwargs)
+            )
+        finally:
+            self.pending -= 1
+    
+    async def run_analyzer(self, name: str, method: str, *args, **kwargs):
+        """
+        Run an analyzer method on the configured pool
+        
+        Args:
+            name: Service name of the analyzer (e.g. "rubric_matcher")
+            method: Method to call on it
+            *args, **kwargs: Arguments for the method (must be picklable in process mode)
+        
+        Returns:
+            The method's result
+        """
+        if self._process_pool is None:
+            return await self.run(getattr(self.analyzers[name], method), *args, **kwargs)
+        
+        loop = asyncio.get_running_loop()
+        self.pending += 1
+        try:
+            return await loop.run_in_executor(
+                self._process_pool,
+                partial(_call_worker_analyzer, name, method, *args, **kwargs)
+            )
+        finally:
+            self.pending -= 1
+    
+    def shutdown(self):
+        """Stop the worker pools"""
+        logger.info("Shutting down analysis executor...")
+        self._thread_pool.shutdown(wait=False, cancel_futures=True)
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,296 @@
+from typing import Dict, Optional, Sequence, Tuple, Union
+import json
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+
+from app.services.score_aggregator import ScoreAggregator
+
+logger = logging.getLogger(__name__)
+
+# Spacing of the weight grid searched on the simplex (weights sum to 1)
+WEIGHT_STEP = 0.01
+
+# Seconds between checks for a weights file rewritten by another process
+REFRESH_INTERVAL = 1.0
+
+# Teacher marks needed in each of the two bands a grade threshold separates
+# before the threshold is moved from its nominal value
+MIN_BAND_EXAMPLES = 5
+
+# Smallest distance, in percentage points, between saved grade thresholds
+MIN_THRESHOLD_GAP = 1.0
+
+
+def _simplex_grid(step: float) -> np.ndarray:
+    """Every (rubric, semantic, nli) weight triple on a grid of the given step summing to 1"""
+    points = int(round(1 / step))
+    first, second = np.meshgrid(np.arange(points + 1), np.arange(points + 1), indexing="ij")
+    inside = first + second <= points
+    first, second = first[inside], second[inside]
+    return np.stack([first, second, points - first - second], axis=1) / points
+
+
+def fit_weights(components: np.ndarray, targets: np.ndarray, step: float = WEIGHT_STEP) -> np.ndarray:
+    """
+    Fit aggregation weights to teacher marks by least squares
+    
+    The mean squared error of weights w is w'Gw - 2b'w + c, with G the 3x3 Gram
+    matrix of the component scores and b their products with the targets, so
+    one pass over the answers is enough; every weight triple on the grid is
+    then scored from G and b alone.
+    
+    Args:
+        components: (answers x 3) rubric, semantic and NLI scores (0-1)
+        targets: Teacher mark of each answer as a fraction of the total marks
+        step: Spacing of the weight grid
+    
+    Returns:
+        Non-negative rubric, semantic and NLI weights summing to 1
+    """
+    n = len(targets)
+    gram = components.T @ components / n
+    products = components.T @ targets / n
+    grid = _simplex_grid(step)
+    errors = np.einsum("ij,jk,ik->i", grid, gram, grid) - 2 * grid @ products
+    return grid[int(np.argmin(errors))]
+
+
+def grade_bands(percentages: np.ndarray, grade_thresholds: Sequence[float]) -> np.ndarray:
+    """
+    Position in GRADE_LABELS of the assessment of each percentage, as given
+    by ScoreAggregator.assessment
+    """
+    reached = np.asarray(percentages)[:, None] >= np.asarray(grade_thresholds, dtype=np.float64)[None, :]
+    return np.where(reached.any(axis=1), reached.argmax(axis=1), len(grade_thresholds))
+
+
+def fit_grade_thresholds(
+    percentages: np.ndarray,
+    teacher_percentages: np.ndarray,
+    grade_thresholds: Sequence[float],
+    min_examples: int = MIN_BAND_EXAMPLES
+) -> Tuple[float, ...]:
+    """
+    Fit the percentage thresholds of the assessment bands to teacher marks
+    
+    The teacher's band of each answer is found with the given thresholds; each
+    threshold is then moved to where the fewest answers land on the wrong side
+    of it, found with one sort and a cumulative sum. A threshold keeps its
+    nominal value unless the teacher put at least min_examples answers in
+    each of the two bands it separates, so a small or skewed sample cannot
+    drag it to wherever its few answers happen to fall.
+    
+    Args:
+        percentages: Aggregated score of each answer, in percent
+        teacher_percentages: Teacher mark of each answer, in percent
+        grade_thresholds: Nominal thresholds, in decreasing order
+        min_examples: Teacher marks needed in each band next to a threshold
+    
+    Returns:
+        Fitted thresholds; they may be out of order or closer together than
+        MIN_THRESHOLD_GAP when the teacher marks disagree with each other,
+        which check_grade_thresholds reports
+    """
+    order = np.argsort(-percentages, kind="stable")
+    ranked = percentages[order]
+    # Candidate cuts: above every answer, then at each distinct score
+    candidates = np.concatenate(([np.inf], ranked))
+    distinct = np.concatenate(([True], ranked[1:] != ranked[:-1], [True]))
+    band_sizes = np.bincount(grade_bands(teacher_percentages, grade_thresholds), minlength=len(grade_thresholds) + 1)
+    fitted = []
+    for band, threshold in enumerate(grade_thresholds):
+        if min(band_sizes[band], band_sizes[band + 1]) < min_examples:
+            fitted.append(float(threshold))
+            continue
+        above = (teacher_percentages[order] >= threshold).astype(np.int64)
+        # Answers ranked above a cut that the teacher put below it, and the reverse
+        false_above = np.concatenate(([0], np.cumsum(1 - above)))
+        false_below = above.sum() - np.concatenate(([0], np.cumsum(above)))
+        errors = np.where(distinct, false_above + false_below, np.iinfo(np.int64).max)
+        best = int(np.argmin(errors))
+        # Above every answer: no lower than the nominal threshold
+        cut = max(ranked[0] + 0.01, threshold) if best == 0 else candidates[best]
+        # Rounded down, so the answer the cut was placed at stays above it
+        fitted.append(float(np.floor(cut * 100) / 100))
+    return tuple(fitted)
+
+
+def check_grade_thresholds(grade_thresholds: Sequence[float], min_gap: float = MIN_THRESHOLD_GAP):
+    """
+    Make sure grade thresholds leave room for every assessment band
+    
+    Args:
+        grade_thresholds: Thresholds, best assessment first
+        min_gap: Smallest distance between consecutive thresholds, in percentage points
+    
+    Raises:
+        ValueError: If the thresholds are not decreasing by at least min_gap
+    """
+    for higher, lower in zip(grade_thresholds, grade_thresholds[1:]):
+        if higher - lower < min_gap:
+            raise ValueError(
+                f"Grade thresholds {list(grade_thresholds)} must decrease by at least "
+                f"{min_gap:g} percentage points; calibrate on more teacher marks"
+            )
+
+
+def calibrate(
+    rubric_scores: Sequence[float],
+    semantic_scores: Sequence[float],
+    nli_scores: Sequence[float],
+    teacher_marks: Sequence[float],
+    total_marks: Union[float, Sequence[float]],
+    baseline: Optional[ScoreAggregator] = None
+) -> Dict:
+    """
+    Fit aggregation weights and grade thresholds to teacher marks
+    
+    Args:
+        rubric_scores: Stored rubric score of each answer (0-1)
+        semantic_scores: Stored semantic score of each answer (0-1)
+        nli_scores: Stored NLI score of each answer (0-1)
+        teacher_marks: Mark the teacher gave each answer
+        total_marks: Total marks of the question, or of each answer's question
+        baseline: Aggregator currently in use, to compare against (default weights)
+    
+    Returns:
+        Dict with the fitted "weights" (ScoreAggregator arguments), the
+        number of "answers", and the mean absolute error (in percentage
+        points) and band agreement of the fitted and baseline aggregation
+    
+    Raises:
+        ValueError: If the inputs are empty, of different lengths, or total marks are not positive
+    """
+    marks = np.asarray(teacher_marks, dtype=np.float64)
+    if not len(marks):
+        raise ValueError("No answers to calibrate on")
+    if not len(rubric_scores) == len(semantic_scores) == len(nli_scores) == len(marks):
+        raise ValueError(
+            f"Got {len(rubric_scores)} rubric, {len(semantic_scores)} semantic and "
+            f"{len(nli_scores)} NLI scores but {len(marks)} teacher marks"
+        )
+    components = np.column_stack([
+        np.asarray(rubric_scores, dtype=np.float64),
+        np.asarray(semantic_scores, dtype=np.float64),
+        np.asarray(nli_scores, dtype=np.float64)
+    ])
+    totals = np.broadcast_to(np.asarray(total_marks, dtype=np.float64), marks.shape)
+    if (totals <= 0).any():
+        raise ValueError("Total marks must be positive")
+    
+    baseline = baseline or ScoreAggregator()
+    targets = np.clip(marks / totals, 0.0, 1.0)
+    weights = fit_weights(components, targets)
+    fitted = ScoreAggregator(*weights.tolist(), grade_thresholds=baseline.grade_thresholds)
+    
+    teacher_percentages = targets * 100
+    percentages = fitted.aggregate_batch(components[:, 0], components[:, 1], components[:, 2]) * 100
+    fitted = ScoreAggregator(
+        *weights.tolist(),
+        grade_thresholds=fit_grade_thresholds(percentages, teacher_percentages, baseline.grade_thresholds)
+    )
+    
+    def evaluate(aggregator: ScoreAggregator) -> Dict:
+        scores = aggregator.aggregate_batch(components[:, 0], components[:, 1], components[:, 2]) * 100
+        bands = grade_bands(scores, aggregator.grade_thresholds)
+        teacher_bands = grade_bands(teacher_percentages, baseline.grade_thresholds)
+        return {
+            "mean_absolute_error": round(float(np.abs(scores - teacher_percentages).mean()), 4),
+            "band_agreement": round(float((bands == teacher_bands).mean()), 4)
+        }
+    
+    result = {"weights": fitted.weights(), "answers": len(marks)}
+    result.update(evaluate(fitted))
+    result["baseline"] = dict(weights=baseline.weights(), **evaluate(baseline))
+    logger.info(
+        f"Calibrated on {len(marks)} answers: mean absolute error "
+        f"{result['baseline']['mean_absolute_error']:.2f} -> {result['mean_absolute_error']:.2f}"
+    )
+    return result
+
+
+class ScoreWeightsFile:
+    """
+    Aggregation weights kept in a JSON file, so that calibrated weights are
+    picked up by every server and job worker process without a restart
+    """
+    
+    def __init__(self, path: str, defaults: Dict):
+        """
+        Args:
+            path: JSON file of ScoreAggregator arguments (empty: always use the defaults)
+            defaults: Weights used while there is no file
+        """
+        self.path = path
+        self.defaults = dict(defaults)
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._checked = 0.0
+        self._aggregator = ScoreAggregator(**self.defaults)
+        self._refresh(force=True)
+    
+    def _refresh(self, force: bool = False):
+        """Reload the weights if the file changed since the last check"""
+        now = time.monotonic()
+        if not self.path or (not force and now - self._checked < REFRESH_INTERVAL):
+            return
+        self._checked = now
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime == self._mtime:
+            return
+        
+        with self._lock:
+            try:
+                if mtime is None:
+                    aggregator = ScoreAggregator(**self.defaults)
+                else:
+                    with open(self.path) as weights_file:
+                        aggregator = ScoreAggregator(**json.load(weights_file))
+            except (OSError, ValueError, TypeError) as e:
+                # A broken file keeps the weights in use; the next check retries
+                logger.error(f"Error loading score weights {self.path}: {e}")
+                return
+            self._mtime = mtime
+            self._aggregator = aggregator
+        if mtime is not None:
+            logger.info(f"Loaded score weights {self.path}: {aggregator.weights()}")
+    
+    def aggregator(self, check: bool = False) -> ScoreAggregator:
+        """
+        Score aggregator with the current weights
+        
+        Args:
+            check: Look for a changed file now instead of at most once a second
+        """
+        self._refresh(force=check)
+        return self._aggregator
+    
+    def save(self, weights: Dict):
+        """
+        Store new weights, replacing the file atomically
+        
+        Args:
+            weights: ScoreAggregator arguments
+        
+        Raises:
+            ValueError: If no weights file is configured or the weights are
+                invalid, including grade thresholds that are not strictly
+                decreasing or have collapsed together
+        """
+        if not self.path:
+            raise ValueError("No score weights file is configured")
+        aggregator = ScoreAggregator(**weights)
+        check_grade_thresholds(aggregator.grade_thresholds)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temporary = f"{self.path}.{os.getpid()}.tmp"
+        with open(temporary, "w") as weights_file:
+            json.dump(aggregator.weights(), weights_file, indent=2)
+        os.replace(temporary, self.path)
+        self._refresh(force=True)
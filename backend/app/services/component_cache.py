@@ -0,0 +1,200 @@
+from typing import Any, Dict, List, Optional, Tuple
+import hashlib
+import json
+import logging
+
+from app.services.result_cache import MemoryCacheBackend, SQLiteCacheBackend
+from app.utils.text_preprocessing import TokenizedText
+
+logger = logging.getLogger(__name__)
+
+
+def text_digest(text: str) -> str:
+    """Short stable hash of a text, used in component keys"""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class ComponentCache:
+    """
+    Cache of individual analyzer results, each keyed by exactly the inputs it
+    depends on: the coverage of one rubric item by an answer, and an answer's
+    semantic score and NLI result against a correct answer. After a rubric
+    item or the correct answer is edited, only the components depending on
+    it miss.
+    """
+    
+    def __init__(self, backend):
+        """
+        Initialize the cache
+        
+        Args:
+            backend: MemoryCacheBackend or SQLiteCacheBackend storing JSON values
+        """
+        logger.info(f"Initializing {backend.name} component cache")
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+    
+    def get_many(self, keys: List[str]) -> List[Optional[Any]]:
+        """Look up several components, None where missing"""
+        values = self.backend.get_many(keys)
+        misses = values.count(None)
+        self.hits += len(values) - misses
+        self.misses += misses
+        return [json.loads(value) if value is not None else None for value in values]
+    
+    def set_many(self, items: Dict[str, Any]):
+        """Store several components"""
+        if items:
+            self.backend.set_many({key: json.dumps(value) for key, value in items.items()})
+    
+    def plan(
+        self,
+        student_answers: List[TokenizedText],
+        rubrics: List[str],
+        correct_answer: TokenizedText,
+        versions: Tuple[str, str, str],
+        semantic_cacheable: bool = True
+    ) -> "ComponentPlan":
+        """
+        Look up every component of a batch
+        
+        Args:
+            student_answers: Tokenized students' responses
+            rubrics: List of key concepts/rubrics
+            correct_answer: Tokenized model/correct answer
+            versions: Rubric matcher, semantic analyzer and NLI analyzer versions
+            semantic_cacheable: Whether semantic scores depend only on the answer
+                and correct answer (not with cohort or corpus IDF)
+        
+        Returns:
+            ComponentPlan with the cached components and the ones to compute
+        """
+        return ComponentPlan(self, student_answers, rubrics, correct_answer, versions, semantic_cacheable)
+    
+    def clear(self):
+        """Drop all cached components"""
+        self.backend.clear()
+    
+    def stats(self) -> Dict:
+        """Hit/miss counters and size of the cache"""
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.backend.name,
+            "entries": len(self.backend),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0
+        }
+    
+    def close(self):
+        """Release the backend's resources"""
+        if hasattr(self.backend, "close"):
+            self.backend.close()
+
+
+class ComponentPlan:
+    """
+    Components of one batch found in the cache, and the ones still to compute:
+    the rubric items some answer misses (for those answers only), and the
+    answers missing a semantic score or NLI result
+    """
+    
+    def __init__(
+        self,
+        cache: ComponentCache,
+        student_answers: List[TokenizedText],
+        rubrics: List[str],
+        correct_answer: TokenizedText,
+        versions: Tuple[str, str, str],
+        semantic_cacheable: bool
+    ):
+        self.cache = cache
+        rubric_version, semantic_version, nli_version = versions
+        answers = [text_digest(answer.text) for answer in student_answers]
+        reference = text_digest(correct_answer.text)
+        count = len(answers)
+        
+        # Rubric item coverage does not depend on the correct answer, nor on the other items
+        items = [f"rubric:{rubric_version}:{text_digest(rubric)}" for rubric in rubrics]
+        self._rubric_keys = [[f"{item}:{answer}" for answer in answers] for item in items]
+        self._semantic_keys = [f"semantic:{semantic_version}:{reference}:{answer}" for answer in answers]
+        self._nli_keys = [f"nli:{nli_version}:{reference}:{answer}" for answer in answers]
+        
+        keys = [key for item_keys in self._rubric_keys for key in item_keys] + self._nli_keys
+        if semantic_cacheable:
+            keys += self._semantic_keys
+        values = cache.get_many(keys)
+        
+        self.coverages = [values[i * count:(i + 1) * count] for i in range(len(items))]
+        offset = len(items) * count
+        self.nli_analyses = values[offset:offset + count]
+        self.semantic_scores = values[offset + count:] if semantic_cacheable else [None] * count
+        self._semantic_cacheable = semantic_cacheable
+        
+        self.rubric_items = [i for i, coverage in enumerate(self.coverages) if None in coverage]
+        self.missing_rubrics = [rubrics[i] for i in self.rubric_items]
+        self.rubric_answers = [
+            j for j in range(count)
+            if any(self.coverages[i][j] is None for i in self.rubric_items)
+        ]
+        self.semantic_answers = [j for j, score in enumerate(self.semantic_scores) if score is None]
+        self.nli_answers = [j for j, analysis in enumerate(self.nli_analyses) if analysis is None]
+    
+    def complete(
+        self,
+        coverages: List[List[float]],
+        semantic_scores: List[float],
+        nli_analyses: List[Dict]
+    ) -> Tuple[List[List[float]], List[float], List[Dict]]:
+        """
+        Fill in and store the computed components
+        
+        Args:
+            coverages: Coverage of each of rubric_items by each of rubric_answers
+            semantic_scores: Semantic score of each of semantic_answers
+            nli_analyses: NLI result of each of nli_answers
+        
+        Returns:
+            (coverage of every rubric item per answer, semantic score per
+            answer, NLI result per answer)
+        """
+        computed: Dict[str, Any] = {}
+        for answer, answer_coverages in zip(self.rubric_answers, coverages):
+            for item, coverage in zip(self.rubric_items, answer_coverages):
+                self.coverages[item][answer] = coverage
+                computed[self._rubric_keys[item][answer]] = coverage
+        for answer, score in zip(self.semantic_answers, semantic_scores):
+            self.semantic_scores[answer] = float(score)
+            if self._semantic_cacheable:
+                computed[self._semantic_keys[answer]] = float(score)
+        for answer, analysis in zip(self.nli_answers, nli_analyses):
+            self.nli_analyses[answer] = analysis
+            computed[self._nli_keys[answer]] = analysis
+        self.cache.set_many(computed)
+        
+        answer_coverages = [list(item) for item in zip(*self.coverages)] or [[] for _ in self.nli_analyses]
+        return answer_coverages, self.semantic_scores, self.nli_analyses
+
+
+def create_component_cache(
+    backend: str,
+    max_entries: int = 200000,
+    path: str = "component_cache.sqlite3"
+) -> Optional[ComponentCache]:
+    """
+    Build a component cache from configuration
+    
+    Args:
+        backend: "memory", "sqlite" or "none"
+        max_entries: Maximum number of cached components
+        path: Database file for the sqlite backend
+    
+    Returns:
+        ComponentCache, or None when component caching is disabled
+    """
+    if backend == "none":
+        return None
+    if backend == "sqlite":
+        return ComponentCache(SQLiteCacheBackend(path, max_entries))
+    return ComponentCache(MemoryCacheBackend(max_entries))
@@ -0,0 +1,237 @@
+from typing import Dict, List, Optional, Tuple, Union
+import logging
+
+import numpy as np
+
+from app.services.idf_model import hash_strings
+from app.utils.text_preprocessing import TokenizedText, as_tokenized
+
+logger = logging.getLogger(__name__)
+
+# Consecutive tokens hashed together into one shingle
+SHINGLE_SIZE = 3
+
+# Candidate groups up to this size are verified pair by pair; larger ones
+# (e.g. hundreds of identical answers) only against their first member
+MAX_PAIRWISE_GROUP = 32
+
+# Shingles hashed per block, bounding the (shingles x permutations) scratch array
+BLOCK_SHINGLES = 65536
+
+# Odd multipliers combining consecutive token hashes into an order-sensitive shingle hash
+_SHINGLE_MULTIPLIERS = np.array(
+    [0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93, 0xFF51AFD7ED558CCD],
+    dtype=np.uint64
+)
+
+
+def lsh_parameters(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """
+    Choose the LSH banding for a similarity threshold
+    
+    Two texts with Jaccard similarity s share at least one band with
+    probability 1 - (1 - s^rows)^bands. The banding minimizing the chance of
+    pairing texts below the threshold plus the chance of missing texts above
+    it is picked.
+    
+    Args:
+        threshold: Jaccard similarity above which texts are near-duplicates
+        num_perm: Number of MinHash permutations
+    
+    Returns:
+        (bands, rows per band)
+    """
+    below = np.linspace(0.0, threshold, 200)
+    above = np.linspace(threshold, 1.0, 200)
+    best, best_error = (1, num_perm), float("inf")
+    for bands in range(1, num_perm + 1):
+        rows = num_perm // bands
+        false_positive = np.mean(1 - (1 - below ** rows) ** bands) * threshold
+        false_negative = np.mean((1 - above ** rows) ** bands) * (1 - threshold)
+        error = false_positive + false_negative
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+
+class _UnionFind:
+    """Disjoint sets of text positions, remembering the weakest link of each set"""
+    
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+        self.similarity = [1.0] * size
+    
+    def find(self, item: int) -> int:
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+    
+    def union(self, a: int, b: int, similarity: float):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[root_b] = root_a
+            self.similarity[root_a] = min(self.similarity[root_a], self.similarity[root_b])
+        self.similarity[root_a] = min(self.similarity[root_a], similarity)
+
+
+class DuplicateDetector:
+    """
+    Finds near-duplicate answers in a cohort with MinHash and LSH
+    Every answer gets a MinHash signature of its token shingles; signatures
+    are split into bands and hashed into buckets, so only answers sharing a
+    bucket are compared, in roughly linear time instead of comparing every
+    pair of answers.
+    """
+    
+    def __init__(self, threshold: float = 0.8, num_perm: int = 128, seed: int = 1):
+        """
+        Initialize the detector
+        
+        Args:
+            threshold: Estimated Jaccard similarity of token shingles above
+                which two answers are flagged as near-duplicates
+            num_perm: Number of MinHash permutations (signature length)
+            seed: Seed of the hash permutations
+        """
+        logger.info(f"Initializing duplicate detector (threshold {threshold}, {num_perm} permutations)")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands, self.rows = lsh_parameters(threshold, num_perm)
+        rng = np.random.default_rng(seed)
+        # Permutations h(x) = a * x + b mod 2^64, with odd a
+        self._a = rng.integers(1, 2 ** 63, num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, num_perm, dtype=np.uint64)
+        self._band_multipliers = rng.integers(1, 2 ** 63, self.rows, dtype=np.uint64) | np.uint64(1)
+    
+    def _shingles(self, texts: List[TokenizedText]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Hash the token shingles of every text
+        
+        Returns:
+            (shingle hashes of all texts concatenated, number of shingles per text)
+        """
+        vocabulary: Dict[str, int] = {}
+        token_ids = [[vocabulary.setdefault(token, len(vocabulary)) for token in text.tokens] for text in texts]
+        token_hashes = hash_strings(vocabulary)
+        
+        lengths = np.fromiter((len(ids) for ids in token_ids), dtype=np.int64, count=len(texts))
+        hashes = token_hashes[np.fromiter(
+            (token_id for ids in token_ids for token_id in ids), dtype=np.int64, count=int(lengths.sum())
+        )]
+        # Texts shorter than a shingle form one shingle of all their tokens
+        widths = np.minimum(lengths, SHINGLE_SIZE)
+        counts = np.where(lengths > 0, lengths - widths + 1, 0)
+        
+        starts = np.repeat(np.cumsum(lengths) - lengths, counts) + (
+            np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        )
+        shingle_widths = np.repeat(widths, counts)
+        shingles = np.zeros(len(starts), dtype=np.uint64)
+        for offset in range(SHINGLE_SIZE):
+            inside = offset < shingle_widths
+            shingles[inside] += hashes[starts[inside] + offset] * _SHINGLE_MULTIPLIERS[offset]
+        return shingles, counts
+    
+    def signatures(self, texts: List[Union[str, TokenizedText]]) -> np.ndarray:
+        """
+        MinHash signatures of texts
+        
+        Args:
+            texts: Cleaned texts, optionally already tokenized
+        
+        Returns:
+            (texts x num_perm) signature matrix; texts without tokens get the
+            maximum value everywhere and never match
+        """
+        texts = [as_tokenized(text) for text in texts]
+        shingles, counts = self._shingles(texts)
+        signatures = np.full((len(texts), self.num_perm), np.iinfo(np.uint64).max, dtype=np.uint64)
+        
+        # Process blocks of whole texts so each minimum is taken within a block
+        ends = np.cumsum(counts)
+        first = 0
+        while first < len(texts):
+            start = ends[first] - counts[first]
+            last = max(first + 1, int(np.searchsorted(ends, start + BLOCK_SHINGLES, side="right")))
+            block = shingles[start:ends[last - 1]]
+            block_counts = counts[first:last]
+            nonempty = block_counts > 0
+            if len(block):
+                # (permutations x shingles), so each minimum runs over contiguous memory
+                permuted = self._a[:, None] * block + self._b[:, None]
+                offsets = (np.cumsum(block_counts) - block_counts)[nonempty]
+                signatures[first:last][nonempty] = np.minimum.reduceat(permuted, offsets, axis=1).T
+            first = last
+        return signatures
+    
+    def _link(self, signatures: np.ndarray, members: np.ndarray, groups: _UnionFind):
+        """Verify the candidates of one LSH bucket and merge the similar ones"""
+        if len(members) <= MAX_PAIRWISE_GROUP:
+            member_signatures = signatures[members]
+            similarity = (member_signatures[:, None, :] == member_signatures[None, :, :]).mean(axis=2)
+            left, right = np.nonzero(np.triu(similarity >= self.threshold, k=1))
+            for i, j in zip(left.tolist(), right.tolist()):
+                groups.union(int(members[i]), int(members[j]), float(similarity[i, j]))
+        else:
+            similarity = (signatures[members[1:]] == signatures[members[0]]).mean(axis=1)
+            similar = similarity >= self.threshold
+            for member, value in zip(members[1:][similar].tolist(), similarity[similar].tolist()):
+                groups.union(int(members[0]), member, value)
+    
+    def find_duplicates(
+        self,
+        answers: List[Union[str, TokenizedText]],
+        reference: Optional[Union[str, TokenizedText]] = None,
+        positions: Optional[List[int]] = None
+    ) -> List[Dict]:
+        """
+        Group near-duplicate answers
+        
+        Args:
+            answers: Cleaned student answers, optionally already tokenized
+            reference: Cleaned correct answer; answers copying it are flagged too
+            positions: Position reported for each answer (default: its index)
+        
+        Returns:
+            One dict per group with the positions of its "answers", whether it
+            matches the "reference" and the lowest estimated "similarity" that
+            linked it, ordered by first position. A single answer is only
+            reported when it matches the reference.
+        """
+        texts = list(answers) + ([reference] if reference is not None else [])
+        if not texts:
+            return []
+        signatures = self.signatures(texts)
+        empty = (signatures == np.iinfo(np.uint64).max).all(axis=1)
+        
+        groups = _UnionFind(len(texts))
+        candidates = np.nonzero(~empty)[0]
+        for band in range(self.bands):
+            rows = signatures[candidates, band * self.rows:(band + 1) * self.rows]
+            keys = (rows * self._band_multipliers).sum(axis=1)
+            order = np.argsort(keys, kind="stable")
+            starts = np.flatnonzero(np.concatenate(([True], np.diff(keys[order]) != 0)))
+            sizes = np.diff(np.append(starts, len(order)))
+            for start, size in zip(starts[sizes > 1].tolist(), sizes[sizes > 1].tolist()):
+                self._link(signatures, candidates[order[start:start + size]], groups)
+        
+        reference_index = len(answers) if reference is not None else None
+        members: Dict[int, List[int]] = {}
+        for index in range(len(texts)):
+            members.setdefault(groups.find(index), []).append(index)
+        
+        flags = []
+        for root, indices in members.items():
+            matches_reference = reference_index is not None and indices[-1] == reference_index
+            answer_indices = indices[:-1] if matches_reference else indices
+            if len(answer_indices) < (1 if matches_reference else 2):
+                continue
+            flags.append({
+                "answers": [positions[i] if positions is not None else i for i in answer_indices],
+                "reference": matches_reference,
+                "similarity": round(groups.similarity[root], 4)
+            })
+        flags.sort(key=lambda flag: flag["answers"][0])
+        return flags
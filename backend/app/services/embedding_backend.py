@@ -0,0 +1,262 @@
+from typing import Dict, List, Optional
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+
+import numpy as np
+
+from app.utils.text_preprocessing import as_tokenized
+
+logger = logging.getLogger(__name__)
+
+# Name of the deterministic offline stand-in encoder
+HASHING_ENCODER = "hashing"
+
+# Placeholder limit of one SQLite query
+SQLITE_MAX_VARIABLES = 900
+
+
+class HashingEncoder:
+    """
+    Deterministic feature-hashing encoder
+    Needs no model download, so tests and offline setups can use the
+    embedding backend end to end
+    """
+    
+    def __init__(self, dimension: int = 256):
+        """
+        Args:
+            dimension: Size of the embedding vectors
+        """
+        self.name = f"{HASHING_ENCODER}-{dimension}"
+        self.dimension = dimension
+    
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """
+        Hash each word into a signed bucket of the embedding
+        
+        Args:
+            texts: Texts to encode
+        
+        Returns:
+            float32 matrix with one row per text
+        """
+        embeddings = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in as_tokenized(text).tokens:
+                digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+                value = int.from_bytes(digest, "little")
+                embeddings[row, value % self.dimension] += 1.0 if value >> 63 else -1.0
+        return embeddings
+
+
+class SentenceTransformerEncoder:
+    """Local CPU sentence-transformers model"""
+    
+    def __init__(self, model_name: str, batch_size: int = 32):
+        """
+        Load the model
+        
+        Args:
+            model_name: Hugging Face model name or local path
+            batch_size: Texts encoded per forward pass
+        """
+        from sentence_transformers import SentenceTransformer
+        
+        logger.info(f"Loading sentence embedding model {model_name}...")
+        self.name = model_name
+        self.batch_size = batch_size
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.dimension = self.model.get_sentence_embedding_dimension()
+    
+    def share_memory(self):
+        """Move the model weights to shared memory, so forked workers never copy them"""
+        self.model.share_memory()
+    
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """
+        Encode texts with the model
+        
+        Args:
+            texts: Texts to encode
+        
+        Returns:
+            float32 matrix with one row per text
+        """
+        return self.model.encode(
+            texts,
+            batch_size=self.batch_size,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        ).astype(np.float32)
+
+
+class EmbeddingCache:
+    """
+    Content-addressed SQLite store of embeddings
+    Rows are keyed by a hash of the encoder name and the text, so a text is
+    encoded once per model across requests and restarts
+    """
+    
+    def __init__(self, path: str):
+        """
+        Args:
+            path: SQLite database file
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._connect()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embedding_cache ("
+            "key TEXT PRIMARY KEY, embedding BLOB NOT NULL)"
+        )
+        self._conn.commit()
+    
+    def _connect(self):
+        """Open the database connection owned by this process"""
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._pid = os.getpid()
+    
+    def _connection(self) -> sqlite3.Connection:
+        """
+        The connection, reopened after a fork
+        
+        SQLite connections must not be used across fork, so a worker forked
+        from the process that created the cache opens its own.
+        """
+        if self._pid != os.getpid():
+            self._connect()
+        return self._conn
+    
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """Return the stored embeddings of the keys that are present"""
+        found = {}
+        with self._lock:
+            conn = self._connection()
+            for i in range(0, len(keys), SQLITE_MAX_VARIABLES):
+                chunk = keys[i:i + SQLITE_MAX_VARIABLES]
+                rows = conn.execute(
+                    f"SELECT key, embedding FROM embedding_cache WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+        return found
+    
+    def set_many(self, embeddings: Dict[str, np.ndarray]):
+        """Store embeddings by key"""
+        with self._lock:
+            conn = self._connection()
+            conn.executemany(
+                "INSERT OR REPLACE INTO embedding_cache (key, embedding) VALUES (?, ?)",
+                [(key, vector.astype(np.float32).tobytes()) for key, vector in embeddings.items()]
+            )
+            conn.commit()
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection().execute("SELECT COUNT(*) FROM embedding_cache").fetchone()[0]
+    
+    def close(self):
+        """Close the database connection opened by this process"""
+        with self._lock:
+            if self._pid == os.getpid():
+                self._conn.close()
+
+
+class EmbeddingBackend:
+    """
+    Batched, cached text embedding
+    Only texts missing from the cache reach the encoder, in batches
+    """
+    
+    def __init__(self, encoder, cache: Optional[EmbeddingCache] = None, batch_size: int = 32):
+        """
+        Args:
+            encoder: HashingEncoder or SentenceTransformerEncoder
+            cache: Embedding store (None disables caching)
+            batch_size: Texts sent to the encoder per call
+        """
+        logger.info(f"Initializing embedding backend with encoder {encoder.name}")
+        self.encoder = encoder
+        self.cache = cache
+        self.batch_size = batch_size
+    
+    def _key(self, text: str) -> str:
+        """Content address of a text's embedding under the current encoder"""
+        return hashlib.sha256(f"{self.encoder.name}\0{text}".encode("utf-8")).hexdigest()
+    
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts, encoding each distinct uncached text once
+        
+        Args:
+            texts: Texts to embed
+        
+        Returns:
+            L2-normalized float32 matrix with one row per text (all-zero rows
+            for texts without any content)
+        """
+        keys = [self._key(text) for text in texts]
+        vectors = self.cache.get_many(list(set(keys))) if self.cache is not None else {}
+        
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors:
+                missing.setdefault(key, text)
+        
+        if missing:
+            missing_keys = list(missing)
+            encoded = {}
+            for i in range(0, len(missing_keys), self.batch_size):
+                batch = missing_keys[i:i + self.batch_size]
+                for key, vector in zip(batch, self.encoder.encode([missing[k] for k in batch])):
+                    encoded[key] = vector
+            if self.cache is not None:
+                self.cache.set_many(encoded)
+            vectors.update(encoded)
+            logger.info(f"Encoded {len(missing_keys)} texts ({len(texts) - len(missing_keys)} reused)")
+        
+        if not texts:
+            return np.zeros((0, self.encoder.dimension), dtype=np.float32)
+        embeddings = np.vstack([vectors[key] for key in keys]).astype(np.float32)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return np.divide(embeddings, norms, out=np.zeros_like(embeddings), where=norms > 0)
+    
+    def share_memory(self):
+        """Move the encoder's weights to shared memory, if it has any"""
+        if hasattr(self.encoder, "share_memory"):
+            self.encoder.share_memory()
+    
+    def close(self):
+        """Release the cache's resources"""
+        if self.cache is not None:
+            self.cache.close()
+
+
+def create_embedding_backend(
+    model_name: str,
+    cache_path: str = "",
+    batch_size: int = 32
+) -> EmbeddingBackend:
+    """
+    Build an embedding backend from configuration
+    
+    Args:
+        model_name: sentence-transformers model, or "hashing" for the
+            deterministic offline encoder
+        cache_path: SQLite file of the embedding cache (empty disables it)
+        batch_size: Texts encoded per call
+    
+    Returns:
+        EmbeddingBackend
+    """
+    if model_name == HASHING_ENCODER:
+        encoder = HashingEncoder()
+    else:
+        encoder = SentenceTransformerEncoder(model_name, batch_size=batch_size)
+    cache = EmbeddingCache(cache_path) if cache_path else None
+    return EmbeddingBackend(encoder, cache=cache, batch_size=batch_size)
@@ -0,0 +1,622 @@
+from typing import Any, Callable, List, Dict, FrozenSet, Optional, Tuple, Union
+import asyncio
+import json
+import logging
+
+import numpy as np
+
+from app.config import settings
+from app.models import EvaluationResponse, ScoreBreakdown
+from app.services.rubric_matcher import CompiledRubric, RubricMatcher, create_rubric_matcher
+from app.services.semantic_analyzer import SemanticAnalyzer, create_semantic_analyzer
+from app.services.nli_analyzer import NLIAnalyzer
+from app.services.score_aggregator import ScoreAggregator
+from app.services.analysis_executor import AnalysisExecutor
+from app.services.component_cache import ComponentCache, ComponentPlan
+from app.services.metrics import metrics
+from app.services.question_store import QuestionArtifacts, StoredQuestion
+from app.utils.text_preprocessing import TokenizedText, as_tokenized, tokenize
+
+logger = logging.getLogger(__name__)
+
+# Analyses that can be left out to shed load; the rubric analysis always runs
+SKIPPABLE_COMPONENTS = ("semantic", "nli")
+SKIPPED_FEEDBACK = "Not assessed (skipped because the server was overloaded)"
+
+
+async def _no_components() -> list:
+    """Result of an analysis with nothing left to compute"""
+    return []
+
+
+async def _skipped_components(count: Optional[int] = None) -> Optional[list]:
+    """Result of a skipped analysis: None, or a None for each of count answers"""
+    return [None] * count if count is not None else None
+
+
+def analyzer_factories(
+    score_aggregator: Optional[Callable[[], ScoreAggregator]] = None
+) -> Dict[str, Callable[[], Any]]:
+    """
+    Constructor of each analyzer service, by name, as configured in settings
+    
+    Args:
+        score_aggregator: Builds the score aggregator, e.g. ScoreWeightsFile.aggregator
+            (default: leave the score aggregator out)
+    """
+    factories = {
+        "rubric_matcher": lambda: create_rubric_matcher(
+            stemming=settings.rubric_stemming,
+            synonyms_path=settings.rubric_synonyms_path,
+            loose_phrase_credit=settings.rubric_loose_phrase_credit
+        ),
+        "semantic_analyzer": lambda: create_semantic_analyzer(
+            backend=settings.semantic_backend,
+            model_name=settings.semantic_model,
+            cache_path=settings.embedding_cache_path,
+            batch_size=settings.embedding_batch_size,
+            idf_model_dir=settings.idf_model_dir if settings.semantic_idf == "corpus" else "",
+            idf_min_documents=settings.idf_min_documents
+        ),
+        "nli_analyzer": lambda: NLIAnalyzer(mode=settings.nli_mode)
+    }
+    if score_aggregator is not None:
+        factories["score_aggregator"] = score_aggregator
+    return factories
+
+
+class EvaluationPipeline:
+    """
+    Runs the rubric, semantic and NLI analyzers over cleaned answers
+    and aggregates their results into evaluation responses
+    """
+    
+    def __init__(
+        self,
+        rubric_matcher: RubricMatcher,
+        semantic_analyzer: Optional[SemanticAnalyzer],
+        nli_analyzer: Optional[NLIAnalyzer],
+        score_aggregator: ScoreAggregator,
+        component_cache: Optional[ComponentCache] = None
+    ):
+        """
+        Initialize the pipeline with already loaded services
+        
+        Args:
+            rubric_matcher: Rubric coverage service
+            semantic_analyzer: Semantic similarity service (None while it
+                loads: only evaluations skipping "semantic" can run)
+            nli_analyzer: Consistency/contradiction service (None while it
+                loads: only evaluations skipping "nli" can run)
+            score_aggregator: Weighted score aggregation service
+            component_cache: Reuse the analyzer results of batches whose inputs
+                were seen before, recomputing only the changed components
+        """
+        self.rubric_matcher = rubric_matcher
+        self.semantic_analyzer = semantic_analyzer
+        self.nli_analyzer = nli_analyzer
+        self.score_aggregator = score_aggregator
+        self.component_cache = component_cache
+    
+    def fingerprint(self) -> Optional[str]:
+        """
+        Identify the scoring configuration: aggregation weights and analyzer versions
+        
+        Cached results are keyed on this, so changing any of them invalidates
+        them. None while an analyzer is not loaded: results cannot be looked up.
+        """
+        if self.semantic_analyzer is None or self.nli_analyzer is None:
+            return None
+        return json.dumps([
+            self.score_aggregator.rubric_weight,
+            self.score_aggregator.semantic_weight,
+            self.score_aggregator.nli_weight,
+            self.score_aggregator.grade_thresholds,
+            self.rubric_matcher.version,
+            self.semantic_analyzer.version,
+            self.nli_analyzer.version
+        ])
+    
+    def prepare_question(self, question: StoredQuestion) -> QuestionArtifacts:
+        """
+        Precompute the reference-side artifacts of a registered question
+        
+        Tokenizes the correct answer, computes its semantic features (n-grams or
+        embedding) and, for sentence-level NLI, its sentence features, and
+        compiles the rubrics.
+        
+        Args:
+            question: Stored question with a cleaned correct answer
+        
+        Returns:
+            QuestionArtifacts reused by every evaluation of the question
+        """
+        correct_answer = tokenize(question.correct_answer)
+        # Features of analyzers still loading are computed on first use instead
+        if self.nli_analyzer is not None and self.nli_analyzer.mode == "sentence":
+            correct_answer.sentence_features
+        if self.semantic_analyzer is not None:
+            self.semantic_analyzer.prepare_reference(correct_answer)
+        return QuestionArtifacts(
+            question=question,
+            correct_answer=correct_answer,
+            compiled_rubric=self.rubric_matcher.compile_rubrics(question.rubrics)
+        )
+    
+    def build_response(
+        self,
+        rubric_analysis: Dict,
+        semantic_score: Optional[float],
+        nli_analysis: Optional[Dict],
+        total_marks: float,
+        detail: bool = True,
+        final_score: Optional[float] = None
+    ) -> EvaluationResponse:
+        """
+        Aggregate analyzer results into an evaluation response
+        
+        A skipped semantic or NLI analysis (None) gets no weight: the final
+        score is renormalized over the others, and the response lists it in
+        skipped_components with a score of 0.
+        
+        Args:
+            rubric_analysis: Result of rubric coverage analysis
+            semantic_score: Semantic similarity score (0-1), None if skipped
+            nli_analysis: Result of NLI analysis, None if skipped
+            total_marks: Total marks for the question
+            detail: Also build the feedback text and rubric concept lists;
+                without it only the scores and grade are filled in
+            final_score: Aggregated score, if already computed for a whole batch
+        
+        Returns:
+            EvaluationResponse with scores and feedback
+        """
+        rubric_score = rubric_analysis["score"]
+        nli_score = nli_analysis["score"] if nli_analysis is not None else None
+        skipped = [name for name, score in (("semantic", semantic_score), ("nli", nli_score)) if score is None]
+        
+        if final_score is None:
+            final_score = self.score_aggregator.without(skipped).aggregate_scores(
+                rubric_score=rubric_score,
+                semantic_score=semantic_score or 0.0,
+                nli_score=nli_score or 0.0
+            )
+        
+        # Calculate final grades
+        suggested_grade = final_score * total_marks
+        percentage = final_score * 100
+        
+        scores = ScoreBreakdown(
+            rubric_score=rubric_score,
+            semantic_score=semantic_score or 0.0,
+            nli_score=nli_score or 0.0,
+            final_score=final_score
+        )
+        if not detail:
+            return EvaluationResponse(
+                scores=scores,
+                suggested_grade=round(suggested_grade, 2),
+                total_marks=total_marks,
+                percentage=round(percentage, 2),
+                skipped_components=skipped or None
+            )
+        
+        comprehensive_feedback = self.score_aggregator.generate_comprehensive_feedback(
+            rubric_feedback=self.rubric_matcher.get_detailed_feedback(rubric_analysis),
+            semantic_feedback=(
+                self.semantic_analyzer.get_similarity_feedback(semantic_score)
+                if semantic_score is not None else SKIPPED_FEEDBACK
+            ),
+            nli_feedback=(
+                self.nli_analyzer.get_entailment_feedback(nli_analysis)
+                if nli_analysis is not None else SKIPPED_FEEDBACK
+            ),
+            final_score=final_score,
+            total_marks=total_marks
+        )
+        
+        return EvaluationResponse(
+            scores=scores,
+            suggested_grade=round(suggested_grade, 2),
+            total_marks=total_marks,
+            percentage=round(percentage, 2),
+            feedback=comprehensive_feedback,
+            rubric_analysis={
+                "covered_concepts": rubric_analysis["covered_concepts"],
+                "partial_concepts": rubric_analysis["partial_concepts"],
+                "missing_concepts": rubric_analysis["missing_concepts"],
+                "total_rubrics": rubric_analysis["total_rubrics"]
+            },
+            skipped_components=skipped or None
+        )
+    
+    def build_responses(
+        self,
+        rubric_analyses: List[Dict],
+        semantic_scores: List[Optional[float]],
+        nli_analyses: List[Optional[Dict]],
+        total_marks: float,
+        detail: bool = True
+    ) -> List[EvaluationResponse]:
+        """
+        Aggregate the analyzer results of a batch, weighting all scores at once
+        
+        Args:
+            rubric_analyses: Result of rubric coverage analysis per answer
+            semantic_scores: Semantic similarity score per answer (0-1), None if skipped
+            nli_analyses: Result of NLI analysis per answer, None if skipped
+            total_marks: Total marks for the question
+            detail: Also build the feedback text and rubric concept lists
+        
+        Returns:
+            List of EvaluationResponse, one per answer
+        """
+        semantic_scores = [float(score) if score is not None else None for score in semantic_scores]
+        skipped = [
+            name for name, values in (("semantic", semantic_scores), ("nli", nli_analyses)) if None in values
+        ]
+        final_scores = self.score_aggregator.without(skipped).aggregate_batch(
+            rubric_scores=np.array([analysis["score"] for analysis in rubric_analyses], dtype=np.float64),
+            semantic_scores=np.array([score or 0.0 for score in semantic_scores], dtype=np.float64),
+            nli_scores=np.array(
+                [analysis["score"] if analysis is not None else 0.0 for analysis in nli_analyses], dtype=np.float64
+            )
+        )
+        return [
+            self.build_response(rubric_analysis, semantic_score, nli_analysis, total_marks, detail, final_score)
+            for rubric_analysis, semantic_score, nli_analysis, final_score
+            in zip(rubric_analyses, semantic_scores, nli_analyses, final_scores.tolist())
+        ]
+    
+    def _plan_components(
+        self,
+        student_answers: List[TokenizedText],
+        rubrics: Union[List[str], CompiledRubric],
+        correct_answer: TokenizedText,
+        cohort_idf: bool
+    ) -> ComponentPlan:
+        """Look up the cached analyzer results of a tokenized batch"""
+        return self.component_cache.plan(
+            student_answers=student_answers,
+            rubrics=rubrics.rubrics if isinstance(rubrics, CompiledRubric) else rubrics,
+            correct_answer=correct_answer,
+            versions=(self.rubric_matcher.version, self.semantic_analyzer.version, self.nli_analyzer.version),
+            semantic_cacheable=not self.semantic_analyzer.depends_on_context(cohort_idf)
+        )
+    
+    def _complete_components(
+        self,
+        plan: ComponentPlan,
+        rubrics: Union[List[str], CompiledRubric],
+        coverages: List[List[float]],
+        semantic_scores: List[float],
+        nli_analyses: List[Dict]
+    ) -> Tuple[List[Dict], List[float], List[Dict]]:
+        """Merge computed components into a plan and score the rubric coverage of every answer"""
+        rubrics = rubrics.rubrics if isinstance(rubrics, CompiledRubric) else rubrics
+        coverages, semantic_scores, nli_analyses = plan.complete(coverages, semantic_scores, nli_analyses)
+        rubric_analyses = [self.rubric_matcher.score_coverage(rubrics, coverage) for coverage in coverages]
+        return rubric_analyses, semantic_scores, nli_analyses
+    
+    def evaluate(
+        self,
+        student_answer: str,
+        rubrics: List[str],
+        correct_answer: str,
+        total_marks: float,
+        course: Optional[str] = None,
+        detail: bool = True
+    ) -> EvaluationResponse:
+        """
+        Evaluate a single cleaned student answer
+        
+        Args:
+            student_answer: Cleaned student's response
+            rubrics: List of key concepts/rubrics
+            correct_answer: Cleaned model/correct answer
+            total_marks: Total marks for the question
+            course: Course or question bank the answer belongs to (selects the IDF model)
+            detail: Also build the feedback text and rubric concept lists
+        
+        Returns:
+            EvaluationResponse with scores and feedback
+        """
+        # Tokenize once for all analyzers
+        with metrics.stage("tokenize"):
+            student_answer = tokenize(student_answer)
+            correct_answer = tokenize(correct_answer)
+        
+        # 1. Rubric Analysis
+        logger.info("Performing rubric analysis...")
+        with metrics.stage("rubric"):
+            rubric_analysis = self.rubric_matcher.analyze_rubric_coverage(
+                student_answer=student_answer,
+                rubrics=rubrics,
+                correct_answer=correct_answer
+            )
+        
+        # 2. Semantic Similarity Analysis
+        logger.info("Calculating semantic similarity...")
+        with metrics.stage("semantic"):
+            semantic_score = self.semantic_analyzer.calculate_similarity(
+                student_answer=student_answer,
+                correct_answer=correct_answer,
+                course=course
+            )
+        
+        # 3. NLI Analysis (Contradiction Detection)
+        logger.info("Performing NLI analysis...")
+        with metrics.stage("nli"):
+            nli_analysis = self.nli_analyzer.analyze_entailment(
+                student_answer=student_answer,
+                correct_answer=correct_answer
+            )
+        
+        # 4. Aggregate Scores and Generate Feedback
+        logger.info("Aggregating scores...")
+        with metrics.stage("aggregation"):
+            return self.build_response(rubric_analysis, semantic_score, nli_analysis, total_marks, detail)
+    
+    def evaluate_batch(
+        self,
+        student_answers: List[Union[str, TokenizedText]],
+        rubrics: Union[List[str], CompiledRubric],
+        correct_answer: Union[str, TokenizedText],
+        total_marks: float,
+        cohort_idf: bool = False,
+        course: Optional[str] = None,
+        detail: bool = True
+    ) -> List[EvaluationResponse]:
+        """
+        Evaluate many cleaned student answers to the same question
+        
+        Reference-side work (rubric keywords, correct answer keywords and
+        negation, TF-IDF vocabulary) is done once for the whole batch and
+        semantic similarity is computed for all answers with sparse products.
+        
+        Args:
+            student_answers: Cleaned students' responses, optionally already tokenized
+            rubrics: List of key concepts/rubrics, or their compiled form
+            correct_answer: Cleaned model/correct answer, optionally already tokenized
+            total_marks: Total marks for the question
+            cohort_idf: Weight semantic similarity with IDF fitted over the whole batch
+            course: Course or question bank the answers belong to (selects the IDF model)
+            detail: Also build the feedback text and rubric concept lists
+        
+        Returns:
+            List of EvaluationResponse, one per answer, in input order
+        """
+        logger.info(f"Evaluating batch of {len(student_answers)} answers...")
+        
+        # Tokenize once for all analyzers
+        with metrics.stage("tokenize"):
+            student_answers = [as_tokenized(answer) for answer in student_answers]
+            correct_answer = as_tokenized(correct_answer)
+        
+        if self.component_cache is not None:
+            # Only the components whose inputs changed are computed
+            with metrics.stage("component_cache"):
+                plan = self._plan_components(student_answers, rubrics, correct_answer, cohort_idf)
+            with metrics.stage("rubric"):
+                coverages = self.rubric_matcher.rubric_item_coverage(
+                    student_answers=[student_answers[i] for i in plan.rubric_answers],
+                    rubrics=plan.missing_rubrics
+                ) if plan.rubric_answers else []
+            with metrics.stage("semantic"):
+                semantic_scores = self.semantic_analyzer.calculate_similarity_batch(
+                    correct_answer=correct_answer,
+                    answers=[student_answers[i] for i in plan.semantic_answers],
+                    cohort_idf=cohort_idf,
+                    course=course
+                ) if plan.semantic_answers else []
+            with metrics.stage("nli"):
+                nli_analyses = self.nli_analyzer.analyze_entailment_batch(
+                    student_answers=[student_answers[i] for i in plan.nli_answers],
+                    correct_answer=correct_answer
+                ) if plan.nli_answers else []
+            with metrics.stage("component_cache"):
+                rubric_analyses, semantic_scores, nli_analyses = self._complete_components(
+                    plan, rubrics, coverages, semantic_scores, nli_analyses
+                )
+        else:
+            with metrics.stage("rubric"):
+                rubric_analyses = self.rubric_matcher.analyze_rubric_coverage_batch(
+                    student_answers=student_answers,
+                    rubrics=rubrics,
+                    correct_answer=correct_answer
+                )
+            with metrics.stage("semantic"):
+                semantic_scores = self.semantic_analyzer.calculate_similarity_batch(
+                    correct_answer=correct_answer,
+                    answers=student_answers,
+                    cohort_idf=cohort_idf,
+                    course=course
+                )
+            with metrics.stage("nli"):
+                nli_analyses = self.nli_analyzer.analyze_entailment_batch(
+                    student_answers=student_answers,
+                    correct_answer=correct_answer
+                )
+        
+        with metrics.stage("aggregation"):
+            return self.build_responses(rubric_analyses, semantic_scores, nli_analyses, total_marks, detail)
+    
+    async def evaluate_async(
+        self,
+        executor: AnalysisExecutor,
+        student_answer: str,
+        rubrics: List[str],
+        correct_answer: str,
+        total_marks: float,
+        course: Optional[str] = None,
+        detail: bool = True,
+        skip: FrozenSet[str] = frozenset()
+    ) -> EvaluationResponse:
+        """
+        Evaluate a single cleaned student answer without blocking the event loop
+        
+        The rubric, semantic and NLI analyses are dispatched concurrently to
+        the executor and gathered before aggregation.
+        
+        Args:
+            executor: Pool the analysis runs on
+            student_answer: Cleaned student's response
+            rubrics: List of key concepts/rubrics
+            correct_answer: Cleaned model/correct answer
+            total_marks: Total marks for the question
+            course: Course or question bank the answer belongs to (selects the IDF model)
+            detail: Also build the feedback text and rubric concept lists
+            skip: Analyses to leave out, from SKIPPABLE_COMPONENTS
+        
+        Returns:
+            EvaluationResponse with scores and feedback
+        """
+        if self.component_cache is not None and not skip:
+            # Cached components are looked up the same way as for a batch
+            responses = await self.evaluate_batch_async(
+                executor, [student_answer], rubrics, correct_answer, total_marks, course=course, detail=detail
+            )
+            return responses[0]
+        
+        student_answer, correct_answer = await metrics.timed("tokenize", asyncio.gather(
+            executor.run(tokenize, student_answer),
+            executor.run(tokenize, correct_answer)
+        ))
+        
+        logger.info("Dispatching rubric, semantic and NLI analyses...")
+        rubric_analysis, semantic_score, nli_analysis = await asyncio.gather(
+            metrics.timed("rubric", executor.run_analyzer(
+                "rubric_matcher", "analyze_rubric_coverage",
+                student_answer=student_answer,
+                rubrics=rubrics,
+                correct_answer=correct_answer
+            )),
+            metrics.timed("semantic", executor.run_analyzer(
+                "semantic_analyzer", "calculate_similarity",
+                student_answer=student_answer,
+                correct_answer=correct_answer,
+                course=course
+            )) if "semantic" not in skip else _skipped_components(),
+            metrics.timed("nli", executor.run_analyzer(
+                "nli_analyzer", "analyze_entailment",
+                student_answer=student_answer,
+                correct_answer=correct_answer
+            )) if "nli" not in skip else _skipped_components()
+        )
+        
+        logger.info("Aggregating scores...")
+        return await metrics.timed("aggregation", executor.run(
+            self.build_response, rubric_analysis, semantic_score, nli_analysis, total_marks, detail
+        ))
+    
+    async def evaluate_batch_async(
+        self,
+        executor: AnalysisExecutor,
+        student_answers: List[Union[str, TokenizedText]],
+        rubrics: Union[List[str], CompiledRubric],
+        correct_answer: Union[str, TokenizedText],
+        total_marks: float,
+        cohort_idf: bool = False,
+        course: Optional[str] = None,
+        detail: bool = True,
+        skip: FrozenSet[str] = frozenset()
+    ) -> List[EvaluationResponse]:
+        """
+        Evaluate many cleaned student answers without blocking the event loop
+        
+        Args:
+            executor: Pool the analysis runs on
+            student_answers: Cleaned students' responses, optionally already tokenized
+            rubrics: List of key concepts/rubrics, or their compiled form
+            correct_answer: Cleaned model/correct answer, optionally already
+                tokenized so it can be shared across several batches
+            total_marks: Total marks for the question
+            cohort_idf: Weight semantic similarity with IDF fitted over the whole batch
+            course: Course or question bank the answers belong to (selects the IDF model)
+            detail: Also build the feedback text and rubric concept lists
+            skip: Analyses to leave out, from SKIPPABLE_COMPONENTS; degraded
+                evaluations bypass the component cache
+        
+        Returns:
+            List of EvaluationResponse, one per answer, in input order
+        """
+        logger.info(f"Evaluating batch of {len(student_answers)} answers...")
+        
+        student_answers, correct_answer = await metrics.timed("tokenize", asyncio.gather(
+            executor.run(lambda: [as_tokenized(answer) for answer in student_answers]),
+            executor.run(as_tokenized, correct_answer)
+        ))
+        
+        if self.component_cache is not None and not skip:
+            rubric_analyses, semantic_scores, nli_analyses = await self._evaluate_components_async(
+                executor, student_answers, rubrics, correct_answer, cohort_idf, course
+            )
+            return await metrics.timed("aggregation", executor.run(
+                self.build_responses, rubric_analyses, semantic_scores, nli_analyses, total_marks, detail
+            ))
+        
+        rubric_analyses, semantic_scores, nli_analyses = await asyncio.gather(
+            metrics.timed("rubric", executor.run_analyzer(
+                "rubric_matcher", "analyze_rubric_coverage_batch",
+                student_answers=student_answers,
+                rubrics=rubrics,
+                correct_answer=correct_answer
+            )),
+            metrics.timed("semantic", executor.run_analyzer(
+                "semantic_analyzer", "calculate_similarity_batch",
+                correct_answer=correct_answer,
+                answers=student_answers,
+                cohort_idf=cohort_idf,
+                course=course
+            )) if "semantic" not in skip else _skipped_components(len(student_answers)),
+            metrics.timed("nli", executor.run_analyzer(
+                "nli_analyzer", "analyze_entailment_batch",
+                student_answers=student_answers,
+                correct_answer=correct_answer
+            )) if "nli" not in skip else _skipped_components(len(student_answers))
+        )
+        
+        return await metrics.timed("aggregation", executor.run(
+            self.build_responses, rubric_analyses, semantic_scores, nli_analyses, total_marks, detail
+        ))
+    
+    async def _evaluate_components_async(
+        self,
+        executor: AnalysisExecutor,
+        student_answers: List[TokenizedText],
+        rubrics: Union[List[str], CompiledRubric],
+        correct_answer: TokenizedText,
+        cohort_idf: bool,
+        course: Optional[str]
+    ) -> Tuple[List[Dict], List[float], List[Dict]]:
+        """
+        Run the analyzers on the components of a batch missing from the component cache
+        
+        Returns:
+            (rubric analysis, semantic score and NLI result of every answer)
+        """
+        plan = await metrics.timed("component_cache", executor.run(
+            self._plan_components, student_answers, rubrics, correct_answer, cohort_idf
+        ))
+        coverages, semantic_scores, nli_analyses = await asyncio.gather(
+            metrics.timed("rubric", executor.run_analyzer(
+                "rubric_matcher", "rubric_item_coverage",
+                student_answers=[student_answers[i] for i in plan.rubric_answers],
+                rubrics=plan.missing_rubrics
+            )) if plan.rubric_answers else _no_components(),
+            metrics.timed("semantic", executor.run_analyzer(
+                "semantic_analyzer", "calculate_similarity_batch",
+                correct_answer=correct_answer,
+                answers=[student_answers[i] for i in plan.semantic_answers],
+                cohort_idf=cohort_idf,
+                course=course
+            )) if plan.semantic_answers else _no_components(),
+            metrics.timed("nli", executor.run_analyzer(
+                "nli_analyzer", "analyze_entailment_batch",
+                student_answers=[student_answers[i] for i in plan.nli_answers],
+                correct_answer=correct_answer
+            )) if plan.nli_answers else _no_components()
+        )
+        return await metrics.timed("component_cache", executor.run(
+            self._complete_components, plan, rubrics, coverages, semantic_scores, nli_analyses
+        ))
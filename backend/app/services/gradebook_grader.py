@@ -0,0 +1,104 @@
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+import logging
+
+from app.models import StreamEvaluationResult
+from app.services.metrics import metrics
+from app.services.stream_evaluator import StreamEvaluator
+from app.utils.gradebook_files import GradebookWriter
+
+logger = logging.getLogger(__name__)
+
+
+def gradebook_row(result: StreamEvaluationResult, rubrics: List[str]) -> Dict[str, Any]:
+    """
+    Flatten one evaluation into a results file row
+    
+    Args:
+        result: Evaluation of one gradebook answer
+        rubrics: The question's rubrics, in column order
+    
+    Returns:
+        Dict of GradebookWriter columns; score columns are empty for answers
+        that could not be scored
+    """
+    row = {"index": result.index, "id": result.id, "error": result.error}
+    evaluation = result.result
+    if evaluation is None:
+        return row
+    
+    row.update(evaluation.scores.model_dump())
+    row["suggested_grade"] = evaluation.suggested_grade
+    row["total_marks"] = evaluation.total_marks
+    row["percentage"] = evaluation.percentage
+    analysis = evaluation.rubric_analysis or {}
+    covered = set(analysis.get("covered_concepts", ()))
+    partial = set(analysis.get("partial_concepts", ()))
+    for i, rubric in enumerate(rubrics):
+        row[f"rubric_{i + 1}"] = "covered" if rubric in covered else "partial" if rubric in partial else "missing"
+    return row
+
+
+async def read_chunks(
+    chunks: Iterator[List[Tuple[Optional[str], str]]],
+    run: Callable[..., Awaitable]
+) -> AsyncIterator[List[Tuple[Optional[str], str]]]:
+    """
+    Pull chunks from a blocking gradebook reader without blocking the event loop
+    
+    Args:
+        chunks: Chunk iterator, e.g. from iter_gradebook
+        run: Runs a blocking call off the event loop (AnalysisExecutor.run)
+    
+    Yields:
+        Chunks of (id, answer) pairs
+    """
+    while True:
+        chunk = await run(next, chunks, None)
+        if chunk is None:
+            break
+        yield chunk
+
+
+async def _answer_lines(chunks: AsyncIterator[List[Tuple[Optional[str], str]]]) -> AsyncIterator[Tuple[Any, str]]:
+    """Gradebook rows as the (parsed line, parse error) pairs StreamEvaluator reads"""
+    async for chunk in chunks:
+        for student_id, answer in chunk:
+            yield {"student_answer": answer, "id": student_id}, ""
+
+
+async def grade_gradebook(
+    chunks: AsyncIterator[List[Tuple[Optional[str], str]]],
+    stream_evaluator: StreamEvaluator,
+    writer: GradebookWriter,
+    rubrics: List[str],
+    chunk_rows: int = 1000
+) -> AsyncIterator[int]:
+    """
+    Grade the answers of a gradebook and write the results chunk by chunk
+    
+    Answers go through the stream evaluator's bounded queues, so at most a
+    chunk of input rows, the queued answers and a chunk of result rows are
+    held in memory whatever the size of the file.
+    
+    Args:
+        chunks: Chunks of (id, answer) pairs
+        stream_evaluator: Scores the answers to the gradebook's question
+        writer: Results file writer, closed once every row is written
+        rubrics: The question's rubrics, in column order
+        chunk_rows: Result rows written at a time
+    
+    Yields:
+        Number of rows written, after each chunk
+    """
+    rows = []
+    async for result in stream_evaluator.results(_answer_lines(chunks)):
+        rows.append(gradebook_row(result, rubrics))
+        if len(rows) >= chunk_rows:
+            with metrics.stage("serialization"):
+                writer.write(rows)
+            yield len(rows)
+            rows = []
+    with metrics.stage("serialization"):
+        writer.write(rows)
+        writer.close()
+    yield len(rows)
@@ -0,0 +1,259 @@
+from typing import Dict, Iterable, List, Optional
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+
+import numpy as np
+
+from app.utils.text_preprocessing import TokenizedText
+
+try:
+    import fcntl
+except ImportError:  # Windows: saves from several processes are not serialized
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Layout of a model file: one uint64 .npy array holding
+# [FORMAT_VERSION, n_terms, n_documents, term hashes..., document frequencies..., document hashes...]
+# with term and document hashes sorted, so lookups are binary searches on a memory map
+FORMAT_VERSION = 1
+HEADER_SIZE = 3
+
+# Course name used when a request does not name one
+DEFAULT_COURSE = "default"
+
+# Seconds between checks for a model file rewritten by another process
+REFRESH_INTERVAL = 1.0
+
+_SAFE_NAME = re.compile(r"^[A-Za-z0-9_.-]{1,64}$")
+
+
+def hash_strings(values: Iterable[str]) -> np.ndarray:
+    """Stable 64-bit hashes of strings (independent of PYTHONHASHSEED)"""
+    return np.fromiter(
+        (
+            int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "little")
+            for value in values
+        ),
+        dtype=np.uint64
+    )
+
+
+def _lookup(keys: np.ndarray, values: Optional[np.ndarray], query: np.ndarray) -> np.ndarray:
+    """Values of query keys in a sorted key array (0 where absent, 1 if values is None)"""
+    if len(keys) == 0:
+        return np.zeros(len(query), dtype=np.int64)
+    positions = np.searchsorted(keys, query)
+    clipped = np.minimum(positions, len(keys) - 1)
+    found = keys[clipped] == query
+    if values is None:
+        return found.astype(np.int64)
+    return np.where(found, values[clipped], 0).astype(np.int64)
+
+
+class IDFModel:
+    """
+    Document frequencies of terms over every distinct text seen for a course
+    Grows with partial_fit as answers and references arrive; each distinct
+    text is counted once. Updates are buffered in memory and merged into the
+    memory-mapped model file every flush_every documents and on save.
+    """
+    
+    def __init__(self, path: str, flush_every: int = 500):
+        """
+        Args:
+            path: Model file (.npy), created on first save
+            flush_every: Buffered new documents that trigger a save
+        """
+        self.path = path
+        self.flush_every = flush_every
+        self._lock = threading.Lock()
+        self._terms = np.zeros(0, dtype=np.uint64)
+        self._frequencies = np.zeros(0, dtype=np.uint64)
+        self._documents = np.zeros(0, dtype=np.uint64)
+        self._mtime = None
+        self._checked = 0.0
+        # Buffered updates: unique term hashes of each new document, and their total counts
+        self._pending_documents: Dict[int, np.ndarray] = {}
+        self._pending_frequencies: Dict[int, int] = {}
+        self._load()
+    
+    def _load(self):
+        """Memory-map the model file, if there is one"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        data = np.load(self.path, mmap_mode="r")
+        if int(data[0]) != FORMAT_VERSION:
+            raise ValueError(f"Unsupported IDF model format {int(data[0])} in {self.path}")
+        n_terms, n_documents = int(data[1]), int(data[2])
+        self._terms = data[HEADER_SIZE:HEADER_SIZE + n_terms]
+        self._frequencies = data[HEADER_SIZE + n_terms:HEADER_SIZE + 2 * n_terms]
+        self._documents = data[HEADER_SIZE + 2 * n_terms:HEADER_SIZE + 2 * n_terms + n_documents]
+        self._mtime = stat.st_mtime_ns
+    
+    def refresh(self):
+        """Pick up the model file if another process saved a newer version"""
+        now = time.monotonic()
+        if now - self._checked < REFRESH_INTERVAL:
+            return
+        self._checked = now
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime != self._mtime:
+            with self._lock:
+                self._load()
+    
+    @property
+    def documents(self) -> int:
+        """Number of distinct texts the model was built from"""
+        return len(self._documents) + len(self._pending_documents)
+    
+    def partial_fit(self, texts: List[TokenizedText]) -> int:
+        """
+        Count the terms of texts not seen before
+        
+        Args:
+            texts: Tokenized answers or references
+        
+        Returns:
+            Number of new texts
+        """
+        document_hashes = hash_strings(text.text for text in texts)
+        seen = _lookup(self._documents, None, document_hashes)
+        added = 0
+        with self._lock:
+            for text, document_hash, known in zip(texts, document_hashes.tolist(), seen):
+                if known or document_hash in self._pending_documents:
+                    continue
+                term_hashes = np.unique(hash_strings(text.ngrams))
+                self._pending_documents[document_hash] = term_hashes
+                for term_hash in term_hashes.tolist():
+                    self._pending_frequencies[term_hash] = self._pending_frequencies.get(term_hash, 0) + 1
+                added += 1
+            flush = len(self._pending_documents) >= self.flush_every
+        if flush:
+            self.save()
+        return added
+    
+    def idf(self, terms: List[str]) -> np.ndarray:
+        """
+        Smoothed IDF of terms, as scikit-learn computes it: ln((1 + n) / (1 + df)) + 1
+        
+        Args:
+            terms: Terms (n-grams) to weigh
+        
+        Returns:
+            IDF per term; terms never seen get the highest weight
+        """
+        self.refresh()
+        term_hashes = hash_strings(terms)
+        with self._lock:
+            frequencies = _lookup(self._terms, self._frequencies, term_hashes)
+            if self._pending_frequencies:
+                pending = self._pending_frequencies
+                frequencies += np.fromiter(
+                    (pending.get(term_hash, 0) for term_hash in term_hashes.tolist()),
+                    dtype=np.int64,
+                    count=len(term_hashes)
+                )
+            documents = self.documents
+        return np.log((1.0 + documents) / (1.0 + frequencies)) + 1.0
+    
+    def save(self):
+        """
+        Merge buffered updates into the model file
+        
+        The file is re-read under an exclusive lock first, so updates saved by
+        other processes in the meantime are kept, and texts they already
+        counted are not counted twice.
+        """
+        with self._lock:
+            if not self._pending_documents:
+                return
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path + ".lock", "w") as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                self._load()
+                
+                pending_hashes = np.fromiter(self._pending_documents, dtype=np.uint64)
+                already_counted = _lookup(self._documents, None, pending_hashes).astype(bool)
+                new_hashes = pending_hashes[~already_counted]
+                term_lists = [self._pending_documents[h] for h in new_hashes.tolist()]
+                
+                # Add the new documents' term counts to the stored frequencies
+                if term_lists:
+                    new_terms, counts = np.unique(np.concatenate(term_lists), return_counts=True)
+                else:
+                    new_terms, counts = np.zeros(0, dtype=np.uint64), np.zeros(0, dtype=np.int64)
+                terms = np.union1d(self._terms, new_terms)
+                frequencies = np.zeros(len(terms), dtype=np.uint64)
+                frequencies[np.searchsorted(terms, self._terms)] += self._frequencies
+                frequencies[np.searchsorted(terms, new_terms)] += counts.astype(np.uint64)
+                documents = np.union1d(self._documents, new_hashes)
+                
+                data = np.concatenate([
+                    np.array([FORMAT_VERSION, len(terms), len(documents)], dtype=np.uint64),
+                    terms, frequencies, documents
+                ])
+                temporary = f"{self.path}.{os.getpid()}.tmp.npy"
+                np.save(temporary, data)
+                os.replace(temporary, self.path)
+                
+                self._pending_documents.clear()
+                self._pending_frequencies.clear()
+                self._load()
+            logger.info(f"Saved IDF model {self.path}: {len(documents)} documents, {len(terms)} terms")
+
+
+class IDFStore:
+    """IDF models by course, stored as one memory-mapped file each in a directory"""
+    
+    def __init__(self, directory: str, flush_every: int = 500):
+        """
+        Args:
+            directory: Directory of the model files
+            flush_every: Buffered new documents that trigger a save of a model
+        """
+        logger.info(f"Initializing IDF model store in {directory}")
+        self.directory = directory
+        self.flush_every = flush_every
+        self._models: Dict[str, IDFModel] = {}
+        self._lock = threading.Lock()
+    
+    def _path(self, course: str) -> str:
+        """Model file of a course; names unsafe in file names are hashed"""
+        name = course if _SAFE_NAME.match(course) else hashlib.sha256(course.encode("utf-8")).hexdigest()[:32]
+        return os.path.join(self.directory, f"{name}.idf.npy")
+    
+    def model(self, course: Optional[str] = None) -> IDFModel:
+        """
+        Return the IDF model of a course, loading it on first use
+        
+        Args:
+            course: Course or question bank (default: the shared default model)
+        """
+        course = course or DEFAULT_COURSE
+        with self._lock:
+            model = self._models.get(course)
+            if model is None:
+                model = self._models[course] = IDFModel(self._path(course), self.flush_every)
+            return model
+    
+    def save(self):
+        """Save the buffered updates of every loaded model"""
+        with self._lock:
+            models = list(self._models.values())
+        for model in models:
+            try:
+                model.save()
+            except Exception as e:
+                logger.error(f"Error saving IDF model {model.path}: {e}")
@@ -0,0 +1,648 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+import json
+import logging
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from app.services.score_aggregator import DEFAULT_SCORE_WEIGHTS
+
+logger = logging.getLogger(__name__)
+
+INVALID_ANSWER_ERROR = "Student answer is too short or empty"
+
+# Claims of an answer whose worker died before the job is failed instead of requeued
+MAX_CLAIM_ATTEMPTS = 3
+
+# Seconds between checks for dead job workers
+SUPERVISE_INTERVAL = 5.0
+
+
+class JobQueueFullError(Exception):
+    """Raised when a submission would exceed the queue's answer limit"""
+
+
+@dataclass(frozen=True)
+class JobChunk:
+    """Answers of one job claimed by a worker, scored together"""
+    job_id: str
+    question: str
+    rubrics: List[str]
+    correct_answer: str
+    total_marks: float
+    cohort_idf: bool
+    course: Optional[str]
+    positions: List[int]
+    answers: List[str]
+
+
+class JobStore:
+    """
+    SQLite-backed job queue shared by the API process and the job workers
+    Every answer is a row whose status moves pending -> running -> done or
+    failed; a worker claims a chunk of pending rows in one transaction, so
+    finished answers are never scored twice and claimed ones can be requeued.
+    Each claim of an answer is counted, so answers that keep killing their
+    worker fail their job instead of being requeued forever
+    """
+    
+    def __init__(self, path: str):
+        """
+        Args:
+            path: SQLite database file
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        # Autocommit mode: transactions are opened explicitly with BEGIN IMMEDIATE
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, status TEXT NOT NULL, question TEXT NOT NULL, "
+            "rubrics TEXT NOT NULL, correct_answer TEXT NOT NULL, total_marks REAL NOT NULL, "
+            "cohort_idf INTEGER NOT NULL, total INTEGER NOT NULL, completed INTEGER NOT NULL, "
+            "failed INTEGER NOT NULL, created_at REAL NOT NULL, updated_at REAL NOT NULL, course TEXT, "
+            "similarity_flags TEXT)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        for column in ("course", "similarity_flags"):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} TEXT")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS job_items ("
+            "job_id TEXT NOT NULL, position INTEGER NOT NULL, student_answer TEXT NOT NULL, "
+            "status TEXT NOT NULL, worker INTEGER, result TEXT, error TEXT, "
+            "attempts INTEGER NOT NULL DEFAULT 0, PRIMARY KEY (job_id, position))"
+        )
+        if "attempts" not in {row[1] for row in self._conn.execute("PRAGMA table_info(job_items)")}:
+            self._conn.execute("ALTER TABLE job_items ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS job_items_status ON job_items (status)")
+    
+    def add_job(
+        self,
+        question: str,
+        rubrics: List[str],
+        correct_answer: str,
+        total_marks: float,
+        cohort_idf: bool,
+        answers: List[Tuple[str, Optional[str]]],
+        max_queued: int,
+        course: Optional[str] = None,
+        similarity_flags: Optional[List[Dict]] = None
+    ) -> str:
+        """
+        Enqueue a job
+        
+        Args:
+            question: The question statement
+            rubrics: List of key concepts/rubrics
+            correct_answer: Cleaned model/correct answer
+            total_marks: Total marks for the question
+            cohort_idf: Fit TF-IDF weights over all answers of the job
+            answers: (cleaned answer, error) pairs; answers with an error are
+                recorded as failed instead of queued
+            max_queued: Most answers allowed to wait in the queue, including this job's
+            course: Course or question bank the question belongs to
+            similarity_flags: Near-duplicate groups found among the answers
+        
+        Returns:
+            The new job's id
+        
+        Raises:
+            JobQueueFullError: If the job's answers do not fit in the queue
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        failed = sum(error is not None for _, error in answers)
+        queued = len(answers) - failed
+        
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                waiting = self._conn.execute(
+                    "SELECT COUNT(*) FROM job_items WHERE status IN ('pending', 'running')"
+                ).fetchone()[0]
+                if waiting + queued > max_queued:
+                    raise JobQueueFullError(
+                        f"Job queue is full: {waiting} answers waiting, limit is {max_queued}"
+                    )
+                self._conn.execute(
+                    "INSERT INTO jobs (id, status, question, rubrics, correct_answer, total_marks, "
+                    "cohort_idf, total, completed, failed, created_at, updated_at, course, similarity_flags) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0, ?, ?, ?, ?, ?)",
+                    (
+                        job_id, "queued" if queued else "completed", question, json.dumps(rubrics),
+                        correct_answer, total_marks, int(cohort_idf), len(answers), failed, now, now, course,
+                        json.dumps(similarity_flags) if similarity_flags is not None else None
+                    )
+                )
+                self._conn.executemany(
+                    "INSERT INTO job_items (job_id, position, student_answer, status, error) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (
+                        (job_id, position, answer, "pending" if error is None else "failed", error)
+                        for position, (answer, error) in enumerate(answers)
+                    )
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return job_id
+    
+    def claim(self, worker: int, chunk_size: int) -> Optional[JobChunk]:
+        """
+        Claim pending answers of the oldest job with work left
+        
+        Jobs using cohort IDF are claimed whole, since their weights are fitted
+        over all of their answers.
+        
+        Args:
+            worker: Id of the claiming worker (its pid)
+            chunk_size: Most answers to claim
+        
+        Returns:
+            JobChunk, or None if nothing is pending
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT job_id FROM job_items WHERE status = 'pending' ORDER BY rowid LIMIT 1"
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                job_id = row[0]
+                question, rubrics, correct_answer, total_marks, cohort_idf, course = self._conn.execute(
+                    "SELECT question, rubrics, correct_answer, total_marks, cohort_idf, course FROM jobs WHERE id = ?",
+                    (job_id,)
+                ).fetchone()
+                items = self._conn.execute(
+                    "SELECT position, student_answer FROM job_items "
+                    "WHERE job_id = ? AND status = 'pending' ORDER BY position LIMIT ?",
+                    (job_id, -1 if cohort_idf else chunk_size)
+                ).fetchall()
+                self._conn.executemany(
+                    "UPDATE job_items SET status = 'running', worker = ?, attempts = attempts + 1 "
+                    "WHERE job_id = ? AND position = ?",
+                    ((worker, job_id, position) for position, _ in items)
+                )
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'running', updated_at = ? WHERE id = ? AND status = 'queued'",
+                    (time.time(), job_id)
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        
+        return JobChunk(
+            job_id=job_id,
+            question=question,
+            rubrics=json.loads(rubrics),
+            correct_answer=correct_answer,
+            total_marks=total_marks,
+            cohort_idf=bool(cohort_idf),
+            course=course,
+            positions=[position for position, _ in items],
+            answers=[answer for _, answer in items]
+        )
+    
+    def finish(
+        self,
+        worker: int,
+        chunk: JobChunk,
+        results: Optional[List[str]] = None,
+        error: Optional[str] = None
+    ):
+        """
+        Record the outcome of a claimed chunk
+        
+        Only rows still claimed by this worker are updated, so a chunk that was
+        requeued and scored elsewhere is not counted twice.
+        
+        Args:
+            worker: Id of the worker that claimed the chunk
+            chunk: The claimed chunk
+            results: Serialized EvaluationResponse per answer, on success
+            error: Why the chunk could not be scored, on failure
+        """
+        if results is None:
+            rows = [("failed", None, error, chunk.job_id, position, worker) for position in chunk.positions]
+        else:
+            rows = [
+                ("done", result, None, chunk.job_id, position, worker)
+                for position, result in zip(chunk.positions, results)
+            ]
+        
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                updated = 0
+                for row in rows:
+                    updated += self._conn.execute(
+                        "UPDATE job_items SET status = ?, result = ?, error = ?, worker = NULL "
+                        "WHERE job_id = ? AND position = ? AND status = 'running' AND worker = ?",
+                        row
+                    ).rowcount
+                column = "failed" if results is None else "completed"
+                self._conn.execute(
+                    f"UPDATE jobs SET {column} = {column} + ?, updated_at = ?, "
+                    "status = CASE WHEN status != 'failed' AND completed + failed + ? >= total "
+                    "THEN 'completed' ELSE status END WHERE id = ?",
+                    (updated, time.time(), updated, chunk.job_id)
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+    
+    def claiming_workers(self) -> List[int]:
+        """Ids of the workers holding claimed answers"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT worker FROM job_items WHERE status = 'running' AND worker IS NOT NULL"
+            ).fetchall()
+        return [worker for worker, in rows]
+    
+    def requeue(self, workers: Optional[List[int]] = None, max_attempts: int = MAX_CLAIM_ATTEMPTS) -> int:
+        """
+        Return claimed answers to the queue
+        
+        A job with an answer already claimed max_attempts times is failed
+        instead: its unfinished answers are recorded as failed and no worker
+        claims them again.
+        
+        Args:
+            workers: Only requeue answers claimed by these workers (default: all)
+            max_attempts: Claims of an answer after which its job fails
+        
+        Returns:
+            Number of requeued answers
+        """
+        claimed = "status = 'running'"
+        arguments: List = []
+        if workers is not None:
+            claimed += f" AND worker IN ({', '.join('?' * len(workers))})"
+            arguments = list(workers)
+        
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                exhausted = [job_id for job_id, in self._conn.execute(
+                    f"SELECT DISTINCT job_id FROM job_items WHERE {claimed} AND attempts >= ?",
+                    arguments + [max_attempts]
+                )]
+                for job_id in exhausted:
+                    failed = self._conn.execute(
+                        "UPDATE job_items SET status = 'failed', worker = NULL, error = ? "
+                        "WHERE job_id = ? AND status IN ('pending', 'running')",
+                        (f"Job failed: its workers died {max_attempts} times while scoring it", job_id)
+                    ).rowcount
+                    self._conn.execute(
+                        "UPDATE jobs SET status = 'failed', failed = failed + ?, updated_at = ? WHERE id = ?",
+                        (failed, time.time(), job_id)
+                    )
+                    logger.error(f"Failed job {job_id}: answers were claimed {max_attempts} times by workers that died")
+                requeued = self._conn.execute(
+                    f"UPDATE job_items SET status = 'pending', worker = NULL WHERE {claimed}",
+                    arguments
+                ).rowcount
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return requeued
+    
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        """Return a job's progress, or None if unknown"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, status, total, completed, failed, created_at, updated_at, similarity_flags "
+                "FROM jobs WHERE id = ?",
+                (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        id_, status, total, completed, failed, created_at, updated_at, similarity_flags = row
+        return {
+            "id": id_,
+            "status": status,
+            "total_answers": total,
+            "completed": completed,
+            "failed": failed,
+            "progress": (completed + failed) / total if total else 1.0,
+            "created_at": created_at,
+            "updated_at": updated_at,
+            "similarity_flags": json.loads(similarity_flags) if similarity_flags is not None else None
+        }
+    
+    def get_results(self, job_id: str, offset: int = 0, limit: int = 1000) -> List[Tuple[int, Optional[str], Optional[str]]]:
+        """
+        Return finished answers of a job
+        
+        Args:
+            job_id: Id of the job
+            offset: Skip answers before this position
+            limit: Most answers to return
+        
+        Returns:
+            (position, serialized result, error) per finished answer, by position
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT position, result, error FROM job_items "
+                "WHERE job_id = ? AND position >= ? AND status IN ('done', 'failed') "
+                "ORDER BY position LIMIT ?",
+                (job_id, offset, limit)
+            ).fetchall()
+    
+    def pending(self) -> int:
+        """Answers waiting in the queue or being scored"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM job_items WHERE status IN ('pending', 'running')"
+            ).fetchone()[0]
+    
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
+
+
+def _pid_alive(pid: int) -> bool:
+    """Whether a process with this pid exists on this host"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Exists, but belongs to another user
+        return True
+    return True
+
+
+def _job_worker_main(
+    path: str,
+    chunk_size: int,
+    poll_interval: float,
+    score_weights: Dict,
+    score_weights_path: str,
+    stop
+):
+    """
+    Job worker process: load a private set of analyzers, then score claimed
+    chunks until asked to stop
+    """
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    from app.services.analysis_executor import load_worker_analyzers
+    from app.services.evaluation_pipeline import EvaluationPipeline
+    from app.config import settings
+    from app.services.calibration import ScoreWeightsFile
+    from app.services.component_cache import create_component_cache
+    from app.services.question_store import StoredQuestion
+    
+    analyzers = load_worker_analyzers()
+    weights = ScoreWeightsFile(score_weights_path, score_weights)
+    pipeline = EvaluationPipeline(
+        rubric_matcher=analyzers["rubric_matcher"],
+        semantic_analyzer=analyzers["semantic_analyzer"],
+        nli_analyzer=analyzers["nli_analyzer"],
+        score_aggregator=weights.aggregator(),
+        # With the sqlite backend, regrades reuse components scored by any worker or the server
+        component_cache=create_component_cache(
+            backend=settings.component_cache_backend,
+            max_entries=settings.component_cache_size,
+            path=settings.component_cache_path
+        )
+    )
+    store = JobStore(path)
+    worker = os.getpid()
+    logger.info(f"Job worker {worker} ready")
+    
+    # Reference-side artifacts of the job being worked on
+    artifacts_job, artifacts = None, None
+    try:
+        while not stop.is_set():
+            chunk = store.claim(worker, chunk_size)
+            if chunk is None:
+                stop.wait(poll_interval)
+                continue
+            
+            try:
+                # Calibrated weights apply from the next chunk on
+                pipeline.score_aggregator = weights.aggregator(check=True)
+                if artifacts_job != chunk.job_id:
+                    artifacts_job, artifacts = chunk.job_id, pipeline.prepare_question(StoredQuestion(
+                        id=chunk.job_id,
+                        question=chunk.question,
+                        rubrics=chunk.rubrics,
+                        correct_answer=chunk.correct_answer,
+                        total_marks=chunk.total_marks,
+                        created_at=0.0,
+                        course=chunk.course
+                    ))
+                results = pipeline.evaluate_batch(
+                    student_answers=chunk.answers,
+                    rubrics=artifacts.compiled_rubric,
+                    correct_answer=artifacts.correct_answer,
+                    total_marks=chunk.total_marks,
+                    cohort_idf=chunk.cohort_idf,
+                    course=chunk.course
+                )
+                store.finish(worker, chunk, results=[result.model_dump_json() for result in results])
+            except Exception as e:
+                logger.error(f"Error scoring job {chunk.job_id}: {e}", exc_info=True)
+                store.finish(worker, chunk, error=f"Internal server error during evaluation: {str(e)}")
+    finally:
+        store.close()
+        if pipeline.component_cache is not None:
+            pipeline.component_cache.close()
+        analyzers["semantic_analyzer"].close()
+
+
+class JobQueue:
+    """
+    Durable grading job queue drained by a pool of worker processes
+    Each worker holds its own warm analyzers and claims chunks of answers
+    from the shared SQLite store; a background thread replaces workers that
+    died and requeues their answers, and answers finished before a crash or
+    restart are kept
+    """
+    
+    def __init__(
+        self,
+        path: str,
+        workers: int = 2,
+        chunk_size: int = 32,
+        max_queued: int = 100000,
+        score_weights: Optional[Dict] = None,
+        score_weights_path: str = "",
+        poll_interval: float = 0.2,
+        max_attempts: int = MAX_CLAIM_ATTEMPTS,
+        supervise_interval: float = SUPERVISE_INTERVAL
+    ):
+        """
+        Initialize the job queue
+        
+        Args:
+            path: SQLite database file of the queue
+            workers: Number of worker processes
+            chunk_size: Answers a worker claims and scores together
+            max_queued: Most answers allowed to wait in the queue
+            score_weights: ScoreAggregator weights the workers score with
+                (default: DEFAULT_SCORE_WEIGHTS)
+            score_weights_path: Calibrated weights file the workers reload, overriding score_weights
+            poll_interval: Seconds an idle worker waits before looking for work again
+            max_attempts: Claims of an answer by workers that died after which its job fails
+            supervise_interval: Seconds between checks for dead workers
+        """
+        logger.info(f"Initializing job queue with {workers} workers")
+        self.store = JobStore(path)
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.max_queued = max_queued
+        self.score_weights = score_weights or DEFAULT_SCORE_WEIGHTS
+        self.score_weights_path = score_weights_path
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.supervise_interval = supervise_interval
+        self._context = multiprocessing.get_context("spawn")
+        # Created with the first worker, so a queue that only submits holds no semaphores
+        self._stop = None
+        self._processes: List = []
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._supervisor: Optional[threading.Thread] = None
+    
+    def start(self):
+        """
+        Resume work left by a previous run and start workers if answers are pending
+        
+        Only answers claimed by workers that no longer exist are requeued:
+        workers of another server process sharing the store keep theirs.
+        Dead workers are then looked for every supervise_interval seconds on
+        a background thread.
+        """
+        dead = [worker for worker in self.store.claiming_workers() if not _pid_alive(worker)]
+        requeued = self.store.requeue(dead, self.max_attempts) if dead else 0
+        if requeued:
+            logger.info(f"Requeued {requeued} answers claimed by {len(dead)} workers that are gone")
+        self.supervise()
+        if self.workers > 0 and self._supervisor is None:
+            self._supervisor = threading.Thread(target=self._run, name="job-supervisor", daemon=True)
+            self._supervisor.start()
+    
+    def _run(self):
+        while not self._stopped.wait(self.supervise_interval):
+            try:
+                self.supervise()
+            except Exception as e:
+                logger.error(f"Error supervising job workers: {e}", exc_info=True)
+    
+    def supervise(self):
+        """Start the workers if answers are waiting, and replace workers that died"""
+        if self._processes or self.store.pending():
+            self._ensure_workers()
+    
+    def _ensure_workers(self):
+        """Start the worker pool, replacing workers that died"""
+        with self._lock:
+            dead = [process for process in self._processes if not process.is_alive()]
+            if dead:
+                logger.warning(f"{len(dead)} job workers died, restarting them")
+                self.store.requeue([process.pid for process in dead], self.max_attempts)
+                self._processes = [process for process in self._processes if process.is_alive()]
+            if self._stop is None and self.workers > 0:
+                self._stop = self._context.Event()
+            while len(self._processes) < self.workers:
+                process = self._context.Process(
+                    target=_job_worker_main,
+                    args=(
+                        self.store.path, self.chunk_size, self.poll_interval,
+                        self.score_weights, self.score_weights_path, self._stop
+                    ),
+                    name="job-worker",
+                    daemon=True
+                )
+                process.start()
+                self._processes.append(process)
+    
+    def submit(
+        self,
+        question: str,
+        rubrics: List[str],
+        correct_answer: str,
+        total_marks: float,
+        answers: List[Tuple[str, Optional[str]]],
+        cohort_idf: bool = False,
+        course: Optional[str] = None,
+        similarity_flags: Optional[List[Dict]] = None
+    ) -> Dict:
+        """
+        Enqueue a grading job
+        
+        Args:
+            question: The question statement
+            rubrics: List of key concepts/rubrics
+            correct_answer: Cleaned model/correct answer
+            total_marks: Total marks for the question
+            answers: (cleaned answer, error) pairs, see JobStore.add_job
+            cohort_idf: Fit TF-IDF weights over all answers of the job
+            course: Course or question bank the question belongs to
+            similarity_flags: Near-duplicate groups found among the answers
+        
+        Returns:
+            The job's progress
+        
+        Raises:
+            JobQueueFullError: If the job's answers do not fit in the queue
+        """
+        job_id = self.store.add_job(
+            question, rubrics, correct_answer, total_marks, cohort_idf, answers, self.max_queued, course,
+            similarity_flags
+        )
+        self._ensure_workers()
+        return self.store.get_job(job_id)
+    
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Return a job's progress, or None if unknown"""
+        if self._processes:
+            self._ensure_workers()
+        return self.store.get_job(job_id)
+    
+    def results(self, job_id: str, offset: int = 0, limit: int = 1000) -> List[Tuple[int, Optional[str], Optional[str]]]:
+        """Return finished answers of a job, see JobStore.get_results"""
+        return self.store.get_results(job_id, offset, limit)
+    
+    def pending(self) -> int:
+        """Answers waiting in the queue or being scored"""
+        return self.store.pending()
+    
+    def shutdown(self, timeout: float = 5.0):
+        """
+        Stop the workers
+        
+        Answers still being scored are requeued when the queue next starts.
+        """
+        logger.info("Shutting down job queue...")
+        self._stopped.set()
+        if self._supervisor is not None:
+            self._supervisor.join()
+        if self._stop is not None:
+            self._stop.set()
+        deadline = time.monotonic() + timeout
+        for process in self._processes:
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+        self.store.close()
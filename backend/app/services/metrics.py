@@ -0,0 +1,394 @@
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets in seconds
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Seconds between the snapshots a server worker shares with the others
+SNAPSHOT_INTERVAL = 1.0
+
+# Stage durations of the current request, when the timing header is enabled
+request_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_timings", default=None)
+
+
+def _escape_label(value: str) -> str:
+    """Escape a label value for the text exposition format"""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labelnames: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    """Render a Prometheus label set"""
+    pairs = [f'{name}="{_escape_label(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """Monotonic counter with optional labels"""
+    
+    kind = "counter"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+    
+    def inc(self, amount: float = 1.0, **labels):
+        """Add to the counter of a label set"""
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+    
+    def snapshot(self) -> List:
+        """Values of every label set, as JSON-serializable [labels, value] pairs"""
+        with self._lock:
+            return [[list(key), value] for key, value in self._values.items()]
+    
+    def samples(self, others: Iterable[List] = ()) -> List[str]:
+        """
+        Render the counter
+        
+        Args:
+            others: Snapshots of the same counter in other processes, added to this one's values
+        """
+        with self._lock:
+            values = dict(self._values)
+        for snapshot in others:
+            for key, value in snapshot:
+                key = tuple(key)
+                values[key] = values.get(key, 0.0) + value
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {value}" for key, value in sorted(values.items())]
+
+
+class Gauge:
+    """Value read from a callback when metrics are rendered"""
+    
+    kind = "gauge"
+    
+    def __init__(self, name: str, documentation: str, function: Callable[[], float]):
+        self.name = name
+        self.documentation = documentation
+        self.function = function
+    
+    def samples(self, others: Iterable[List] = ()) -> List[str]:
+        """Render the gauge: the current value in this process"""
+        return [f"{self.name} {float(self.function())}"]
+
+
+class Histogram:
+    """Cumulative histogram with optional labels"""
+    
+    kind = "histogram"
+    
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: bucket counts (last one is +Inf), sum
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, value: float, **labels):
+        """Record one observation for a label set"""
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        bucket = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            entry[0][bucket] += 1
+            entry[1][0] += value
+    
+    def snapshot(self) -> List:
+        """Bucket counts and sum of every label set, as JSON-serializable [labels, counts, sum] lists"""
+        with self._lock:
+            return [[list(key), list(counts), total[0]] for key, (counts, total) in self._values.items()]
+    
+    def samples(self, others: Iterable[List] = ()) -> List[str]:
+        """
+        Render the histogram
+        
+        Args:
+            others: Snapshots of the same histogram in other processes, merged into this one's buckets
+        """
+        with self._lock:
+            values = {key: (list(counts), total[0]) for key, (counts, total) in self._values.items()}
+        for snapshot in others:
+            for key, counts, total in snapshot:
+                key = tuple(key)
+                merged_counts, merged_total = values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+                values[key] = ([a + b for a, b in zip(merged_counts, counts)], merged_total + total)
+        lines = []
+        for key, (counts, total) in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                bucket_labels = _format_labels(self.labelnames, key, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class _StageTimer:
+    """Times one pipeline stage into the stage histogram and the request's timings"""
+    
+    __slots__ = ("metrics", "stage", "timings", "started")
+    
+    def __init__(self, metrics: "EvaluationMetrics", stage: str, timings: Optional[Dict[str, float]]):
+        self.metrics = metrics
+        self.stage = stage
+        self.timings = timings
+    
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.started
+        if self.metrics.enabled:
+            self.metrics.stage_seconds.observe(elapsed, stage=self.stage)
+            if exc_type is not None:
+                self.metrics.stage_errors.inc(stage=self.stage)
+        if self.timings is not None:
+            self.timings[self.stage] = self.timings.get(self.stage, 0.0) + elapsed
+        return False
+
+
+class _NullTimer:
+    """Stage timer used while instrumentation is off"""
+    
+    __slots__ = ()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class EvaluationMetrics:
+    """
+    In-process metrics registry rendered in the Prometheus text format
+    Stage timers are no-ops while metrics are disabled and no timing header
+    was requested
+    """
+    
+    def __init__(self, enabled: bool = True):
+        """
+        Args:
+            enabled: Record metrics (the timing header works either way)
+        """
+        self.enabled = enabled
+        self._metrics: List = []
+        self.requests = self.add(Counter(
+            "eval_requests_total", "HTTP requests by endpoint and status code", ("endpoint", "status")
+        ))
+        self.request_seconds = self.add(Histogram(
+            "eval_request_duration_seconds", "HTTP request latency by endpoint", ("endpoint",)
+        ))
+        self.stage_seconds = self.add(Histogram(
+            "eval_stage_duration_seconds", "Evaluation pipeline stage latency", ("stage",)
+        ))
+        self.stage_errors = self.add(Counter(
+            "eval_stage_errors_total", "Evaluation pipeline stage failures", ("stage",)
+        ))
+    
+    def add(self, metric):
+        """Register a Counter, Gauge or Histogram and return it"""
+        self._metrics.append(metric)
+        return metric
+    
+    def stage(self, name: str):
+        """
+        Context manager timing a pipeline stage
+        
+        Args:
+            name: Stage name (clean_text, tokenize, component_cache, rubric, semantic, nli,
+                duplicates, aggregation, serialization)
+        """
+        timings = request_timings.get()
+        if not self.enabled and timings is None:
+            return _NULL_TIMER
+        return _StageTimer(self, name, timings)
+    
+    async def timed(self, name: str, awaitable: Awaitable):
+        """Await a stage and time it"""
+        with self.stage(name):
+            return await awaitable
+    
+    def snapshot(self) -> Dict[str, List]:
+        """Counter and histogram values by metric name, to merge into another process's render"""
+        return {metric.name: metric.snapshot() for metric in self._metrics if hasattr(metric, "snapshot")}
+    
+    def render(self, others: Iterable[Dict[str, List]] = ()) -> str:
+        """
+        All registered metrics in the Prometheus text exposition format
+        
+        Args:
+            others: Snapshots of the registries of other processes; their
+                counters and histograms are summed into this one's
+        """
+        others = list(others)
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples([other[metric.name] for other in others if metric.name in other]))
+        return "\n".join(lines) + "\n"
+
+
+class SharedSnapshots:
+    """
+    Shares a registry between the workers of a multi-process server
+    Every worker writes the snapshot of its counters and histograms to
+    <directory>/<pid>.json every interval seconds, and merges the other
+    workers' files into the metrics it renders, so a scrape of any worker
+    covers the traffic of all of them (the other workers' values lag by at
+    most interval). Files of exited workers are kept, so totals never
+    decrease when a worker is restarted. Gauges are read in the worker that
+    renders.
+    """
+    
+    def __init__(self, metrics: EvaluationMetrics, directory: str, interval: float = SNAPSHOT_INTERVAL):
+        """
+        Args:
+            metrics: This worker's registry
+            directory: Directory shared by all workers
+            interval: Seconds between snapshots
+        """
+        self.metrics = metrics
+        self.directory = directory
+        self.interval = interval
+        self.path = os.path.join(directory, f"{os.getpid()}.json")
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self):
+        """Write snapshots on a background thread until stopped"""
+        self._thread = threading.Thread(target=self._run, name="metrics-snapshots", daemon=True)
+        self._thread.start()
+    
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.write()
+    
+    def stop(self):
+        """Stop the background thread and write a last snapshot"""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.write()
+    
+    def write(self):
+        """Replace this worker's snapshot file"""
+        temporary = f"{self.path}.tmp"
+        try:
+            with open(temporary, "w") as snapshot_file:
+                json.dump(self.metrics.snapshot(), snapshot_file)
+            os.replace(temporary, self.path)
+        except OSError as e:
+            logger.warning(f"Could not write metrics snapshot: {e}")
+    
+    def others(self) -> List[Dict[str, List]]:
+        """Snapshots of the other workers, current and exited"""
+        snapshots = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if not name.endswith(".json") or path == self.path:
+                continue
+            try:
+                with open(path) as snapshot_file:
+                    snapshots.append(json.load(snapshot_file))
+            except (OSError, ValueError):
+                # Being replaced or removed: skip it for this scrape
+                continue
+        return snapshots
+    
+    def render(self) -> str:
+        """This worker's metrics merged with the other workers' snapshots"""
+        return self.metrics.render(self.others())
+
+
+def format_timings(timings: Dict[str, float]) -> str:
+    """Render stage durations as a Server-Timing style header value (milliseconds)"""
+    return ", ".join(f"{stage};dur={seconds * 1000:.3f}" for stage, seconds in timings.items())
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware counting and timing requests per endpoint
+    Optionally adds the request's stage breakdown as an X-Eval-Timing header
+    """
+    
+    def __init__(self, app, metrics: EvaluationMetrics, timing_header: bool = False):
+        """
+        Args:
+            app: Wrapped ASGI application
+            metrics: Registry to record into
+            timing_header: Add X-Eval-Timing to every response
+        
+        Requests are labelled with the path template of the route they matched
+        (e.g. /questions/{question_id}/evaluate), unmatched paths as "other".
+        """
+        self.app = app
+        self.metrics = metrics
+        self.timing_header = timing_header
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not (self.metrics.enabled or self.timing_header):
+            await self.app(scope, receive, send)
+            return
+        
+        timings: Optional[Dict[str, float]] = {} if self.timing_header else None
+        token = request_timings.set(timings)
+        started = time.perf_counter()
+        status = 500
+        
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if timings is not None:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-eval-timing", format_timings(timings).encode("latin-1")))
+                    message = dict(message, headers=headers)
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            request_timings.reset(token)
+            if self.metrics.enabled:
+                # Set by the router once the request matched a route
+                route = scope.get("route")
+                endpoint = getattr(route, "path", None) or "other"
+                self.metrics.requests.inc(endpoint=endpoint, status=status)
+                self.metrics.request_seconds.observe(time.perf_counter() - started, endpoint=endpoint)
+
+
+# Process-wide registry
+metrics = EvaluationMetrics()
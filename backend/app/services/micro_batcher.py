@@ -0,0 +1,156 @@
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+import asyncio
+import logging
+
+from app.services.metrics import Histogram, request_timings
+
+logger = logging.getLogger(__name__)
+
+# Weight of the newest inter-arrival gap in the moving average
+ARRIVAL_SMOOTHING = 0.2
+
+
+class _PendingBatch:
+    """Items collected for one key, waiting to be evaluated together"""
+    
+    def __init__(self, evaluate_batch: Callable[[List[Any]], Awaitable[List[Any]]]):
+        self.evaluate_batch = evaluate_batch
+        self.items: List[Any] = []
+        self.futures: List[asyncio.Future] = []
+        # Stage timings of each caller's request, None where not recorded
+        self.timings: List[Optional[Dict[str, float]]] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-item requests into batches
+    Requests sharing a key (e.g. the same question) that arrive within a short
+    window are evaluated by one batch call and each caller gets its own
+    result. The window adapts to load: while requests arrive further apart
+    than the window, a request is dispatched immediately and pays no added
+    latency; under bursts, requests wait up to the window or until the batch
+    is full.
+    """
+    
+    def __init__(
+        self,
+        max_batch_size: int = 32,
+        max_window: float = 0.005,
+        size_histogram: Optional[Histogram] = None
+    ):
+        """
+        Initialize the micro-batcher
+        
+        Args:
+            max_batch_size: Most items evaluated together
+            max_window: Longest time in seconds a request waits for others
+            size_histogram: Records the size of every dispatched batch
+        """
+        logger.info(f"Initializing micro-batcher (window {max_window * 1000:.1f} ms, max batch {max_batch_size})")
+        self.max_batch_size = max_batch_size
+        self.max_window = max_window
+        self.size_histogram = size_histogram
+        self._pending: Dict[Hashable, _PendingBatch] = {}
+        self._tasks: set = set()
+        self._last_arrival: Optional[float] = None
+        # Moving average of the time between requests, starts out as "idle"
+        self._arrival_gap = float("inf")
+    
+    def window(self) -> float:
+        """Current batching window: zero while requests arrive further apart than max_window"""
+        return self.max_window if self._arrival_gap < self.max_window else 0.0
+    
+    def _record_arrival(self, now: float):
+        """Update the moving average of inter-arrival gaps"""
+        if self._last_arrival is not None:
+            gap = now - self._last_arrival
+            if self._arrival_gap == float("inf"):
+                self._arrival_gap = gap
+            else:
+                self._arrival_gap += ARRIVAL_SMOOTHING * (gap - self._arrival_gap)
+        self._last_arrival = now
+    
+    async def submit(
+        self,
+        key: Hashable,
+        item: Any,
+        evaluate_batch: Callable[[List[Any]], Awaitable[List[Any]]]
+    ) -> Any:
+        """
+        Evaluate one item, batched with concurrent items of the same key
+        
+        Args:
+            key: Items with equal keys can be evaluated together
+            item: The item to evaluate
+            evaluate_batch: Evaluates a list of items of this key, returning one
+                result per item in order; the first caller's function is used
+                for the whole batch
+        
+        Returns:
+            The item's result
+        """
+        loop = asyncio.get_running_loop()
+        self._record_arrival(loop.time())
+        
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = self._pending[key] = _PendingBatch(evaluate_batch)
+            window = self.window()
+            if window > 0:
+                batch.timer = loop.call_later(window, self._dispatch, key)
+        
+        future = loop.create_future()
+        batch.items.append(item)
+        batch.futures.append(future)
+        batch.timings.append(request_timings.get())
+        if batch.timer is None or len(batch.items) >= self.max_batch_size:
+            self._dispatch(key)
+        
+        return await future
+    
+    def _dispatch(self, key: Hashable):
+        """Start evaluating the items collected for a key"""
+        batch = self._pending.pop(key, None)
+        if batch is None:
+            return
+        if batch.timer is not None:
+            batch.timer.cancel()
+        task = asyncio.ensure_future(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+    
+    async def _run(self, batch: _PendingBatch):
+        """
+        Evaluate a batch and resolve each caller's future
+        
+        If the batch fails, every caller gets the error; if it is cancelled
+        (e.g. at shutdown), every caller is cancelled too instead of waiting
+        forever, and the cancellation is re-raised. The stages of the batch
+        are added to the timings of every request merged into it.
+        """
+        if self.size_histogram is not None:
+            self.size_histogram.observe(len(batch.items))
+        # This task's own context: the batch's stages are not any one caller's
+        timings = {} if any(caller is not None for caller in batch.timings) else None
+        request_timings.set(timings)
+        try:
+            results = await batch.evaluate_batch(batch.items)
+        except Exception as e:
+            for future in batch.futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        except BaseException:
+            for future in batch.futures:
+                future.cancel()
+            raise
+        finally:
+            # Before any caller resumes and sends its timing header
+            for caller in batch.timings:
+                if caller is not None:
+                    for stage, seconds in timings.items():
+                        caller[stage] = caller.get(stage, 0.0) + seconds
+        for future, result in zip(batch.futures, results):
+            if not future.done():
+                future.set_result(result)
@@ -1,8 +1,19 @@
+from typing import TYPE_CHECKING, Dict, List, Tuple, Union, FrozenSet
 import logging
-import re
+
+import numpy as np
+
+from app.utils.text_preprocessing import NEGATION_WORDS, TokenizedText, as_tokenized
+
+if TYPE_CHECKING:
+    from scipy.sparse import csr_matrix
 
 logger = logging.getLogger(__name__)
 
+# Cosine similarity of sentence keyword sets above which a student sentence
+# is considered to address its best matching reference sentence
+SENTENCE_ALIGNMENT_THRESHOLD = 0.3
+
 
 class NLIAnalyzer:
     """
@@ -10,33 +21,212 @@ class NLIAnalyzer:
     Uses keyword matching and negation detection
     """
     
-    def __init__(self):
+    # Bump when scoring logic changes so cached results are invalidated
+    version = "keyword-negation-1"
+    
+    def __init__(self, mode: str = "document"):
         """
         Initialize the NLI analyzer
+        
+        Args:
+            mode: "document" compares both answers as a whole, "sentence" aligns
+                each student sentence with its closest reference sentence and
+                checks negation agreement per aligned pair
         """
-        logger.info("Initializing text-based NLI analyzer")
-        self.negation_words = {'not', 'no', 'never', 'neither', 'nor', 'none', 'nobody',
-                               'nothing', 'nowhere', 'cannot', 'can\'t', 'won\'t', 'wouldn\'t',
-                               'shouldn\'t', 'isn\'t', 'aren\'t', 'wasn\'t', 'weren\'t',
-                               'hasn\'t', 'haven\'t', 'hadn\'t', 'doesn\'t', 'don\'t', 'didn\'t'}
+        if mode not in ("document", "sentence"):
+            raise ValueError(f"Unknown NLI mode: {mode}")
+        logger.info(f"Initializing text-based NLI analyzer ({mode} level)")
+        self.mode = mode
+        if mode == "sentence":
+            self.version = "sentence-alignment-2"
+        self.negation_words = NEGATION_WORDS
         logger.info("NLI analyzer initialized successfully")
     
-    def _has_negation(self, text: str) -> bool:
-        """Check if text contains negation words"""
-        words = set(re.findall(r'\b\w+\'?\w*\b', text.lower()))
-        return bool(words & self.negation_words)
+    def _score_entailment(
+        self,
+        student_keywords: FrozenSet[str],
+        student_has_negation: bool,
+        correct_keywords: FrozenSet[str],
+        correct_has_negation: bool
+    ) -> dict:
+        """Score keyword overlap and negation agreement into an entailment result"""
+        # Calculate keyword overlap
+        if not correct_keywords:
+            overlap = 1.0
+        else:
+            intersection = student_keywords & correct_keywords
+            overlap = len(intersection) / len(correct_keywords)
+        
+        # Determine support score
+        # High overlap + similar negation pattern = high support
+        # High overlap + different negation pattern = potential contradiction
+        if overlap > 0.5:
+            if student_has_negation == correct_has_negation:
+                support_score = 0.7 + (overlap * 0.3)  # 0.7-1.0
+                label = "supports the concept"
+            else:
+                support_score = 0.3  # Potential contradiction
+                label = "contradicts the concept"
+        else:
+            support_score = 0.5  # Neutral/unrelated
+            label = "unrelated to the concept"
+        
+        contradict_score = 1.0 - support_score if label == "contradicts the concept" else 0.1
+        
+        # Calculate final entailment score
+        entailment_score = support_score - (contradict_score * 0.5)
+        entailment_score = max(0.0, min(1.0, entailment_score))
+        
+        return {
+            "score": entailment_score,
+            "label": label,
+            "support_score": support_score,
+            "contradict_score": contradict_score,
+            "all_scores": {
+                "supports the concept": support_score,
+                "contradicts the concept": contradict_score,
+                "unrelated to the concept": 1.0 - support_score - contradict_score
+            }
+        }
     
-    def _extract_keywords(self, text: str) -> set:
-        """Extract keywords from text"""
-        words = re.findall(r'\b\w+\b', text.lower())
-        stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
-                     'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are', 'were'}
-        return set(w for w in words if w not in stop_words and len(w) > 2)
+    def _reference_sentences(self, correct: TokenizedText) -> Tuple[Dict[str, int], "csr_matrix", np.ndarray]:
+        """
+        Vectorize the reference sentences once
+        
+        Returns:
+            Keyword vocabulary, L2-normalized binary sentence-by-keyword matrix
+            and the negation flag of each sentence
+        """
+        from scipy.sparse import csr_matrix
+        
+        vocabulary: Dict[str, int] = {}
+        rows, cols, values = [], [], []
+        for row, (keywords, _) in enumerate(correct.sentence_features):
+            weight = 1.0 / np.sqrt(len(keywords)) if keywords else 0.0
+            for keyword in keywords:
+                rows.append(row)
+                cols.append(vocabulary.setdefault(keyword, len(vocabulary)))
+                values.append(weight)
+        
+        matrix = csr_matrix(
+            (values, (rows, cols)),
+            shape=(len(correct.sentence_features), len(vocabulary))
+        )
+        negations = np.array([negated for _, negated in correct.sentence_features], dtype=bool)
+        return vocabulary, matrix, negations
+    
+    def _score_sentence_alignment(
+        self,
+        student: TokenizedText,
+        correct: TokenizedText,
+        reference: Tuple[Dict[str, int], "csr_matrix", np.ndarray]
+    ) -> dict:
+        """
+        Align student sentences with reference sentences and score per aligned pair
+        
+        Sentences are binary keyword vectors normalized by their full keyword
+        count, so one sparse product gives the cosine similarity of every
+        student sentence with every reference sentence.
+        """
+        from scipy.sparse import csr_matrix
+        
+        vocabulary, reference_matrix, reference_negations = reference
+        if not vocabulary:
+            # Nothing to align against: compare the answers as a whole
+            return self._score_entailment(
+                student.nli_keywords, student.has_negation,
+                correct.nli_keywords, correct.has_negation
+            )
+        
+        rows, cols, values = [], [], []
+        for row, (keywords, _) in enumerate(student.sentence_features):
+            if not keywords:
+                continue
+            weight = 1.0 / np.sqrt(len(keywords))
+            for keyword in keywords:
+                col = vocabulary.get(keyword)
+                if col is not None:
+                    rows.append(row)
+                    cols.append(col)
+                    values.append(weight)
+        student_matrix = csr_matrix(
+            (values, (rows, cols)),
+            shape=(len(student.sentence_features), len(vocabulary))
+        )
+        student_negations = np.array([negated for _, negated in student.sentence_features], dtype=bool)
+        
+        similarity = (student_matrix @ reference_matrix.T).toarray()
+        if similarity.size == 0:
+            best_match = np.zeros(0, dtype=int)
+            best_similarity = np.zeros(0)
+        else:
+            best_match = similarity.argmax(axis=1)
+            best_similarity = similarity[np.arange(len(best_match)), best_match]
+        
+        aligned = best_similarity >= SENTENCE_ALIGNMENT_THRESHOLD
+        contradicts = aligned & (student_negations != reference_negations[best_match])
+        consistent = aligned & ~contradicts
+        
+        aligned_count = int(aligned.sum())
+        if aligned_count == 0:
+            support_score = 0.5  # Neutral/unrelated
+            contradict_score = 0.1
+            label = "unrelated to the concept"
+        else:
+            contradict_fraction = contradicts.sum() / aligned_count
+            if consistent.any():
+                support_score = 0.7 + float(best_similarity[consistent].mean()) * 0.3  # 0.7-1.0
+            else:
+                support_score = 0.3
+            # Blend towards the contradiction score by the share of contradicting pairs
+            support_score = float(support_score * (1.0 - contradict_fraction) + 0.3 * contradict_fraction)
+            contradict_score = float(0.1 + 0.6 * contradict_fraction)
+            if contradict_fraction >= 0.5:
+                label = "contradicts the concept"
+            else:
+                label = "supports the concept"
+        
+        entailment_score = support_score - (contradict_score * 0.5)
+        entailment_score = max(0.0, min(1.0, entailment_score))
+        
+        student_sentences = student.sentences
+        reference_sentences = correct.sentences
+        return {
+            "score": entailment_score,
+            "label": label,
+            "support_score": support_score,
+            "contradict_score": contradict_score,
+            "all_scores": {
+                "supports the concept": support_score,
+                "contradicts the concept": contradict_score,
+                "unrelated to the concept": 1.0 - support_score - contradict_score
+            },
+            "mode": "sentence",
+            "aligned_sentences": aligned_count,
+            "contradicting_sentences": [
+                {
+                    "student_sentence": student_sentences[i],
+                    "reference_sentence": reference_sentences[best_match[i]],
+                    "similarity": float(best_similarity[i])
+                }
+                for i in np.flatnonzero(contradicts)
+            ]
+        }
+    
+    def _neutral_result(self) -> dict:
+        """Fallback result used when analysis fails"""
+        return {
+            "score": 0.5,
+            "label": "neutral",
+            "support_score": 0.5,
+            "contradict_score": 0.0,
+            "all_scores": {}
+        }
     
     def analyze_entailment(
         self,
-        student_answer: str,
-        correct_answer: str
+        student_answer: Union[str, TokenizedText],
+        correct_answer: Union[str, TokenizedText]
     ) -> dict:
         """
         Analyze if student answer is consistent with correct answer
@@ -44,69 +234,75 @@ class NLIAnalyzer:
         Args:
             student_answer: Student's response
             correct_answer: Model/correct answer
-            
+        
         Returns:
             Dictionary with entailment score and label
         """
         try:
-            # Extract keywords from both answers
-            student_keywords = self._extract_keywords(student_answer)
-            correct_keywords = self._extract_keywords(correct_answer)
-            
-            # Calculate keyword overlap
-            if not correct_keywords:
-                overlap = 1.0
-            else:
-                intersection = student_keywords & correct_keywords
-                overlap = len(intersection) / len(correct_keywords)
-            
-            # Check for negations
-            student_has_negation = self._has_negation(student_answer)
-            correct_has_negation = self._has_negation(correct_answer)
-            
-            # Determine support score
-            # High overlap + similar negation pattern = high support
-            # High overlap + different negation pattern = potential contradiction
-            if overlap > 0.5:
-                if student_has_negation == correct_has_negation:
-                    support_score = 0.7 + (overlap * 0.3)  # 0.7-1.0
-                    label = "supports the concept"
-                else:
-                    support_score = 0.3  # Potential contradiction
-                    label = "contradicts the concept"
+            student = as_tokenized(student_answer)
+            correct = as_tokenized(correct_answer)
+            if self.mode == "sentence":
+                analysis = self._score_sentence_alignment(
+                    student, correct, self._reference_sentences(correct)
+                )
             else:
-                support_score = 0.5  # Neutral/unrelated
-                label = "unrelated to the concept"
-            
-            contradict_score = 1.0 - support_score if label == "contradicts the concept" else 0.1
-            
-            # Calculate final entailment score
-            entailment_score = support_score - (contradict_score * 0.5)
-            entailment_score = max(0.0, min(1.0, entailment_score))
+                analysis = self._score_entailment(
+                    student.nli_keywords,
+                    student.has_negation,
+                    correct.nli_keywords,
+                    correct.has_negation
+                )
             
-            logger.info(f"NLI Analysis - Label: {label}, Score: {entailment_score:.3f}")
-            
-            return {
-                "score": entailment_score,
-                "label": label,
-                "support_score": support_score,
-                "contradict_score": contradict_score,
-                "all_scores": {
-                    "supports the concept": support_score,
-                    "contradicts the concept": contradict_score,
-                    "unrelated to the concept": 1.0 - support_score - contradict_score
-                }
-            }
+            logger.info(f"NLI Analysis - Label: {analysis['label']}, Score: {analysis['score']:.3f}")
             
+            return analysis
+        
         except Exception as e:
             logger.error(f"Error in NLI analysis: {e}")
-            return {
-                "score": 0.5,
-                "label": "neutral",
-                "support_score": 0.5,
-                "contradict_score": 0.0,
-                "all_scores": {}
-            }
+            return self._neutral_result()
+    
+    def analyze_entailment_batch(
+        self,
+        student_answers: List[Union[str, TokenizedText]],
+        correct_answer: Union[str, TokenizedText]
+    ) -> List[dict]:
+        """
+        Analyze consistency of many answers against the same correct answer
+        
+        Keywords and negation of the correct answer (or, in sentence mode,
+        its sentence matrix) are extracted once.
+        
+        Args:
+            student_answers: Students' responses
+            correct_answer: Model/correct answer
+        
+        Returns:
+            List of analysis dictionaries, one per answer
+        """
+        correct = as_tokenized(correct_answer)
+        reference = self._reference_sentences(correct) if self.mode == "sentence" else None
+        
+        analyses = []
+        for student_answer in student_answers:
+            try:
+                student = as_tokenized(student_answer)
+                if reference is not None:
+                    analysis = self._score_sentence_alignment(student, correct, reference)
+                else:
+                    analysis = self._score_entailment(
+                        student.nli_keywords,
+                        student.has_negation,
+                        correct.nli_keywords,
+                        correct.has_negation
+                    )
+                analyses.append(analysis)
+            except Exception as e:
+                logger.error(f"Error in NLI analysis: {e}")
+                analyses.append(self._neutral_result())
+        
+        logger.info(f"NLI analysis computed for {len(analyses)} answers")
+        
+        return analyses
     
     def get_entailment_feedback(self, analysis: dict) -> str:
         """
@@ -114,7 +310,7 @@ class NLIAnalyzer:
         
         Args:
             analysis: Analysis dictionary from analyze_entailment
-            
+        
         Returns:
             Feedback string
         """
@@ -122,8 +318,18 @@ class NLIAnalyzer:
         score = analysis["score"]
         
         if "supports" in label.lower():
-            return f"Answer is consistent with expected concepts (confidence: {score:.1%})."
+            feedback = f"Answer is consistent with expected concepts (confidence: {score:.1%})."
         elif "contradicts" in label.lower():
-            return f"⚠ Answer contains contradictory information (contradiction detected with {analysis['contradict_score']:.1%} confidence)."
+            feedback = f"⚠ Answer contains contradictory information (contradiction detected with {analysis['contradict_score']:.1%} confidence)."
         else:
-            return "Answer is neutral or tangentially related to the expected concepts."
+            feedback = "Answer is neutral or tangentially related to the expected concepts."
+        
+        # Sentence mode names the student sentences that negate their reference sentence
+        contradicting = analysis.get("contradicting_sentences")
+        if contradicting:
+            quoted = "; ".join(
+                f"\"{pair['student_sentence']}\" contradicts \"{pair['reference_sentence']}\""
+                for pair in contradicting
+            )
+            feedback += f" Contradicting sentences: {quoted}."
+        return feedback
@@ -0,0 +1,257 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+
+from app.services.rubric_matcher import CompiledRubric
+from app.utils.text_preprocessing import TokenizedText
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class StoredQuestion:
+    """A registered question with its cleaned reference answer"""
+    id: str
+    question: str
+    rubrics: List[str]
+    correct_answer: str
+    total_marks: float
+    created_at: float
+    course: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class QuestionArtifacts:
+    """
+    Reference-side analysis of a question, computed once
+    The tokenized correct answer carries its n-grams and sentence features
+    already computed
+    """
+    question: StoredQuestion
+    correct_answer: TokenizedText
+    compiled_rubric: CompiledRubric
+
+
+class MemoryQuestionStore:
+    """In-process question store"""
+    
+    name = "memory"
+    
+    def __init__(self):
+        self._questions: Dict[str, StoredQuestion] = {}
+        self._lock = threading.Lock()
+    
+    def add(self, question: StoredQuestion):
+        """Store a question"""
+        with self._lock:
+            self._questions[question.id] = question
+    
+    def get(self, question_id: str) -> Optional[StoredQuestion]:
+        """Return a question, or None if unknown"""
+        with self._lock:
+            return self._questions.get(question_id)
+    
+    def delete(self, question_id: str) -> bool:
+        """Remove a question, returning whether it existed"""
+        with self._lock:
+            return self._questions.pop(question_id, None) is not None
+    
+    def __len__(self) -> int:
+        return len(self._questions)
+
+
+class SQLiteQuestionStore:
+    """On-disk question store that survives restarts"""
+    
+    name = "sqlite"
+    
+    def __init__(self, path: str):
+        """
+        Args:
+            path: SQLite database file
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS questions ("
+            "id TEXT PRIMARY KEY, question TEXT NOT NULL, rubrics TEXT NOT NULL, "
+            "correct_answer TEXT NOT NULL, total_marks REAL NOT NULL, created_at REAL NOT NULL, course TEXT)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(questions)")}
+        if "course" not in columns:
+            self._conn.execute("ALTER TABLE questions ADD COLUMN course TEXT")
+        self._conn.commit()
+    
+    def add(self, question: StoredQuestion):
+        """Store a question"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO questions "
+                "(id, question, rubrics, correct_answer, total_marks, created_at, course) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    question.id, question.question, json.dumps(question.rubrics),
+                    question.correct_answer, question.total_marks, question.created_at, question.course
+                )
+            )
+            self._conn.commit()
+    
+    def get(self, question_id: str) -> Optional[StoredQuestion]:
+        """Return a question, or None if unknown"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, question, rubrics, correct_answer, total_marks, created_at, course "
+                "FROM questions WHERE id = ?",
+                (question_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        id_, question, rubrics, correct_answer, total_marks, created_at, course = row
+        return StoredQuestion(id_, question, json.loads(rubrics), correct_answer, total_marks, created_at, course)
+    
+    def delete(self, question_id: str) -> bool:
+        """Remove a question, returning whether it existed"""
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM questions WHERE id = ?", (question_id,))
+            self._conn.commit()
+            return cursor.rowcount > 0
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM questions").fetchone()[0]
+    
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
+
+
+class QuestionRegistry:
+    """
+    Registered questions and their precomputed artifacts
+    Questions live in the store; artifacts are kept in a bounded in-memory
+    LRU and rebuilt from the stored question after eviction or a restart
+    """
+    
+    def __init__(self, store, cache_size: int = 256):
+        """
+        Initialize the registry
+        
+        Args:
+            store: MemoryQuestionStore or SQLiteQuestionStore
+            cache_size: Number of questions whose artifacts are kept in memory
+        """
+        logger.info(f"Initializing {store.name} question registry")
+        self.store = store
+        self.cache_size = cache_size
+        self._artifacts: "OrderedDict[str, QuestionArtifacts]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def _remember(self, artifacts: QuestionArtifacts):
+        """Keep artifacts in the LRU"""
+        with self._lock:
+            self._artifacts[artifacts.question.id] = artifacts
+            self._artifacts.move_to_end(artifacts.question.id)
+            while len(self._artifacts) > self.cache_size:
+                self._artifacts.popitem(last=False)
+    
+    def register(
+        self,
+        question: str,
+        rubrics: List[str],
+        correct_answer: str,
+        total_marks: float,
+        prepare: Callable[[StoredQuestion], QuestionArtifacts],
+        course: Optional[str] = None
+    ) -> QuestionArtifacts:
+        """
+        Store a new question and precompute its artifacts
+        
+        Args:
+            question: The question statement
+            rubrics: List of key concepts/rubrics
+            correct_answer: Cleaned model/correct answer
+            total_marks: Total marks for the question
+            prepare: Builds the artifacts of a stored question
+            course: Course or question bank the question belongs to
+        
+        Returns:
+            Artifacts of the registered question
+        """
+        stored = StoredQuestion(
+            id=uuid.uuid4().hex,
+            question=question,
+            rubrics=list(rubrics),
+            correct_answer=correct_answer,
+            total_marks=total_marks,
+            created_at=time.time(),
+            course=course
+        )
+        artifacts = prepare(stored)
+        self.store.add(stored)
+        self._remember(artifacts)
+        logger.info(f"Registered question {stored.id} ({len(rubrics)} rubrics)")
+        return artifacts
+    
+    def get(
+        self,
+        question_id: str,
+        prepare: Callable[[StoredQuestion], QuestionArtifacts]
+    ) -> Optional[QuestionArtifacts]:
+        """
+        Look up a question's artifacts, rebuilding them if not in memory
+        
+        Args:
+            question_id: Id returned by register
+            prepare: Builds the artifacts of a stored question
+        
+        Returns:
+            QuestionArtifacts, or None if the question is unknown
+        """
+        with self._lock:
+            artifacts = self._artifacts.get(question_id)
+            if artifacts is not None:
+                self._artifacts.move_to_end(question_id)
+                return artifacts
+        
+        stored = self.store.get(question_id)
+        if stored is None:
+            return None
+        artifacts = prepare(stored)
+        self._remember(artifacts)
+        return artifacts
+    
+    def delete(self, question_id: str) -> bool:
+        """Remove a question and its artifacts, returning whether it existed"""
+        with self._lock:
+            self._artifacts.pop(question_id, None)
+        return self.store.delete(question_id)
+    
+    def close(self):
+        """Release the store's resources"""
+        if hasattr(self.store, "close"):
+            self.store.close()
+
+
+def create_question_registry(backend: str, path: str = "questions.sqlite3") -> QuestionRegistry:
+    """
+    Build a question registry from configuration
+    
+    Args:
+        backend: "memory" or "sqlite"
+        path: Database file for the sqlite backend
+    
+    Returns:
+        QuestionRegistry
+    """
+    if backend == "sqlite":
+        return QuestionRegistry(SQLiteQuestionStore(path))
+    return QuestionRegistry(MemoryQuestionStore())
@@ -0,0 +1,321 @@
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+from app.models import EvaluationResponse
+
+logger = logging.getLogger(__name__)
+
+
+def evaluation_cache_key(
+    student_answer: str,
+    rubrics: List[str],
+    correct_answer: str,
+    total_marks: float,
+    fingerprint: str,
+    course: Optional[str] = None,
+    detail: bool = True
+) -> str:
+    """
+    Stable hash of everything an evaluation result depends on
+    
+    Args:
+        student_answer: Cleaned student's response
+        rubrics: List of key concepts/rubrics
+        correct_answer: Cleaned model/correct answer
+        total_marks: Total marks for the question
+        fingerprint: Active weights and analyzer versions (see EvaluationPipeline.fingerprint)
+        course: Course or question bank, which selects the IDF model
+        detail: Whether the result includes feedback and rubric concept lists
+    
+    Returns:
+        Hex digest used as the cache key
+    """
+    key = [student_answer, rubrics, correct_answer, float(total_marks), fingerprint]
+    if course is not None:
+        key.append(course)
+    if not detail:
+        key.append({"detail": False})
+    payload = json.dumps(key, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class MemoryCacheBackend:
+    """Bounded in-process LRU store with optional TTL"""
+    
+    name = "memory"
+    
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 0):
+        """
+        Args:
+            max_entries: Least recently used entries beyond this are evicted
+            ttl_seconds: Entries older than this expire (0 disables expiry)
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[str]:
+        """Return the stored value, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            created, value = entry
+            if self.ttl_seconds and time.time() - created > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+    
+    def get_many(self, keys: List[str]) -> List[Optional[str]]:
+        """Return the stored value of each key, None where missing or expired"""
+        now = time.time()
+        values = []
+        with self._lock:
+            entries = self._entries
+            for key in keys:
+                entry = entries.get(key)
+                if entry is not None and self.ttl_seconds and now - entry[0] > self.ttl_seconds:
+                    del entries[key]
+                    entry = None
+                if entry is not None:
+                    entries.move_to_end(key)
+                values.append(entry[1] if entry is not None else None)
+        return values
+    
+    def set(self, key: str, value: str):
+        """Store a value, evicting least recently used entries over the limit"""
+        self.set_many({key: value})
+    
+    def set_many(self, items: Dict[str, str]):
+        """Store several values, evicting least recently used entries over the limit"""
+        now = time.time()
+        with self._lock:
+            for key, value in items.items():
+                self._entries[key] = (now, value)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        """Remove all entries"""
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCacheBackend:
+    """On-disk LRU store with optional TTL that survives restarts"""
+    
+    name = "sqlite"
+    
+    # Keys per statement of get_many, below SQLite's bound parameter limit
+    KEYS_PER_QUERY = 500
+    
+    def __init__(self, path: str, max_entries: int = 10000, ttl_seconds: float = 0):
+        """
+        Args:
+            path: SQLite database file
+            max_entries: Least recently used entries beyond this are evicted
+            ttl_seconds: Entries older than this expire (0 disables expiry)
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS evaluation_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS evaluation_cache_accessed ON evaluation_cache (accessed)"
+        )
+        self._conn.commit()
+    
+    def _evict(self):
+        """Delete least recently used entries over the limit (lock held)"""
+        self._conn.execute(
+            "DELETE FROM evaluation_cache WHERE key IN ("
+            "SELECT key FROM evaluation_cache ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+    
+    def get(self, key: str) -> Optional[str]:
+        """Return the stored value, or None if missing or expired"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created FROM evaluation_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created = row
+            if self.ttl_seconds and now - created > self.ttl_seconds:
+                self._conn.execute("DELETE FROM evaluation_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE evaluation_cache SET accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            return value
+    
+    def get_many(self, keys: List[str]) -> List[Optional[str]]:
+        """Return the stored value of each key, None where missing or expired, in one transaction"""
+        now = time.time()
+        found: Dict[str, Tuple[str, float]] = {}
+        with self._lock:
+            for start in range(0, len(keys), self.KEYS_PER_QUERY):
+                chunk = keys[start:start + self.KEYS_PER_QUERY]
+                rows = self._conn.execute(
+                    f"SELECT key, value, created FROM evaluation_cache WHERE key IN ({', '.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                found.update((key, (value, created)) for key, value, created in rows)
+            expired = [
+                key for key, (_, created) in found.items()
+                if self.ttl_seconds and now - created > self.ttl_seconds
+            ]
+            for key in expired:
+                del found[key]
+            if expired:
+                self._conn.executemany("DELETE FROM evaluation_cache WHERE key = ?", [(key,) for key in expired])
+            if found:
+                self._conn.executemany(
+                    "UPDATE evaluation_cache SET accessed = ? WHERE key = ?", [(now, key) for key in found]
+                )
+            if expired or found:
+                self._conn.commit()
+        return [found[key][0] if key in found else None for key in keys]
+    
+    def set(self, key: str, value: str):
+        """Store a value, evicting least recently used entries over the limit"""
+        self.set_many({key: value})
+    
+    def set_many(self, items: Dict[str, str]):
+        """Store several values in one transaction, evicting least recently used entries over the limit"""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO evaluation_cache (key, value, created, accessed) "
+                "VALUES (?, ?, ?, ?)",
+                [(key, value, now, now) for key, value in items.items()]
+            )
+            self._evict()
+            self._conn.commit()
+    
+    def clear(self):
+        """Remove all entries"""
+        with self._lock:
+            self._conn.execute("DELETE FROM evaluation_cache")
+            self._conn.commit()
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM evaluation_cache").fetchone()[0]
+    
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
+
+
+class ResultCache:
+    """
+    Cache of evaluation responses keyed by a content hash of their inputs
+    Tracks hit/miss counters for the health endpoint
+    """
+    
+    def __init__(self, backend):
+        """
+        Initialize the cache
+        
+        Args:
+            backend: MemoryCacheBackend or SQLiteCacheBackend storing serialized responses
+        """
+        logger.info(f"Initializing {backend.name} evaluation result cache")
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key: str) -> Optional[EvaluationResponse]:
+        """
+        Look up a cached response
+        
+        Args:
+            key: Key from evaluation_cache_key
+        
+        Returns:
+            The cached EvaluationResponse, or None on a miss
+        """
+        value = self.backend.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return EvaluationResponse.model_validate_json(value)
+    
+    def set(self, key: str, response: EvaluationResponse):
+        """
+        Store a response
+        
+        Args:
+            key: Key from evaluation_cache_key
+            response: Evaluation result to cache
+        """
+        self.backend.set(key, response.model_dump_json())
+    
+    def clear(self):
+        """Drop all cached responses"""
+        self.backend.clear()
+    
+    def stats(self) -> Dict:
+        """Hit/miss counters and size of the cache"""
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.backend.name,
+            "entries": len(self.backend),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0
+        }
+    
+    def close(self):
+        """Release the backend's resources"""
+        if hasattr(self.backend, "close"):
+            self.backend.close()
+
+
+def create_result_cache(
+    backend: str,
+    max_entries: int = 10000,
+    ttl_seconds: float = 0,
+    path: str = "evaluation_cache.sqlite3"
+) -> Optional[ResultCache]:
+    """
+    Build a result cache from configuration
+    
+    Args:
+        backend: "memory", "sqlite" or "none"
+        max_entries: Maximum number of cached responses
+        ttl_seconds: Entry lifetime in seconds (0 disables expiry)
+        path: Database file for the sqlite backend
+    
+    Returns:
+        ResultCache, or None when caching is disabled
+    """
+    if backend == "none":
+        return None
+    if backend == "sqlite":
+        return ResultCache(SQLiteCacheBackend(path, max_entries, ttl_seconds))
+    return ResultCache(MemoryCacheBackend(max_entries, ttl_seconds))
@@ -1,59 +1,319 @@
-from typing import List, Dict
+from collections import OrderedDict
+from typing import List, Dict, Optional, Sequence, Tuple, Union
+import hashlib
+import json
 import logging
 import re
+import threading
+
+from app.utils.aho_corasick import PhraseAutomaton
+from app.utils.text_preprocessing import RUBRIC_STOP_WORDS, TokenizedText, as_tokenized, stem_word, tokenize
 
 logger = logging.getLogger(__name__)
 
+# Punctuation ending a rubric phrase
+PHRASE_BOUNDARY_PATTERN = re.compile(r"[,;:.!?()\[\]/]+")
+
+# Words ending a rubric phrase besides stop words ("applications such as ...")
+PHRASE_BREAK_WORDS = RUBRIC_STOP_WORDS | frozenset({
+    'such', 'like', 'including', 'include', 'includes', 'etc', 'eg', 'ie',
+    'also', 'both', 'either', 'than', 'then', 'into', 'via', 'versus', 'vs'
+})
+
+
+def rubric_fingerprint(rubrics: List[str]) -> str:
+    """Stable hash of a rubric list, used as its cache key"""
+    return hashlib.sha256(json.dumps(rubrics).encode("utf-8")).hexdigest()
+
+
+class CompiledRubric:
+    """
+    Rubric terms compiled once per question into one Aho-Corasick automaton
+    The automaton holds every rubric keyword and phrase (and their synonyms),
+    so all hits in an answer are found in a single pass over its tokens,
+    however many rubrics and phrases the question has.
+    """
+    
+    def __init__(
+        self,
+        rubrics: List[str],
+        rubric_keywords: List[set],
+        rubric_phrases: Optional[List[List[Tuple[str, ...]]]] = None,
+        synonyms: Sequence[Tuple[str, ...]] = (),
+        stemming: bool = False,
+        loose_phrase_credit: float = 1.0
+    ):
+        """
+        Build the automaton
+        
+        A keyword found as part of one of its rubric's phrases (or of a
+        synonym of a phrase) counts fully; a keyword that only appears in
+        multi-word phrases of its rubric, found outside them, counts for
+        loose_phrase_credit.
+        
+        Args:
+            rubrics: List of key concepts/rubrics
+            rubric_keywords: Keyword set of each rubric, in the same order
+            rubric_phrases: Phrases (token runs) of each rubric, see rubric_phrases
+            synonyms: Groups of interchangeable token sequences
+            stemming: Also match stemmed variants ("learners" for "learning")
+            loose_phrase_credit: Credit (0-1) of a phrase keyword found outside the phrase
+        """
+        self.rubrics = list(rubrics)
+        self.fingerprint = rubric_fingerprint(self.rubrics)
+        self.keyword_counts = [len(keywords) for keywords in rubric_keywords]
+        self.stemming = stemming
+        rubric_phrases = rubric_phrases or [[(keyword,) for keyword in keywords] for keywords in rubric_keywords]
+        
+        # Every (rubric, keyword) pair gets a slot. The automaton's values are
+        # slots earning full credit, or slot + slot count for loose credit.
+        slots: Dict[Tuple[int, str], int] = {}
+        for rubric_id, keywords in enumerate(rubric_keywords):
+            for keyword in sorted(keywords):
+                slots[(rubric_id, keyword)] = len(slots)
+        self._slot_rubrics = [rubric_id for rubric_id, _ in slots]
+        self._full_slots = frozenset(range(len(slots)))
+        self._value_slots = list(range(len(slots))) * 2
+        self.loose_phrase_credit = loose_phrase_credit
+        
+        patterns = []
+        for rubric_id, (keywords, phrases) in enumerate(zip(rubric_keywords, rubric_phrases)):
+            standalone = {phrase[0] for phrase in phrases if len(phrase) == 1}
+            for keyword in keywords:
+                slot = slots[(rubric_id, keyword)]
+                patterns.append(((keyword,), slot if keyword in standalone else slot + len(slots)))
+            # (tokens to find, rubric words they credit in full)
+            spans = [(phrase, phrase) for phrase in phrases if len(phrase) > 1]
+            # A synonym found in a phrase lets its alternatives stand in for that part of the phrase
+            for group in synonyms:
+                normalized = [self._normalize(member) for member in group]
+                for phrase in phrases:
+                    normalized_phrase = self._normalize(phrase)
+                    for member, normalized_member in zip(group, normalized):
+                        position = _find_run(normalized_phrase, normalized_member)
+                        if position >= 0:
+                            span = phrase[position:position + len(member)]
+                            spans.extend(
+                                (alternative, span) for alternative, normalized_alternative in zip(group, normalized)
+                                if normalized_alternative != normalized_member
+                            )
+            for tokens, credited in spans:
+                patterns.extend(
+                    (tokens, slots[(rubric_id, token)]) for token in credited if token in keywords
+                )
+        
+        self.automaton = PhraseAutomaton(
+            (self._normalize(tokens), value) for tokens, value in patterns
+        )
+    
+    def _normalize(self, tokens: Sequence[str]) -> Tuple[str, ...]:
+        """Tokens as the automaton matches them"""
+        return tuple(stem_word(token) for token in tokens) if self.stemming else tuple(tokens)
+    
+    def coverage(self, answer: TokenizedText) -> List[float]:
+        """
+        Fraction of each rubric's keywords found in the answer
+        
+        Args:
+            answer: Tokenized answer
+        
+        Returns:
+            Coverage (0-1) per rubric, in rubric order
+        """
+        tokens = answer.phrase_tokens
+        if self.stemming:
+            tokens = self._normalize(tokens)
+        found = self.automaton.find(tokens)
+        full = found & self._full_slots
+        slot_rubrics = self._slot_rubrics
+        hits = [0.0] * len(self.rubrics)
+        for slot in full:
+            hits[slot_rubrics[slot]] += 1.0
+        if len(full) < len(found):
+            for slot in set(map(self._value_slots.__getitem__, found - full)) - full:
+                hits[slot_rubrics[slot]] += self.loose_phrase_credit
+        
+        return [
+            hit / count if count else 1.0
+            for hit, count in zip(hits, self.keyword_counts)
+        ]
+
+
+def _find_run(tokens: Tuple[str, ...], run: Tuple[str, ...]) -> int:
+    """Position of the first occurrence of run in tokens, -1 if absent"""
+    if not run:
+        return -1
+    for i in range(len(tokens) - len(run) + 1):
+        if tokens[i:i + len(run)] == run:
+            return i
+    return -1
+
+
+def rubric_phrases(rubric: str) -> List[Tuple[str, ...]]:
+    """
+    Split a rubric into phrases: runs of words not broken by punctuation or
+    stop words
+    
+    "Types: supervised learning, natural language processing" gives
+    ("types",), ("supervised", "learning") and ("natural", "language", "processing").
+    
+    Args:
+        rubric: Key concept/rubric text
+    
+    Returns:
+        Phrases as tuples of lowercase tokens
+    """
+    phrases = []
+    for part in PHRASE_BOUNDARY_PATTERN.split(rubric):
+        run: List[str] = []
+        for token in tokenize(part).phrase_tokens:
+            if token in PHRASE_BREAK_WORDS:
+                if run:
+                    phrases.append(tuple(run))
+                run = []
+            else:
+                run.append(token)
+        if run:
+            phrases.append(tuple(run))
+    return phrases
+
+
+def load_synonyms(path: str) -> List[Tuple[str, ...]]:
+    """
+    Read rubric synonym groups from a JSON file
+    
+    The file maps a term to its alternatives, e.g.
+    {"natural language processing": ["nlp"], "machine learning": ["ml"]};
+    each entry is matched in both directions.
+    
+    Args:
+        path: JSON file, or "" for no synonyms
+    
+    Returns:
+        Groups of token sequences
+    
+    Raises:
+        ValueError: If the file is not a JSON object of string lists
+    """
+    if not path:
+        return []
+    with open(path) as synonyms_file:
+        entries = json.load(synonyms_file)
+    if not isinstance(entries, dict) or not all(
+        isinstance(alternatives, list) and all(isinstance(a, str) for a in alternatives)
+        for alternatives in entries.values()
+    ):
+        raise ValueError(f"{path} must map each term to a list of alternatives")
+    groups = []
+    for term, alternatives in entries.items():
+        group = tuple(dict.fromkeys(
+            tokens for tokens in (tokenize(text).phrase_tokens for text in [term] + alternatives) if tokens
+        ))
+        if len(group) > 1:
+            groups.append(group)
+    return groups
+
 
 class RubricMatcher:
     """
-    Keyword-based rubric matching service
-    Analyzes concept coverage using text matching and keyword extraction
+    Keyword and phrase based rubric matching service
+    Analyzes concept coverage by matching rubric keywords and multi-word
+    phrases, optionally with synonyms and stemmed variants
     """
     
-    def __init__(self):
+    # Bump when scoring logic changes so cached results are invalidated. With
+    # the default options phrases score exactly as the keyword matcher did, so
+    # its version is kept; other options are appended to it.
+    version = "keyword-1"
+    
+    def __init__(
+        self,
+        cache_size: int = 256,
+        stemming: bool = False,
+        synonyms: Sequence[Tuple[str, ...]] = (),
+        loose_phrase_credit: float = 1.0
+    ):
         """
         Initialize the rubric matcher
+        
+        Args:
+            cache_size: Number of compiled rubric lists kept in memory
+            stemming: Also match stemmed variants of rubric words
+            synonyms: Groups of interchangeable token sequences (see load_synonyms)
+            loose_phrase_credit: Credit (0-1) of a word of a multi-word rubric
+                phrase found in the answer outside the phrase
         """
-        logger.info("Initializing keyword-based rubric matcher")
+        if not 0.0 <= loose_phrase_credit <= 1.0:
+            raise ValueError(f"Loose phrase credit must be between 0 and 1, got {loose_phrase_credit}")
+        logger.info("Initializing phrase-based rubric matcher")
+        self.cache_size = cache_size
+        self.stemming = stemming
+        self.synonyms = [tuple(group) for group in synonyms]
+        self.loose_phrase_credit = loose_phrase_credit
+        options = []
+        if loose_phrase_credit != 1.0:
+            options.append(f"loose={loose_phrase_credit:g}")
+        if stemming:
+            options.append("stem")
+        if self.synonyms:
+            options.append(f"synonyms={hashlib.sha256(json.dumps(self.synonyms).encode('utf-8')).hexdigest()[:12]}")
+        if options:
+            self.version = ":".join([self.version] + options)
+        self._compiled_cache: "OrderedDict[str, CompiledRubric]" = OrderedDict()
+        self._cache_lock = threading.Lock()
         logger.info("Rubric matcher initialized successfully")
     
-    def _extract_keywords(self, text: str) -> set:
-        """Extract keywords from text"""
-        # Convert to lowercase and split into words
-        words = re.findall(r'\b\w+\b', text.lower())
-        # Filter out common stop words
-        stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 
-                     'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are', 'were', 'be',
-                     'been', 'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will',
-                     'would', 'should', 'could', 'may', 'might', 'must', 'can', 'this',
-                     'that', 'these', 'those', 'it', 'its', 'which', 'who', 'what', 'where',
-                     'when', 'why', 'how'}
-        return set(w for w in words if w not in stop_words and len(w) > 2)
-    
-    def _calculate_coverage(self, rubric_keywords: set, answer_keywords: set) -> float:
-        """Calculate how well the answer covers the rubric keywords"""
-        if not rubric_keywords:
-            return 1.0
-        
-        intersection = rubric_keywords & answer_keywords
-        coverage = len(intersection) / len(rubric_keywords)
-        return coverage
+    def compile_rubrics(self, rubrics: Union[List[str], CompiledRubric]) -> CompiledRubric:
+        """
+        Get the compiled form of a rubric list, building it on first use
+        
+        Compiled rubrics are cached by a hash of the rubric list, so a question
+        graded across many requests is only compiled once.
+        
+        Args:
+            rubrics: List of key concepts/rubrics (returned as is if already compiled)
+        
+        Returns:
+            CompiledRubric for the list
+        """
+        if isinstance(rubrics, CompiledRubric):
+            return rubrics
+        
+        key = rubric_fingerprint(rubrics)
+        with self._cache_lock:
+            compiled = self._compiled_cache.get(key)
+            if compiled is not None:
+                self._compiled_cache.move_to_end(key)
+                return compiled
+        
+        compiled = CompiledRubric(
+            rubrics,
+            [tokenize(rubric).keywords for rubric in rubrics],
+            rubric_phrases=[rubric_phrases(rubric) for rubric in rubrics],
+            synonyms=self.synonyms,
+            stemming=self.stemming,
+            loose_phrase_credit=self.loose_phrase_credit
+        )
+        
+        with self._cache_lock:
+            self._compiled_cache[key] = compiled
+            while len(self._compiled_cache) > self.cache_size:
+                self._compiled_cache.popitem(last=False)
+        
+        return compiled
+    
+    def _score_coverage(self, compiled: CompiledRubric, student_answer: TokenizedText) -> Dict:
+        """Classify each rubric as covered/partial/missing and compute the score"""
+        return self.score_coverage(compiled.rubrics, compiled.coverage(student_answer))
     
-    def analyze_rubric_coverage(
-        self,
-        student_answer: str,
-        rubrics: List[str],
-        correct_answer: str
-    ) -> Dict:
+    def score_coverage(self, rubrics: List[str], coverages: List[float]) -> Dict:
         """
-        Analyze how well the student answer covers the rubric points
+        Classify each rubric as covered/partial/missing and compute the score
         
         Args:
-            student_answer: Student's response
             rubrics: List of key concepts/rubrics
-            correct_answer: Model answer for reference
-            
+            coverages: Fraction of each rubric's keywords found in the answer
+        
         Returns:
             Dictionary with score and analysis
         """
@@ -61,12 +321,7 @@ class RubricMatcher:
         missing_concepts = []
         partial_concepts = []
         
-        student_keywords = self._extract_keywords(student_answer)
-        
-        for rubric in rubrics:
-            rubric_keywords = self._extract_keywords(rubric)
-            coverage = self._calculate_coverage(rubric_keywords, student_keywords)
-            
+        for rubric, coverage in zip(rubrics, coverages):
             if coverage >= 0.7:  # 70% of keywords found
                 covered_concepts.append(rubric)
             elif coverage >= 0.3:  # 30-70% of keywords found
@@ -82,8 +337,6 @@ class RubricMatcher:
             # Full points for covered, half points for partial
             score = (len(covered_concepts) + 0.5 * len(partial_concepts)) / total_rubrics
         
-        logger.info(f"Rubric coverage: {score:.3f} ({len(covered_concepts)}/{total_rubrics} covered)")
-        
         return {
             "score": score,
             "covered_concepts": covered_concepts,
@@ -92,13 +345,90 @@ class RubricMatcher:
             "total_rubrics": total_rubrics
         }
     
+    def analyze_rubric_coverage(
+        self,
+        student_answer: Union[str, TokenizedText],
+        rubrics: Union[List[str], CompiledRubric],
+        correct_answer: Union[str, TokenizedText]
+    ) -> Dict:
+        """
+        Analyze how well the student answer covers the rubric points
+        
+        Args:
+            student_answer: Student's response
+            rubrics: List of key concepts/rubrics, or their compiled form
+            correct_answer: Model answer for reference
+        
+        Returns:
+            Dictionary with score and analysis
+        """
+        compiled = self.compile_rubrics(rubrics)
+        analysis = self._score_coverage(compiled, as_tokenized(student_answer))
+        
+        logger.info(
+            f"Rubric coverage: {analysis['score']:.3f} "
+            f"({len(analysis['covered_concepts'])}/{analysis['total_rubrics']} covered)"
+        )
+        
+        return analysis
+    
+    def analyze_rubric_coverage_batch(
+        self,
+        student_answers: List[Union[str, TokenizedText]],
+        rubrics: Union[List[str], CompiledRubric],
+        correct_answer: Union[str, TokenizedText]
+    ) -> List[Dict]:
+        """
+        Analyze rubric coverage for many answers to the same question
+        
+        The rubric list is compiled once and reused for every answer.
+        
+        Args:
+            student_answers: Students' responses
+            rubrics: List of key concepts/rubrics, or their compiled form
+            correct_answer: Model answer for reference
+        
+        Returns:
+            List of analysis dictionaries, one per answer
+        """
+        compiled = self.compile_rubrics(rubrics)
+        analyses = [
+            self._score_coverage(compiled, as_tokenized(answer))
+            for answer in student_answers
+        ]
+        
+        logger.info(f"Rubric coverage computed for {len(analyses)} answers")
+        
+        return analyses
+    
+    def rubric_item_coverage(
+        self,
+        student_answers: List[Union[str, TokenizedText]],
+        rubrics: List[str]
+    ) -> List[List[float]]:
+        """
+        Fraction of each rubric's keywords found in each answer
+        
+        A rubric's coverage does not depend on the other rubrics, so it can be
+        computed for some of a question's rubrics only.
+        
+        Args:
+            student_answers: Students' responses
+            rubrics: Rubrics to measure
+        
+        Returns:
+            Coverage (0-1) per rubric, in rubric order, for each answer
+        """
+        compiled = self.compile_rubrics(rubrics)
+        return [compiled.coverage(as_tokenized(answer)) for answer in student_answers]
+    
     def get_detailed_feedback(self, analysis: Dict) -> str:
         """
         Generate detailed feedback from rubric analysis
         
         Args:
             analysis: Analysis dictionary from analyze_rubric_coverage
-            
+        
         Returns:
             Feedback string
         """
@@ -120,3 +450,26 @@ class RubricMatcher:
             )
         
         return " | ".join(feedback_parts) if feedback_parts else "All concepts covered adequately."
+
+
+def create_rubric_matcher(
+    stemming: bool = False,
+    synonyms_path: str = "",
+    loose_phrase_credit: float = 1.0
+) -> RubricMatcher:
+    """
+    Build the rubric matcher from configuration
+    
+    Args:
+        stemming: Also match stemmed variants of rubric words
+        synonyms_path: JSON file of rubric synonyms ("" for none)
+        loose_phrase_credit: Credit (0-1) of a phrase word found outside the phrase
+    
+    Returns:
+        RubricMatcher
+    """
+    return RubricMatcher(
+        stemming=stemming,
+        synonyms=load_synonyms(synonyms_path),
+        loose_phrase_credit=loose_phrase_credit
+    )
@@ -1,8 +1,23 @@
-from typing import Dict
+from typing import Collection, Dict, FrozenSet, Sequence
 import logging
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
+# Weights of the rubric, semantic and NLI scores in the final score, until calibrated
+DEFAULT_SCORE_WEIGHTS = {"rubric_weight": 0.5, "semantic_weight": 0.3, "nli_weight": 0.2}
+
+# Lowest percentage of each assessment but the last, best first
+DEFAULT_GRADE_THRESHOLDS = (85.0, 70.0, 55.0, 40.0)
+GRADE_LABELS = (
+    "Excellent answer",
+    "Good answer",
+    "Satisfactory answer",
+    "Needs improvement",
+    "Insufficient answer"
+)
+
 
 class ScoreAggregator:
     """
@@ -13,7 +28,8 @@ class ScoreAggregator:
         self,
         rubric_weight: float = 0.5,
         semantic_weight: float = 0.3,
-        nli_weight: float = 0.2
+        nli_weight: float = 0.2,
+        grade_thresholds: Sequence[float] = DEFAULT_GRADE_THRESHOLDS
     ):
         """
         Initialize score aggregator with weights
@@ -22,12 +38,25 @@ class ScoreAggregator:
             rubric_weight: Weight for rubric matching score
             semantic_weight: Weight for semantic similarity score
             nli_weight: Weight for NLI/entailment score
+            grade_thresholds: Lowest percentage of each assessment in
+                GRADE_LABELS but the last, in decreasing order
         """
+        if len(grade_thresholds) != len(GRADE_LABELS) - 1:
+            raise ValueError(f"Expected {len(GRADE_LABELS) - 1} grade thresholds, got {len(grade_thresholds)}")
+        self.grade_thresholds = tuple(float(threshold) for threshold in grade_thresholds)
+        
+        if min(rubric_weight, semantic_weight, nli_weight) < 0:
+            raise ValueError("Score weights must not be negative")
+        
         # Normalize weights to sum to 1.0
         total = rubric_weight + semantic_weight + nli_weight
+        if total <= 0:
+            raise ValueError("At least one score weight must be positive")
         self.rubric_weight = rubric_weight / total
         self.semantic_weight = semantic_weight / total
         self.nli_weight = nli_weight / total
+        # Aggregators over fewer components, by skipped set (see without)
+        self._without: Dict[FrozenSet[str], "ScoreAggregator"] = {}
         
         logger.info(
             f"Score weights - Rubric: {self.rubric_weight:.2f}, "
@@ -35,6 +64,46 @@ class ScoreAggregator:
             f"NLI: {self.nli_weight:.2f}"
         )
     
+    def weights(self) -> Dict:
+        """Normalized weights and grade thresholds, as accepted by the constructor"""
+        return {
+            "rubric_weight": self.rubric_weight,
+            "semantic_weight": self.semantic_weight,
+            "nli_weight": self.nli_weight,
+            "grade_thresholds": list(self.grade_thresholds)
+        }
+    
+    def without(self, skipped: Collection[str]) -> "ScoreAggregator":
+        """
+        Aggregator over the components that were not skipped
+        
+        The weights of the skipped components are spread over the others in
+        proportion to their own weights, so the final score stays on 0-1.
+        One aggregator is built per skipped set and reused.
+        
+        Args:
+            skipped: Components left out ("rubric", "semantic" and/or "nli")
+        
+        Returns:
+            ScoreAggregator giving the skipped components no weight, or this
+            aggregator if nothing is skipped
+        
+        Raises:
+            ValueError: If every component with a positive weight is skipped
+        """
+        if not skipped:
+            return self
+        key = frozenset(skipped)
+        aggregator = self._without.get(key)
+        if aggregator is None:
+            aggregator = self._without[key] = ScoreAggregator(
+                rubric_weight=0.0 if "rubric" in key else self.rubric_weight,
+                semantic_weight=0.0 if "semantic" in key else self.semantic_weight,
+                nli_weight=0.0 if "nli" in key else self.nli_weight,
+                grade_thresholds=self.grade_thresholds
+            )
+        return aggregator
+    
     def aggregate_scores(
         self,
         rubric_score: float,
@@ -48,7 +117,7 @@ class ScoreAggregator:
             rubric_score: Score from rubric matching (0-1)
             semantic_score: Score from semantic similarity (0-1)
             nli_score: Score from NLI analysis (0-1)
-            
+        
         Returns:
             Final aggregated score (0-1)
         """
@@ -70,6 +139,39 @@ class ScoreAggregator:
         
         return final_score
     
+    def aggregate_batch(
+        self,
+        rubric_scores: np.ndarray,
+        semantic_scores: np.ndarray,
+        nli_scores: np.ndarray
+    ) -> np.ndarray:
+        """
+        Calculate the weighted average of many answers' scores at once
+        
+        Gives the same results as aggregate_scores for each answer.
+        
+        Args:
+            rubric_scores: Scores from rubric matching (0-1)
+            semantic_scores: Scores from semantic similarity (0-1)
+            nli_scores: Scores from NLI analysis (0-1)
+        
+        Returns:
+            Final aggregated scores (0-1)
+        """
+        final_scores = (
+            self.rubric_weight * np.asarray(rubric_scores, dtype=np.float64) +
+            self.semantic_weight * np.asarray(semantic_scores, dtype=np.float64) +
+            self.nli_weight * np.asarray(nli_scores, dtype=np.float64)
+        )
+        return np.clip(final_scores, 0.0, 1.0)
+    
+    def assessment(self, percentage: float) -> str:
+        """Overall assessment of a percentage score, from the grade thresholds"""
+        for threshold, label in zip(self.grade_thresholds, GRADE_LABELS):
+            if percentage >= threshold:
+                return label
+        return GRADE_LABELS[-1]
+    
     def generate_comprehensive_feedback(
         self,
         rubric_feedback: str,
@@ -87,7 +189,7 @@ class ScoreAggregator:
             nli_feedback: Feedback from NLI analysis
             final_score: Final aggregated score
             total_marks: Total marks for the question
-            
+        
         Returns:
             Comprehensive feedback string
         """
@@ -95,16 +197,7 @@ class ScoreAggregator:
         percentage = final_score * 100
         
         # Overall assessment
-        if percentage >= 85:
-            overall = "Excellent answer"
-        elif percentage >= 70:
-            overall = "Good answer"
-        elif percentage >= 55:
-            overall = "Satisfactory answer"
-        elif percentage >= 40:
-            overall = "Needs improvement"
-        else:
-            overall = "Insufficient answer"
+        overall = self.assessment(percentage)
         
         feedback_parts = [
             f"**Overall Assessment:** {overall} ({percentage:.1f}%)",
@@ -1,60 +1,291 @@
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from typing import List, Optional, Union
+import numpy as np
 import logging
 
+from app.services.embedding_backend import EmbeddingBackend, create_embedding_backend
+from app.services.idf_model import IDFModel, IDFStore
+from app.utils.text_preprocessing import TokenizedText, as_tokenized, tokenized_ngrams
+
 logger = logging.getLogger(__name__)
 
+# IDF of a term that appears in only one document of a two-document corpus
+# (smooth_idf=True): ln((1 + 2) / (1 + 1)) + 1. Terms present in both get 1.0.
+PAIR_UNIQUE_IDF = np.log(1.5) + 1.0
+
 
 class SemanticAnalyzer:
     """
-    Semantic similarity analyzer using TF-IDF and cosine similarity
+    Semantic similarity analyzer using TF-IDF or sentence embeddings and cosine similarity
     Measures how semantically similar the student answer is to the correct answer
     """
     
-    def __init__(self):
+    # Bump when scoring logic changes so cached results are invalidated
+    version = "tfidf-1"
+    
+    def __init__(
+        self,
+        embedding_backend: Optional[EmbeddingBackend] = None,
+        idf_store: Optional[IDFStore] = None,
+        idf_min_documents: int = 50
+    ):
         """
         Initialize the semantic analyzer with TF-IDF vectorizer
+        
+        The vectorizer is only a configuration template: every call works on
+        its own clone, so the analyzer can be shared across threads. It consumes
+        TokenizedText, whose n-grams match the scikit-learn English word analyzer
+        with unigrams and bigrams.
+        
+        Args:
+            embedding_backend: Score with embeddings from this backend instead of TF-IDF
+            idf_store: Weigh terms with per-course IDF models built from all texts
+                seen, instead of fitting IDF on each answer pair
+            idf_min_documents: Texts a course's IDF model needs before it is
+                used; younger models fall back to per-pair fitting
         """
-        logger.info("Initializing TF-IDF based semantic analyzer")
+        self.embedding_backend = embedding_backend
+        self.idf_store = idf_store
+        self.idf_min_documents = idf_min_documents
+        if embedding_backend is not None:
+            logger.info(f"Initializing embedding based semantic analyzer ({embedding_backend.encoder.name})")
+            self.version = f"embedding-1:{embedding_backend.encoder.name}"
+        elif idf_store is not None:
+            logger.info("Initializing TF-IDF based semantic analyzer with corpus IDF models")
+            self.version = "tfidf-corpus-1"
+        else:
+            logger.info("Initializing TF-IDF based semantic analyzer")
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        
         self.vectorizer = TfidfVectorizer(
             max_features=1000,
-            ngram_range=(1, 2),
-            stop_words='english'
+            analyzer=tokenized_ngrams
         )
         logger.info("Semantic analyzer initialized successfully")
     
-    def calculate_similarity(
+    def _pair_similarity(self, student_answer: TokenizedText, correct_answer: TokenizedText) -> float:
+        """Fit TF-IDF on the answer pair alone and return their cosine similarity"""
+        from sklearn.base import clone
+        from sklearn.metrics.pairwise import cosine_similarity
+        
+        vectors = clone(self.vectorizer).fit_transform([correct_answer, student_answer])
+        similarity_matrix = cosine_similarity(vectors[0:1], vectors[1:2])
+        return float(similarity_matrix[0][0])
+    
+    def _pairwise_similarity_batch(
         self,
-        student_answer: str,
-        correct_answer: str
-    ) -> float:
+        correct_answer: TokenizedText,
+        answers: List[TokenizedText]
+    ) -> np.ndarray:
         """
-        Calculate semantic similarity between student and correct answers using TF-IDF
+        Reproduce per-pair TF-IDF fitting for a whole batch with sparse products
+        
+        In a two-document fit every shared term has IDF 1 and every other term
+        has PAIR_UNIQUE_IDF, so the cosine of each pair can be derived from raw
+        counts over a vocabulary built once for the batch.
+        """
+        from sklearn.feature_extraction.text import CountVectorizer
+        
+        count_vectorizer = CountVectorizer(analyzer=self.vectorizer.analyzer)
+        try:
+            counts = count_vectorizer.fit_transform([correct_answer] + answers).astype(np.float64)
+        except ValueError:
+            # Empty vocabulary: every pair fit would fail as well
+            return np.full(len(answers), 0.5)
+        
+        reference = counts[0].toarray().ravel()
+        student_counts = counts[1:].tocsr()
+        student_mask = student_counts.sign()
+        student_squares = student_counts.multiply(student_counts).tocsr()
+        reference_mask = (reference > 0).astype(np.float64)
+        reference_squares = reference ** 2
+        
+        # One sparse matrix-vector product per quantity
+        dot = student_counts @ reference
+        shared_terms = student_mask @ reference_mask
+        student_shared_sq = student_squares @ reference_mask
+        reference_shared_sq = student_mask @ reference_squares
+        student_sq = np.asarray(student_squares.sum(axis=1)).ravel()
+        
+        idf_sq = PAIR_UNIQUE_IDF ** 2
+        reference_norm_sq = idf_sq * reference_squares.sum() - (idf_sq - 1.0) * reference_shared_sq
+        student_norm_sq = idf_sq * student_sq - (idf_sq - 1.0) * student_shared_sq
+        denominator = np.sqrt(reference_norm_sq * student_norm_sq)
+        
+        scores = np.divide(dot, denominator, out=np.zeros(len(answers)), where=denominator > 0)
+        
+        # A pair with no terms at all cannot be fitted
+        student_terms = student_counts.getnnz(axis=1)
+        reference_terms = int(reference_mask.sum())
+        scores[(student_terms == 0) & (reference_terms == 0)] = 0.5
+        
+        # Pairs whose vocabulary exceeds max_features are truncated by the
+        # vectorizer, fall back to an exact per-pair fit for those
+        max_features = self.vectorizer.max_features
+        if max_features is not None:
+            pair_terms = student_terms + reference_terms - shared_terms
+            for i in np.flatnonzero(pair_terms > max_features):
+                scores[i] = self._pair_similarity(answers[i], correct_answer)
+        
+        return scores
+    
+    def _cohort_similarity_batch(
+        self,
+        correct_answer: TokenizedText,
+        answers: List[TokenizedText]
+    ) -> np.ndarray:
+        """Fit TF-IDF once over the reference and all answers, then score by one matmul"""
+        from sklearn.base import clone
+        
+        try:
+            vectors = clone(self.vectorizer).fit_transform([correct_answer] + answers)
+        except ValueError:
+            return np.full(len(answers), 0.5)
+        
+        # Rows are L2-normalized, so the dot product is the cosine similarity
+        return (vectors[1:] @ vectors[0].T).toarray().ravel()
+    
+    def _corpus_similarity_batch(
+        self,
+        correct_answer: TokenizedText,
+        answers: List[TokenizedText],
+        idf_model: IDFModel
+    ) -> np.ndarray:
+        """Weigh raw counts with the course's IDF model and score by one sparse product"""
+        from sklearn.feature_extraction.text import CountVectorizer
+        from sklearn.preprocessing import normalize
+        
+        count_vectorizer = CountVectorizer(analyzer=self.vectorizer.analyzer)
+        try:
+            counts = count_vectorizer.fit_transform([correct_answer] + answers).astype(np.float64)
+        except ValueError:
+            return np.full(len(answers), 0.5)
+        
+        idf = idf_model.idf(count_vectorizer.get_feature_names_out().tolist())
+        vectors = normalize(counts.multiply(idf).tocsr())
+        
+        # Rows are L2-normalized, so the dot product is the cosine similarity
+        scores = (vectors[1:] @ vectors[0].T).toarray().ravel()
+        if counts[0].nnz == 0:
+            scores[counts[1:].getnnz(axis=1) == 0] = 0.5
+        return scores
+    
+    def _embedding_similarity_batch(
+        self,
+        correct_answer: TokenizedText,
+        answers: List[TokenizedText]
+    ) -> np.ndarray:
+        """Embed the reference and all answers in one call and score by one matmul"""
+        embeddings = self.embedding_backend.embed([correct_answer.text] + [a.text for a in answers])
+        # Rows are L2-normalized, so the dot product is the cosine similarity
+        return embeddings[1:] @ embeddings[0]
+    
+    def calculate_similarity_batch(
+        self,
+        correct_answer: Union[str, TokenizedText],
+        answers: List[Union[str, TokenizedText]],
+        cohort_idf: bool = False,
+        course: Optional[str] = None
+    ) -> np.ndarray:
+        """
+        Calculate semantic similarity of many answers against one correct answer
+        
+        With corpus IDF models, the texts are first added to the course's model.
         
         Args:
-            student_answer: Student's response
             correct_answer: Model/correct answer
-            
+            answers: Students' responses
+            cohort_idf: Fit IDF over the whole cohort of answers instead of
+                scoring each answer as if fitted on its pair with the reference
+                (TF-IDF only)
+            course: Course or question bank whose IDF model weighs the terms
+                (corpus IDF only)
+        
         Returns:
-            Similarity score between 0 and 1
+            Array of similarity scores between 0 and 1, one per answer
         """
+        if not answers:
+            return np.zeros(0)
+        
         try:
-            # Create TF-IDF vectors
-            vectors = self.vectorizer.fit_transform([correct_answer, student_answer])
-            
-            # Calculate cosine similarity
-            similarity_matrix = cosine_similarity(vectors[0:1], vectors[1:2])
-            score = float(similarity_matrix[0][0])
+            correct_answer = as_tokenized(correct_answer)
+            answers = [as_tokenized(answer) for answer in answers]
             
-            # Ensure score is between 0 and 1
-            score = max(0.0, min(1.0, score))
-            
-            logger.info(f"Semantic similarity score (TF-IDF): {score:.3f}")
-            return score
+            if self.embedding_backend is not None:
+                scores = self._embedding_similarity_batch(correct_answer, answers)
+            elif cohort_idf:
+                scores = self._cohort_similarity_batch(correct_answer, answers)
+            elif self.idf_store is not None and self._fit_idf(course, [correct_answer] + answers):
+                scores = self._corpus_similarity_batch(correct_answer, answers, self.idf_store.model(course))
+            else:
+                scores = self._pairwise_similarity_batch(correct_answer, answers)
             
+            # Ensure scores are between 0 and 1
+            return np.clip(scores, 0.0, 1.0).astype(np.float64)
+        
         except Exception as e:
             logger.error(f"Error calculating semantic similarity: {e}")
-            return 0.5  # Return neutral score on error
+            return np.full(len(answers), 0.5)  # Return neutral scores on error
+    
+    def _fit_idf(self, course: Optional[str], texts: List[TokenizedText]) -> bool:
+        """Add texts to the course's IDF model and tell whether it is large enough to use"""
+        idf_model = self.idf_store.model(course)
+        idf_model.partial_fit(texts)
+        return idf_model.documents >= self.idf_min_documents
+    
+    def depends_on_context(self, cohort_idf: bool = False) -> bool:
+        """
+        Whether an answer's score depends on more than the answer and the
+        correct answer: on its cohort (cohort IDF) or on the texts seen so far
+        (corpus IDF)
+        """
+        return self.embedding_backend is None and (cohort_idf or self.idf_store is not None)
+    
+    def prepare_reference(self, correct_answer: TokenizedText):
+        """
+        Precompute the reference-side features of a correct answer
+        
+        Args:
+            correct_answer: Tokenized model/correct answer reused across requests
+        """
+        if self.embedding_backend is not None:
+            self.embedding_backend.embed([correct_answer.text])
+        else:
+            # Computed once and cached on the TokenizedText
+            correct_answer.ngrams
+    
+    def calculate_similarity(
+        self,
+        student_answer: Union[str, TokenizedText],
+        correct_answer: Union[str, TokenizedText],
+        course: Optional[str] = None
+    ) -> float:
+        """
+        Calculate semantic similarity between student and correct answers
+        
+        Args:
+            student_answer: Student's response
+            correct_answer: Model/correct answer
+            course: Course or question bank whose IDF model weighs the terms
+                (corpus IDF only)
+        
+        Returns:
+            Similarity score between 0 and 1
+        """
+        score = float(self.calculate_similarity_batch(correct_answer, [student_answer], course=course)[0])
+        logger.info(f"Semantic similarity score ({self.version}): {score:.3f}")
+        return score
+    
+    def share_memory(self):
+        """Move model weights to shared memory before forking serving workers"""
+        if self.embedding_backend is not None:
+            self.embedding_backend.share_memory()
+    
+    def close(self):
+        """Save buffered IDF updates and release the embedding backend's resources"""
+        if self.idf_store is not None:
+            self.idf_store.save()
+        if self.embedding_backend is not None:
+            self.embedding_backend.close()
     
     def get_similarity_feedback(self, score: float) -> str:
         """
@@ -62,7 +293,7 @@ class SemanticAnalyzer:
         
         Args:
             score: Similarity score (0-1)
-            
+        
         Returns:
             Feedback string
         """
@@ -76,3 +307,33 @@ class SemanticAnalyzer:
             return "Low semantic similarity. Answer may be off-topic or incomplete."
         else:
             return "Very low semantic similarity. Answer does not align with expected response."
+
+
+def create_semantic_analyzer(
+    backend: str = "tfidf",
+    model_name: str = "",
+    cache_path: str = "",
+    batch_size: int = 32,
+    idf_model_dir: str = "",
+    idf_min_documents: int = 50
+) -> SemanticAnalyzer:
+    """
+    Build a semantic analyzer from configuration
+    
+    Args:
+        backend: "tfidf" or "embedding"
+        model_name: Embedding model (see create_embedding_backend)
+        cache_path: SQLite file of the embedding cache (empty disables it)
+        batch_size: Texts encoded per call
+        idf_model_dir: Directory of per-course IDF models for TF-IDF scoring
+            (empty fits IDF on each answer pair)
+        idf_min_documents: Texts a course's IDF model needs before it is used
+    
+    Returns:
+        SemanticAnalyzer
+    """
+    if backend == "embedding":
+        return SemanticAnalyzer(create_embedding_backend(model_name, cache_path, batch_size))
+    if idf_model_dir:
+        return SemanticAnalyzer(idf_store=IDFStore(idf_model_dir), idf_min_documents=idf_min_documents)
+    return SemanticAnalyzer()
@@ -0,0 +1,130 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Optional
+import asyncio
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ServiceState:
+    """Readiness of one service"""
+    status: str = "pending"  # pending, loading, ready or failed
+    load_seconds: Optional[float] = None
+    error: Optional[str] = None
+
+
+class ServiceLoader:
+    """
+    Loads services on background threads, in parallel, and tracks their readiness
+    Loaded services are stored into the shared services dict under their name
+    """
+    
+    def __init__(
+        self,
+        factories: Dict[str, Callable[[], Any]],
+        services: Dict,
+        max_workers: int = 4,
+        preloaded: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Initialize the loader
+        
+        Args:
+            factories: Zero-argument constructor of each service, by name
+            services: Dict the loaded services are stored into
+            max_workers: Number of services loaded at the same time
+            preloaded: Services already constructed (e.g. by a parent process
+                before forking), adopted as ready instead of loaded again
+        """
+        self.factories = factories
+        self.services = services
+        self.states = {name: ServiceState() for name in factories}
+        self._futures: Dict[str, Future] = {}
+        for name, service in (preloaded or {}).items():
+            self.services[name] = service
+            self.states[name] = ServiceState(status="ready", load_seconds=0.0)
+            self._futures[name] = Future()
+            self._futures[name].set_result(None)
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="service-loader")
+    
+    def _load(self, name: str):
+        """Construct one service and record how it went"""
+        state = self.states[name]
+        state.status = "loading"
+        state.error = None
+        logger.info(f"Loading service {name}...")
+        started = time.perf_counter()
+        try:
+            self.services[name] = self.factories[name]()
+        except Exception as e:
+            state.status = "failed"
+            state.error = str(e)
+            state.load_seconds = time.perf_counter() - started
+            logger.error(f"Error loading service {name}: {e}")
+            raise
+        state.load_seconds = time.perf_counter() - started
+        state.status = "ready"
+        logger.info(f"Service {name} ready in {state.load_seconds:.2f}s")
+    
+    def start(self, names: Iterable[str]) -> Dict[str, Future]:
+        """
+        Start loading services in the background
+        
+        Services already loaded or loading are not started again; failed ones are retried.
+        
+        Args:
+            names: Services to load
+        
+        Returns:
+            Future of each requested service's load
+        """
+        futures = {}
+        with self._lock:
+            for name in names:
+                future = self._futures.get(name)
+                if future is None or (future.done() and future.exception() is not None):
+                    future = self._pool.submit(self._load, name)
+                    self._futures[name] = future
+                futures[name] = future
+        return futures
+    
+    async def ensure(self, names: Iterable[str]) -> bool:
+        """
+        Wait until services are ready, loading any that have not been started
+        
+        Args:
+            names: Services needed
+        
+        Returns:
+            True if all of them loaded successfully
+        """
+        futures = self.start(names)
+        results = await asyncio.gather(
+            *(asyncio.wrap_future(future) for future in futures.values()),
+            return_exceptions=True
+        )
+        return not any(isinstance(result, BaseException) for result in results)
+    
+    def is_ready(self, names: Iterable[str]) -> bool:
+        """Whether all the given services are loaded"""
+        return all(self.states[name].status == "ready" for name in names)
+    
+    def status(self) -> Dict[str, Dict]:
+        """Readiness state and load time of every service"""
+        return {
+            name: {
+                "status": state.status,
+                "load_seconds": round(state.load_seconds, 3) if state.load_seconds is not None else None,
+                "error": state.error
+            }
+            for name, state in self.states.items()
+        }
+    
+    def shutdown(self):
+        """Stop the loader threads, abandoning loads that have not started"""
+        self._pool.shutdown(wait=False, cancel_futures=True)
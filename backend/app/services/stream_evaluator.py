@@ -0,0 +1,183 @@
+from typing import Any, AsyncIterator, Awaitable, Callable, FrozenSet, List, Optional, Tuple
+import asyncio
+import logging
+import weakref
+
+from pydantic import ValidationError
+
+from app.models import EvaluationResponse, StreamAnswer, StreamEvaluationResult
+from app.services.metrics import metrics
+from app.utils.text_preprocessing import clean_text, is_valid_answer, limit_text
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of a queue
+_END = object()
+
+# Queues of the streams currently being evaluated
+_active_queues: "weakref.WeakSet[asyncio.Queue]" = weakref.WeakSet()
+
+
+def queued_lines() -> int:
+    """Lines waiting in the input and output queues of all active streams"""
+    return sum(queue.qsize() for queue in list(_active_queues))
+
+
+class StreamEvaluator:
+    """
+    Scores a stream of answers to one question as they arrive
+    Answers flow through bounded queues, so a slow consumer or slow scoring
+    stops reading input instead of buffering it
+    """
+    
+    def __init__(
+        self,
+        evaluate_batch: Callable[[List[str]], Awaitable[List[EvaluationResponse]]],
+        max_batch_size: int = 32,
+        queue_size: int = 256,
+        max_answer_chars: int = 0,
+        truncate: bool = False,
+        result_fields: Optional[FrozenSet[str]] = None
+    ):
+        """
+        Initialize the stream evaluator
+        
+        Args:
+            evaluate_batch: Scores cleaned, valid answers to the stream's question
+            max_batch_size: Most answers scored together
+            queue_size: Capacity of the input and output queues
+            max_answer_chars: Longest answer accepted (0 for no limit)
+            truncate: Cut longer answers at a sentence end instead of rejecting them
+            result_fields: Evaluation fields written for each answer (default: all)
+        """
+        self.evaluate_batch = evaluate_batch
+        self.max_batch_size = max_batch_size
+        self.queue_size = queue_size
+        self.max_answer_chars = max_answer_chars
+        self.truncate = truncate
+        self._include = None
+        if result_fields is not None:
+            self._include = {"index": True, "id": True, "error": True, "result": set(result_fields)}
+    
+    async def stream(self, lines: AsyncIterator[Tuple[Any, str]]) -> AsyncIterator[str]:
+        """
+        Evaluate answer lines and yield one NDJSON result line per answer
+        
+        Args:
+            lines: (parsed line, parse error) pairs, e.g. from iter_ndjson
+            
+        Yields:
+            Serialized StreamEvaluationResult lines, in input order
+        """
+        async for result in self.results(lines):
+            with metrics.stage("serialization"):
+                line = result.model_dump_json(include=self._include) + "\n"
+            yield line
+    
+    async def results(self, lines: AsyncIterator[Tuple[Any, str]]) -> AsyncIterator[StreamEvaluationResult]:
+        """
+        Evaluate answer lines and yield one result per answer
+        
+        Args:
+            lines: (parsed line, parse error) pairs, e.g. from iter_ndjson
+        
+        Yields:
+            StreamEvaluationResult per answer, in input order
+        """
+        inbox: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        outbox: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        _active_queues.update((inbox, outbox))
+        tasks = [
+            asyncio.create_task(self._read(lines, inbox)),
+            asyncio.create_task(self._score(inbox, outbox))
+        ]
+        
+        try:
+            while True:
+                result = await outbox.get()
+                if result is _END:
+                    break
+                yield result
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    async def _read(self, lines: AsyncIterator[Tuple[Any, str]], inbox: asyncio.Queue):
+        """Feed parsed lines into the input queue"""
+        index = 0
+        try:
+            async for value, error in lines:
+                await inbox.put((index, value, error))
+                index += 1
+        except Exception as e:
+            logger.error(f"Error reading evaluation stream: {e}")
+            await inbox.put((index, None, f"Error reading input: {e}"))
+        finally:
+            await inbox.put(_END)
+    
+    async def _score(self, inbox: asyncio.Queue, outbox: asyncio.Queue):
+        """Take whatever answers are queued (up to max_batch_size) and score them together"""
+        try:
+            finished = False
+            while not finished:
+                item = await inbox.get()
+                if item is _END:
+                    break
+                batch = [item]
+                while len(batch) < self.max_batch_size:
+                    try:
+                        item = inbox.get_nowait()
+                    except asyncio.QueueEmpty:
+                        break
+                    if item is _END:
+                        finished = True
+                        break
+                    batch.append(item)
+                
+                for result in await self._score_batch(batch):
+                    await outbox.put(result)
+        finally:
+            await outbox.put(_END)
+    
+    async def _score_batch(self, batch: List[Tuple[int, Any, str]]) -> List[StreamEvaluationResult]:
+        """Validate and score one micro-batch of lines"""
+        results = []
+        valid_results = []
+        valid_answers = []
+        
+        for index, value, error in batch:
+            result = StreamEvaluationResult(index=index)
+            results.append(result)
+            if error:
+                result.error = error
+                continue
+            try:
+                answer = StreamAnswer.model_validate(value)
+            except ValidationError as e:
+                result.error = f"Invalid answer line: {e.errors()[0]['msg']}"
+                continue
+            
+            result.id = answer.id
+            student_answer = limit_text(answer.student_answer, self.max_answer_chars, self.truncate)
+            if student_answer is None:
+                result.error = f"Student answer is longer than {self.max_answer_chars} characters"
+                continue
+            with metrics.stage("clean_text"):
+                student_answer = clean_text(student_answer)
+            if not is_valid_answer(student_answer):
+                result.error = "Student answer is too short or empty"
+                continue
+            valid_results.append(result)
+            valid_answers.append(student_answer)
+        
+        if valid_answers:
+            try:
+                evaluations = await self.evaluate_batch(valid_answers)
+                for result, evaluation in zip(valid_results, evaluations):
+                    result.result = evaluation
+            except Exception as e:
+                logger.error(f"Error during stream evaluation: {e}", exc_info=True)
+                for result in valid_results:
+                    result.error = f"Internal server error during evaluation: {str(e)}"
+        
+        return results
@@ -0,0 +1,90 @@
+from collections import deque
+from typing import Dict, FrozenSet, Hashable, Iterable, List, Sequence, Tuple
+
+
+class PhraseAutomaton:
+    """
+    Aho-Corasick automaton over word tokens
+    Finds every occurrence of any number of token sequences (phrases) in one
+    left-to-right pass over a text's tokens, so scan time depends on the
+    length of the text, not on how many phrases are searched for. Matching is
+    on whole tokens, so "learn" never matches inside "learning".
+    """
+    
+    def __init__(self, phrases: Iterable[Tuple[Sequence[str], Hashable]]):
+        """
+        Build the trie and its failure links
+        
+        Args:
+            phrases: (token sequence, value) pairs; the values of every phrase
+                found are returned by find. Empty sequences are ignored.
+        """
+        self._goto: List[Dict[str, int]] = [{}]
+        outputs: List[set] = [set()]
+        self._longest = 0
+        for tokens, value in phrases:
+            if not tokens:
+                continue
+            self._longest = max(self._longest, len(tokens))
+            state = 0
+            for token in tokens:
+                next_state = self._goto[state].get(token)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][token] = next_state
+                    self._goto.append({})
+                    outputs.append(set())
+                state = next_state
+            outputs[state].add(value)
+        
+        # Breadth-first, so a state's failure target is complete before its children's
+        self._fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, child in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(token, 0)
+                outputs[child] |= outputs[self._fail[child]]
+                queue.append(child)
+        self._outputs: List[FrozenSet] = [frozenset(values) for values in outputs]
+        self._alphabet = frozenset(token for transitions in self._goto for token in transitions)
+    
+    def __len__(self) -> int:
+        """Number of states"""
+        return len(self._goto)
+    
+    def find(self, tokens: Iterable[str]) -> set:
+        """
+        Values of every phrase occurring in a token sequence
+        
+        Args:
+            tokens: Tokens of the text to scan
+        
+        Returns:
+            Set of the values of the phrases found
+        """
+        goto, fail, outputs, alphabet = self._goto, self._fail, self._outputs, self._alphabet
+        if self._longest == 1:
+            # Single-token phrases only: order does not matter, so scan each distinct token once
+            tokens = set(tokens)
+        matched = set()
+        state = 0
+        for token in tokens:
+            if token not in alphabet:
+                # No phrase contains the token: back to the root
+                state = 0
+                continue
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            if outputs[state]:
+                matched.add(state)
+        
+        # Repeated words reach the same states, so each state's values are collected once
+        found = set()
+        for state in matched:
+            found.update(outputs[state])
+        return found
@@ -0,0 +1,216 @@
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+import codecs
+import csv
+import io
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet gradebooks need pyarrow; CSV works without it
+    pa = None
+    pq = None
+
+GRADEBOOK_FORMATS = ("csv", "parquet")
+
+# Result columns before the per-rubric coverage columns, with their Parquet types
+RESULT_COLUMNS = (
+    ("index", "int64"),
+    ("id", "string"),
+    ("rubric_score", "float64"),
+    ("semantic_score", "float64"),
+    ("nli_score", "float64"),
+    ("final_score", "float64"),
+    ("suggested_grade", "float64"),
+    ("total_marks", "float64"),
+    ("percentage", "float64"),
+    ("error", "string")
+)
+
+
+def gradebook_format(filename: Optional[str], default: str = "csv") -> str:
+    """Gradebook format of a file, from its extension"""
+    name = (filename or "").lower()
+    if name.endswith((".parquet", ".pq")):
+        return "parquet"
+    if name.endswith((".csv", ".txt")):
+        return "csv"
+    return default
+
+
+def require_parquet():
+    """
+    Raises:
+        ValueError: If pyarrow is not installed
+    """
+    if pq is None:
+        raise ValueError("Parquet gradebooks need pyarrow (pip install pyarrow)")
+
+
+def iter_gradebook(
+    file: BinaryIO,
+    file_format: str,
+    answer_column: str = "student_answer",
+    id_column: str = "id",
+    chunk_rows: int = 1000
+) -> Iterator[List[Tuple[Optional[str], str]]]:
+    """
+    Read the answers of a CSV or Parquet gradebook in chunks of rows
+    
+    Only one chunk is held in memory: CSV files are decoded as they are read
+    and Parquet files are read one record batch at a time.
+    
+    Args:
+        file: Binary file (seekable for Parquet)
+        file_format: "csv" or "parquet"
+        answer_column: Column of the student answers
+        id_column: Column of the student identifiers, if the file has it
+        chunk_rows: Rows per chunk
+    
+    Yields:
+        Lists of (id, answer) pairs; missing answers are empty strings
+    
+    Raises:
+        ValueError: If the answer column is missing or the file cannot be parsed
+    """
+    if file_format == "parquet":
+        yield from _iter_parquet(file, answer_column, id_column, chunk_rows)
+    else:
+        yield from _iter_csv(file, answer_column, id_column, chunk_rows)
+
+
+def _iter_csv(
+    file: BinaryIO,
+    answer_column: str,
+    id_column: str,
+    chunk_rows: int
+) -> Iterator[List[Tuple[Optional[str], str]]]:
+    """Read a CSV gradebook with a header row (UTF-8, optionally with a byte order mark)"""
+    reader = csv.reader(codecs.getreader("utf-8-sig")(file, errors="replace"))
+    header = next(reader, None)
+    if header is None or answer_column not in header:
+        raise ValueError(f"Gradebook has no '{answer_column}' column")
+    answer_position = header.index(answer_column)
+    id_position = header.index(id_column) if id_column in header else None
+    
+    chunk = []
+    try:
+        for row in reader:
+            if not row:
+                continue
+            answer = row[answer_position] if answer_position < len(row) else ""
+            student_id = row[id_position] if id_position is not None and id_position < len(row) else None
+            chunk.append((student_id, answer))
+            if len(chunk) >= chunk_rows:
+                yield chunk
+                chunk = []
+    except csv.Error as e:
+        raise ValueError(f"Invalid CSV at line {reader.line_num}: {e}")
+    if chunk:
+        yield chunk
+
+
+def _iter_parquet(
+    file: BinaryIO,
+    answer_column: str,
+    id_column: str,
+    chunk_rows: int
+) -> Iterator[List[Tuple[Optional[str], str]]]:
+    """Read the answer and id columns of a Parquet gradebook"""
+    require_parquet()
+    try:
+        parquet_file = pq.ParquetFile(file)
+    except pa.ArrowException as e:
+        raise ValueError(f"Invalid Parquet file: {e}")
+    names = parquet_file.schema_arrow.names
+    if answer_column not in names:
+        raise ValueError(f"Gradebook has no '{answer_column}' column")
+    columns = [answer_column] + ([id_column] if id_column in names else [])
+    
+    for batch in parquet_file.iter_batches(batch_size=chunk_rows, columns=columns):
+        answers = batch.column(0).to_pylist()
+        ids = batch.column(1).to_pylist() if len(columns) > 1 else [None] * len(answers)
+        yield [
+            (str(student_id) if student_id is not None else None, answer if answer is not None else "")
+            for student_id, answer in zip(ids, answers)
+        ]
+
+
+class ChunkSink(io.RawIOBase):
+    """Write-only byte sink whose content is taken out piece by piece to stream a file being written"""
+    
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+    
+    def writable(self) -> bool:
+        return True
+    
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+    
+    def tell(self) -> int:
+        return self._position
+    
+    def take(self) -> bytes:
+        """Bytes written since the last call"""
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class GradebookWriter:
+    """
+    Writes evaluation rows to a CSV or Parquet results file chunk by chunk
+    The columns are RESULT_COLUMNS followed by one "rubric_<n>" column per
+    rubric holding "covered", "partial" or "missing". Parquet output gets one
+    row group per chunk, so it is written without holding the whole file.
+    """
+    
+    def __init__(self, sink: BinaryIO, file_format: str, rubric_count: int):
+        """
+        Args:
+            sink: Binary file the results are written to
+            file_format: "csv" or "parquet"
+            rubric_count: Number of rubrics of the question
+        """
+        self.file_format = file_format
+        self.columns = [name for name, _ in RESULT_COLUMNS] + [f"rubric_{i + 1}" for i in range(rubric_count)]
+        if file_format == "parquet":
+            require_parquet()
+            types = dict(RESULT_COLUMNS)
+            self._schema = pa.schema([(name, types.get(name, "string")) for name in self.columns])
+            self._writer = pq.ParquetWriter(sink, self._schema)
+        else:
+            self._text = io.TextIOWrapper(sink, encoding="utf-8", newline="", write_through=True)
+            self._writer = csv.writer(self._text)
+            self._writer.writerow(self.columns)
+    
+    def write(self, rows: List[Dict[str, Any]]):
+        """
+        Append rows
+        
+        Args:
+            rows: Dicts with (a subset of) the writer's columns
+        """
+        if not rows:
+            return
+        if self.file_format == "parquet":
+            self._writer.write_table(pa.Table.from_pydict(
+                {name: [row.get(name) for row in rows] for name in self.columns},
+                schema=self._schema
+            ))
+        else:
+            self._writer.writerows([
+                ["" if row.get(name) is None else row[name] for name in self.columns]
+                for row in rows
+            ])
+    
+    def close(self):
+        """Finish the file (writes the Parquet footer)"""
+        if self.file_format == "parquet":
+            self._writer.close()
+        else:
+            self._text.flush()
+            self._text.detach()
@@ -0,0 +1,57 @@
+from typing import Any, AsyncIterator, Awaitable, Callable, Tuple
+import json
+
+
+async def iter_ndjson(
+    read: Callable[[int], Awaitable[bytes]],
+    chunk_size: int = 64 * 1024,
+    max_line_bytes: int = 16 * 1024 * 1024
+) -> AsyncIterator[Tuple[Any, str]]:
+    """
+    Parse newline-delimited JSON incrementally from an async byte source
+    
+    Only one chunk and the current partial line are held in memory.
+    
+    Args:
+        read: Async function returning up to n bytes, b"" at end of input
+        chunk_size: Bytes requested per read
+        max_line_bytes: Longest accepted line
+    
+    Yields:
+        (parsed value, error) pairs: error is empty on success, otherwise the
+        value is None and error describes the malformed line. Blank lines are skipped.
+    """
+    buffer = b""
+    while True:
+        chunk = await read(chunk_size)
+        if not chunk:
+            break
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            item = _parse_line(line)
+            if item is not None:
+                yield item
+        if len(buffer) > max_line_bytes:
+            yield None, f"Line exceeds {max_line_bytes} bytes"
+            # Skip the rest of the oversized line
+            while b"\n" not in buffer:
+                buffer = await read(chunk_size)
+                if not buffer:
+                    return
+            buffer = buffer.split(b"\n", 1)[1]
+    
+    item = _parse_line(buffer)
+    if item is not None:
+        yield item
+
+
+def _parse_line(line: bytes):
+    """Decode one NDJSON line, returning None for blank lines"""
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        return json.loads(line), ""
+    except ValueError as e:
+        return None, f"Invalid JSON: {e}"
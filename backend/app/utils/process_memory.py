@@ -0,0 +1,63 @@
+from typing import Dict, Optional
+import os
+import sys
+
+# Fields of /proc/<pid>/smaps_rollup, in kB, and the keys they are reported under
+_SMAPS_FIELDS = {
+    "Rss": "rss_bytes",
+    "Pss": "pss_bytes",
+    "Shared_Clean": "shared_bytes",
+    "Shared_Dirty": "shared_bytes",
+    "Private_Clean": "private_bytes",
+    "Private_Dirty": "private_bytes"
+}
+
+
+def process_memory(pid: Optional[int] = None) -> Dict[str, Optional[int]]:
+    """
+    Memory use of a process
+    
+    On Linux, reads /proc/<pid>/smaps_rollup: besides the resident set size,
+    this splits it into pages shared with other processes (e.g. models
+    inherited copy-on-write from the parent of forked workers) and private
+    ones, and gives the proportional share (PSS). Elsewhere only the peak
+    RSS of the current process is known.
+    
+    Args:
+        pid: Process to inspect (default: the current one)
+    
+    Returns:
+        Dict with rss_bytes, pss_bytes, shared_bytes and private_bytes
+        (None where unknown)
+    """
+    pid = pid or os.getpid()
+    usage = {"rss_bytes": None, "pss_bytes": None, "shared_bytes": None, "private_bytes": None}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                field, _, rest = line.partition(":")
+                key = _SMAPS_FIELDS.get(field)
+                if key is not None:
+                    usage[key] = (usage[key] or 0) + int(rest.split()[0]) * 1024
+        return usage
+    except (OSError, ValueError, IndexError):
+        pass
+    
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    usage["rss_bytes"] = int(line.split()[1]) * 1024
+                    return usage
+    except (OSError, ValueError, IndexError):
+        pass
+    
+    if pid == os.getpid():
+        try:
+            import resource
+        except ImportError:
+            return usage
+        # Peak RSS, in kB on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        usage["rss_bytes"] = peak if sys.platform == "darwin" else peak * 1024
+    return usage
@@ -1,5 +1,49 @@
+from dataclasses import dataclass
+from functools import cached_property, lru_cache
+from typing import Iterator, List, Optional, Tuple, FrozenSet, Union
 import re
-from typing import List
+
+# Words, optionally joined by one apostrophe ("don't"). Splitting these on the
+# apostrophe yields exactly the plain \b\w+\b word tokens.
+TOKEN_PATTERN = re.compile(r"\w+(?:'\w+)?")
+SENTENCE_BOUNDARY_PATTERN = re.compile(r'[.!?]+')
+SPACE_BEFORE_PUNCTUATION = re.compile(r' (?=[.,!?;:])')
+
+# Stop words ignored when matching rubric concepts
+RUBRIC_STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+    'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are', 'were', 'be',
+    'been', 'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will',
+    'would', 'should', 'could', 'may', 'might', 'must', 'can', 'this',
+    'that', 'these', 'those', 'it', 'its', 'which', 'who', 'what', 'where',
+    'when', 'why', 'how'
+})
+
+# Stop words ignored when comparing answers for consistency
+NLI_STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+    'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are', 'were'
+})
+
+NEGATION_WORDS = frozenset({
+    'not', 'no', 'never', 'neither', 'nor', 'none', 'nobody',
+    'nothing', 'nowhere', 'cannot', 'can\'t', 'won\'t', 'wouldn\'t',
+    'shouldn\'t', 'isn\'t', 'aren\'t', 'wasn\'t', 'weren\'t',
+    'hasn\'t', 'haven\'t', 'hadn\'t', 'doesn\'t', 'don\'t', 'didn\'t'
+})
+
+# Word n-gram range used for TF-IDF features
+NGRAM_RANGE = (1, 2)
+
+# Shortest cleaned student answer that is evaluated
+MIN_ANSWER_LENGTH = 10
+
+# Suffixes stripped by stem_word, longest first; the stem keeps at least 3 letters
+STEM_SUFFIXES = ("ization", "ation", "ition", "ment", "ness", "ing", "ion", "er", "ed", "ly", "al")
+
+# Texts longer than this are tokenized in sentence-bounded chunks, so only one
+# chunk at a time is copied, lowercased and scanned
+TOKENIZE_CHUNK_CHARS = 16384
 
 
 def clean_text(text: str) -> str:
@@ -8,20 +52,118 @@ def clean_text(text: str) -> str:
     
     Args:
         text: Raw text input
-        
+    
     Returns:
         Cleaned text
     """
-    # Remove extra whitespace
-    text = re.sub(r'\s+', ' ', text)
-    
-    # Remove leading/trailing whitespace
-    text = text.strip()
+    # Collapse whitespace runs to single spaces and strip the ends in one pass
+    text = " ".join(text.split())
     
     # Normalize punctuation spacing
-    text = re.sub(r'\s+([.,!?;:])', r'\1', text)
+    return SPACE_BEFORE_PUNCTUATION.sub("", text)
+
+
+def truncate_text(text: str, max_chars: int) -> str:
+    """
+    Cut text to at most max_chars characters
+    
+    The cut is made after the last sentence end within the limit, or at the
+    last whitespace if no sentence ends in its second half.
+    
+    Args:
+        text: Input text
+        max_chars: Longest allowed length
+    
+    Returns:
+        Text of at most max_chars characters
+    """
+    if len(text) <= max_chars:
+        return text
+    head = text[:max_chars]
+    sentence_end = max((m.end() for m in SENTENCE_BOUNDARY_PATTERN.finditer(head)), default=0)
+    if sentence_end > max_chars // 2:
+        return head[:sentence_end]
+    word_break = max(head.rfind(" "), head.rfind("\n"))
+    return head[:word_break] if word_break > 0 else head
+
+
+def limit_text(text: str, max_chars: int, truncate: bool = False) -> Optional[str]:
+    """
+    Apply a length limit to raw text before it is cleaned or analyzed
+    
+    Args:
+        text: Raw text input
+        max_chars: Longest allowed length (0 for no limit)
+        truncate: Cut oversized text instead of rejecting it
     
-    return text
+    Returns:
+        The text, truncated if needed, or None if it is rejected
+    """
+    if not max_chars or len(text) <= max_chars:
+        return text
+    return truncate_text(text, max_chars) if truncate else None
+
+
+def is_valid_answer(student_answer: str) -> bool:
+    """Check that a cleaned student answer is long enough to evaluate"""
+    return bool(student_answer) and len(student_answer) >= MIN_ANSWER_LENGTH
+
+
+@lru_cache(maxsize=65536)
+def stem_word(word: str) -> str:
+    """
+    Reduce a lowercase word to a crude stem shared by its common variants
+    
+    A light suffix stripper ("learners", "learning" and "learned" all become
+    "learn"); stems are only compared with each other, never shown.
+    
+    Args:
+        word: Lowercase word token
+    
+    Returns:
+        Stem of the word
+    """
+    if len(word) <= 3:
+        return word
+    if word.endswith("ies"):
+        word = word[:-3] + "y"
+    elif word.endswith(("sses", "xes", "ches", "shes", "zes")):
+        word = word[:-2]
+    elif word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        word = word[:-1]
+    for suffix in STEM_SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[:-len(suffix)]
+            # "running" -> "run", "stopped" -> "stop"
+            if suffix in ("ing", "ed") and word[-1] == word[-2] and word[-1] not in "lsz":
+                word = word[:-1]
+            break
+    if word.endswith("e") and len(word) > 3:
+        word = word[:-1]
+    return word
+
+
+def sentence_spans(text: str) -> Tuple[Tuple[int, int], ...]:
+    """
+    Find the (start, end) offsets of each non-empty sentence in text
+    
+    Args:
+        text: Input text
+    
+    Returns:
+        Tuple of sentence spans, stripped of surrounding whitespace
+    """
+    spans = []
+    start = 0
+    boundaries = [(m.start(), m.end()) for m in SENTENCE_BOUNDARY_PATTERN.finditer(text)]
+    for end, next_start in boundaries + [(len(text), len(text))]:
+        segment = text[start:end]
+        left = len(segment) - len(segment.lstrip())
+        right = len(segment.rstrip())
+        if right > left:
+            spans.append((start + left, start + right))
+        start = next_start
+    return tuple(spans)
 
 
 def split_into_sentences(text: str) -> List[str]:
@@ -30,14 +172,12 @@ def split_into_sentences(text: str) -> List[str]:
     
     Args:
         text: Input text
-        
+    
     Returns:
         List of sentences
     """
     # Simple sentence splitting (can be enhanced with nltk if needed)
-    sentences = re.split(r'[.!?]+', text)
-    sentences = [s.strip() for s in sentences if s.strip()]
-    return sentences
+    return [text[start:end] for start, end in sentence_spans(text)]
 
 
 def extract_key_phrases(text: str) -> List[str]:
@@ -46,7 +186,7 @@ def extract_key_phrases(text: str) -> List[str]:
     
     Args:
         text: Input text
-        
+    
     Returns:
         List of key phrases
     """
@@ -54,3 +194,146 @@ def extract_key_phrases(text: str) -> List[str]:
     phrases = re.split(r'[,;.]', text)
     phrases = [p.strip() for p in phrases if p.strip() and len(p.strip()) > 10]
     return phrases
+
+
+@dataclass(frozen=True)
+class TokenizedText:
+    """
+    Immutable result of tokenizing a text once
+    Shared by every analyzer so an answer is only lowercased and scanned once
+    """
+    text: str
+    tokens: Tuple[str, ...]
+    keywords: FrozenSet[str]
+    nli_keywords: FrozenSet[str]
+    negations: FrozenSet[str]
+    sentence_spans: Tuple[Tuple[int, int], ...]
+    
+    @property
+    def has_negation(self) -> bool:
+        """Whether the text contains any negation word"""
+        return bool(self.negations)
+    
+    @property
+    def sentences(self) -> List[str]:
+        """Sentences of the text, as split_into_sentences returns them"""
+        return [self.text[start:end] for start, end in self.sentence_spans]
+    
+    @cached_property
+    def sentence_features(self) -> Tuple[Tuple[FrozenSet[str], bool], ...]:
+        """NLI keywords and negation flag of each sentence, aligned with sentence_spans"""
+        features = []
+        for start, end in self.sentence_spans:
+            tokens, negations = _scan_tokens(self.text[start:end])
+            features.append((_nli_keywords(tokens), bool(negations)))
+        return tuple(features)
+    
+    @cached_property
+    def phrase_tokens(self) -> Tuple[str, ...]:
+        """Tokens of two or more characters, in text order, scanned for rubric phrases"""
+        return tuple(t for t in self.tokens if len(t) > 1)
+    
+    @cached_property
+    def ngrams(self) -> Tuple[str, ...]:
+        """Word unigrams and bigrams, as the scikit-learn English analyzer builds them"""
+        from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+        
+        words = [t for t in self.tokens if len(t) > 1 and t not in ENGLISH_STOP_WORDS]
+        ngrams = list(words)
+        min_n, max_n = NGRAM_RANGE
+        for n in range(max(min_n, 2), max_n + 1):
+            ngrams.extend(" ".join(words[i:i + n]) for i in range(len(words) - n + 1))
+        return tuple(ngrams)
+
+
+def _scan_tokens(text: str) -> Tuple[List[str], set]:
+    """Lowercase and split text into word tokens, collecting the negation words seen"""
+    tokens = []
+    negations = set()
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if "'" in token:
+            tokens.extend(token.split("'"))
+        else:
+            tokens.append(token)
+        if token in NEGATION_WORDS:
+            negations.add(token)
+    return tokens, negations
+
+
+def _nli_keywords(tokens: List[str]) -> FrozenSet[str]:
+    """Keywords compared by the NLI analyzer"""
+    return frozenset(t for t in tokens if len(t) > 2 and t not in NLI_STOP_WORDS)
+
+
+def iter_sentence_chunks(text: str, chunk_chars: int = TOKENIZE_CHUNK_CHARS) -> Iterator[Tuple[int, int]]:
+    """
+    Split text into chunks of whole sentences
+    
+    Chunks end right after a sentence boundary once they reach chunk_chars,
+    so tokens and sentences never straddle two chunks; a single sentence
+    longer than chunk_chars stays in one chunk.
+    
+    Args:
+        text: Input text
+        chunk_chars: Length from which a chunk is closed at the next sentence end
+    
+    Yields:
+        (start, end) offsets of each chunk
+    """
+    start = 0
+    for match in SENTENCE_BOUNDARY_PATTERN.finditer(text):
+        if match.end() - start >= chunk_chars:
+            yield start, match.end()
+            start = match.end()
+    if start < len(text):
+        yield start, len(text)
+
+
+def tokenize(text: str) -> TokenizedText:
+    """
+    Tokenize text in a single pass
+    
+    Long texts are scanned chunk by chunk (see iter_sentence_chunks) with the
+    same result as scanning them whole.
+    
+    Args:
+        text: Input text
+    
+    Returns:
+        TokenizedText with tokens, keyword sets, negations and sentence spans
+    """
+    if len(text) <= TOKENIZE_CHUNK_CHARS:
+        tokens, negations = _scan_tokens(text)
+        spans = sentence_spans(text)
+        long_tokens = set(t for t in tokens if len(t) > 2)
+    else:
+        tokens, negations, spans, long_tokens = [], set(), [], set()
+        for start, end in iter_sentence_chunks(text, TOKENIZE_CHUNK_CHARS):
+            chunk = text[start:end]
+            chunk_tokens, chunk_negations = _scan_tokens(chunk)
+            tokens.extend(chunk_tokens)
+            negations |= chunk_negations
+            long_tokens.update(t for t in chunk_tokens if len(t) > 2)
+            spans.extend((start + left, start + right) for left, right in sentence_spans(chunk))
+        spans = tuple(spans)
+    
+    return TokenizedText(
+        text=text,
+        tokens=tuple(tokens),
+        keywords=frozenset(long_tokens - RUBRIC_STOP_WORDS),
+        nli_keywords=frozenset(long_tokens - NLI_STOP_WORDS),
+        negations=frozenset(negations),
+        sentence_spans=spans
+    )
+
+
+def as_tokenized(text: Union[str, TokenizedText]) -> TokenizedText:
+    """Return text unchanged if already tokenized, otherwise tokenize it"""
+    if isinstance(text, TokenizedText):
+        return text
+    return tokenize(text)
+
+
+def tokenized_ngrams(tokenized: TokenizedText) -> Tuple[str, ...]:
+    """Analyzer callable letting scikit-learn vectorizers consume TokenizedText"""
+    return tokenized.ngrams
@@ -0,0 +1,5 @@
+"""
+Benchmarks for the evaluation pipeline
+
+Run from the backend directory, e.g. `python -m benchmarks.micro`.
+"""
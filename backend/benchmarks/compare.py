@@ -0,0 +1,73 @@
+"""
+Compare two benchmark result files, e.g. from two commits
+
+Usage (from the backend directory):
+    python -m benchmarks.compare BASELINE.json CANDIDATE.json [--threshold 0.1]
+
+Exits with status 1 if any benchmark regressed by more than the threshold.
+"""
+from typing import Dict
+import argparse
+import json
+import sys
+
+# Compared fields and whether a higher value is better
+METRICS = {
+    "median_s": False,
+    "p95_s": False,
+    "p99_s": False,
+    "requests_per_second": True
+}
+
+
+def load(path: str) -> Dict[str, Dict]:
+    """Benchmarks of a result file by name"""
+    with open(path) as f:
+        return {benchmark["name"]: benchmark for benchmark in json.load(f)["benchmarks"]}
+
+
+def compare(baseline: Dict[str, Dict], candidate: Dict[str, Dict], threshold: float) -> int:
+    """
+    Print the relative change of every shared benchmark
+    
+    Returns:
+        Number of regressions beyond the threshold
+    """
+    regressions = 0
+    for name in sorted(baseline.keys() & candidate.keys()):
+        for field, higher_is_better in METRICS.items():
+            before = baseline[name].get(field)
+            after = candidate[name].get(field)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            worse = -change if higher_is_better else change
+            flag = ""
+            if worse > threshold:
+                flag = "  REGRESSION"
+                regressions += 1
+            elif worse < -threshold:
+                flag = "  improved"
+            print(f"{name:<60} {field:<20} {before:12.6g} -> {after:12.6g} ({change:+.1%}){flag}")
+    
+    for name in sorted(baseline.keys() - candidate.keys()):
+        print(f"{name:<60} missing from candidate")
+    for name in sorted(candidate.keys() - baseline.keys()):
+        print(f"{name:<60} new")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("baseline", help="Result file of the reference run")
+    parser.add_argument("candidate", help="Result file of the run to check")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Relative change reported as a regression")
+    args = parser.parse_args()
+    
+    regressions = compare(load(args.baseline), load(args.candidate), args.threshold)
+    print(f"{regressions} regression(s) beyond {args.threshold:.0%}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Synthetic, seeded corpus generators
+
+Every generator takes a random.Random so the same seed always produces the
+same questions and answers.
+"""
+from typing import Dict, List
+import random
+
+# Answer lengths in words, from one sentence to a long essay
+ANSWER_LENGTHS = {
+    "sentence": 15,
+    "paragraph": 150,
+    "page": 600,
+    "essay": 3000
+}
+
+RUBRIC_COUNTS = (1, 10, 50)
+
+COHORT_SIZES = (1, 100, 1000, 10000)
+
+TOPIC_WORDS = (
+    "algorithm", "model", "data", "training", "learning", "network", "neural",
+    "supervised", "unsupervised", "reinforcement", "reward", "policy", "label",
+    "feature", "vector", "gradient", "descent", "optimization", "loss", "error",
+    "accuracy", "precision", "recall", "classification", "regression", "cluster",
+    "prediction", "inference", "probability", "distribution", "variance", "bias",
+    "overfitting", "regularization", "validation", "dataset", "sample", "pattern",
+    "recognition", "image", "language", "translation", "recommendation", "fraud",
+    "detection", "healthcare", "vehicle", "autonomous", "system", "computer",
+    "experience", "performance", "representation", "embedding", "layer", "weight",
+    "activation", "function", "kernel", "decision", "tree", "forest", "ensemble",
+    "boosting", "memory", "sequence", "attention", "transformer", "encoder",
+    "decoder", "photosynthesis", "chlorophyll", "energy", "light", "oxygen",
+    "carbon", "dioxide", "glucose", "plant", "cell", "membrane", "protein",
+    "enzyme", "reaction", "molecule", "atom", "electron", "force", "velocity",
+    "acceleration", "mass", "gravity", "orbit", "planet", "economy", "market",
+    "demand", "supply", "price", "inflation", "currency", "trade", "policy"
+)
+
+FILLER_WORDS = (
+    "the", "a", "an", "is", "are", "was", "of", "to", "in", "and", "which",
+    "that", "with", "by", "for", "from", "this", "it", "can", "uses", "makes",
+    "helps", "allows", "means", "shows", "because", "when", "where", "also"
+)
+
+NEGATIONS = ("not", "never", "no", "doesn't", "cannot")
+
+
+def make_sentence(rng: random.Random, words: int) -> str:
+    """One sentence mixing topic and filler words"""
+    tokens = [
+        rng.choice(TOPIC_WORDS) if rng.random() < 0.55 else rng.choice(FILLER_WORDS)
+        for _ in range(max(1, words))
+    ]
+    return " ".join(tokens).capitalize() + "."
+
+
+def make_text(rng: random.Random, words: int) -> str:
+    """A text of roughly the given number of words, in sentences of 8-20 words"""
+    sentences = []
+    remaining = words
+    while remaining > 0:
+        length = min(remaining, rng.randint(8, 20))
+        sentences.append(make_sentence(rng, length))
+        remaining -= length
+    return " ".join(sentences)
+
+
+def make_rubrics(rng: random.Random, count: int) -> List[str]:
+    """Rubric concepts of 2-6 topic words"""
+    return [
+        " ".join(rng.choice(TOPIC_WORDS) for _ in range(rng.randint(2, 6))).capitalize()
+        for _ in range(count)
+    ]
+
+
+def make_question(rng: random.Random, rubric_count: int = 10, answer_words: int = 150) -> Dict:
+    """
+    A question with rubrics and a correct answer
+    
+    Returns:
+        Dict with question, rubrics, correct_answer and total_marks
+    """
+    return {
+        "question": make_sentence(rng, 10).rstrip(".") + "?",
+        "rubrics": make_rubrics(rng, rubric_count),
+        "correct_answer": make_text(rng, answer_words),
+        "total_marks": 10.0
+    }
+
+
+def make_student_answer(rng: random.Random, correct_answer: str, words: int) -> str:
+    """
+    A student answer derived from the correct answer
+    
+    Reuses and trims reference sentences, negates some of them and mixes in
+    unrelated sentences, so scores spread over the whole range.
+    """
+    reference = [s.strip() for s in correct_answer.split(".") if s.strip()]
+    sentences = []
+    total = 0
+    while total < words:
+        roll = rng.random()
+        if reference and roll < 0.6:
+            tokens = rng.choice(reference).split()
+            keep = max(1, int(len(tokens) * rng.uniform(0.5, 1.0)))
+            start = rng.randint(0, len(tokens) - keep)
+            tokens = tokens[start:start + keep]
+            if rng.random() < 0.1:
+                tokens.insert(rng.randint(0, len(tokens)), rng.choice(NEGATIONS))
+            sentence = " ".join(tokens).capitalize() + "."
+        else:
+            sentence = make_sentence(rng, rng.randint(8, 20))
+        sentences.append(sentence)
+        total += len(sentence.split())
+    return " ".join(sentences)
+
+
+def make_cohort(rng: random.Random, question: Dict, size: int, answer_words: int = 150) -> List[str]:
+    """Student answers to one question"""
+    return [make_student_answer(rng, question["correct_answer"], answer_words) for _ in range(size)]
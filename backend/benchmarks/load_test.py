@@ -0,0 +1,144 @@
+"""
+In-process end-to-end load test of the FastAPI app
+
+Requests go through the full ASGI stack (validation, pipeline, executor,
+serialization) without a network. Reports latency percentiles and
+throughput per scenario.
+
+Usage (from the backend directory):
+    python -m benchmarks.load_test [--requests N] [--concurrency C] [--output FILE]
+"""
+from typing import Dict, List
+import argparse
+import asyncio
+import logging
+import random
+import time
+
+import httpx
+
+from app.main import app
+from benchmarks.corpus import ANSWER_LENGTHS, make_cohort, make_question
+from benchmarks.results import percentile, save_results
+
+
+async def _run_scenario(
+    client: httpx.AsyncClient,
+    name: str,
+    path: str,
+    payloads: List[Dict],
+    concurrency: int
+) -> Dict:
+    """Send every payload with a fixed number of concurrent clients"""
+    latencies = []
+    errors = 0
+    queue: asyncio.Queue = asyncio.Queue()
+    for payload in payloads:
+        queue.put_nowait(payload)
+    
+    async def worker():
+        nonlocal errors
+        while True:
+            try:
+                payload = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            started = time.perf_counter()
+            response = await client.post(path, json=payload)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                errors += 1
+    
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    
+    result = {
+        "name": name,
+        "path": path,
+        "requests": len(payloads),
+        "concurrency": concurrency,
+        "errors": errors,
+        "elapsed_s": elapsed,
+        "requests_per_second": len(payloads) / elapsed if elapsed > 0 else None,
+        "p50_s": percentile(latencies, 50),
+        "p95_s": percentile(latencies, 95),
+        "p99_s": percentile(latencies, 99),
+        "max_s": max(latencies) if latencies else 0.0
+    }
+    print(
+        f"{name:<40} {result['requests_per_second']:8.1f} req/s  "
+        f"p50 {result['p50_s'] * 1000:8.2f} ms  p95 {result['p95_s'] * 1000:8.2f} ms  "
+        f"p99 {result['p99_s'] * 1000:8.2f} ms  errors {errors}"
+    )
+    return result
+
+
+async def run(requests: int = 200, concurrency: int = 8, batch_size: int = 32, seed: int = 0) -> List[Dict]:
+    """
+    Run the load test scenarios against the app
+    
+    Every request carries distinct answers, so results come from the
+    pipeline rather than the result cache.
+    
+    Args:
+        requests: Requests per scenario
+        concurrency: Concurrent clients
+        batch_size: Answers per /evaluate/batch request
+        seed: Corpus seed
+    
+    Returns:
+        One result dict per scenario
+    """
+    rng = random.Random(seed)
+    results = []
+    
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+            for label in ("paragraph", "page"):
+                words = ANSWER_LENGTHS[label]
+                question = make_question(rng, rubric_count=10, answer_words=words)
+                payloads = [
+                    dict(question, student_answer=answer)
+                    for answer in make_cohort(rng, question, requests, words)
+                ]
+                results.append(await _run_scenario(
+                    client, f"evaluate[{label}]", "/evaluate", payloads, concurrency
+                ))
+            
+            question = make_question(rng, rubric_count=10, answer_words=ANSWER_LENGTHS["paragraph"])
+            batch_requests = max(1, requests // batch_size)
+            payloads = [
+                dict(question, student_answers=make_cohort(rng, question, batch_size))
+                for _ in range(batch_requests)
+            ]
+            results.append(await _run_scenario(
+                client, f"evaluate_batch[size={batch_size}]", "/evaluate/batch", payloads, concurrency
+            ))
+    
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="In-process load test of the evaluation API")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients")
+    parser.add_argument("--batch-size", type=int, default=32, help="Answers per batch request")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus seed")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/load-<commit>.json)")
+    args = parser.parse_args()
+    
+    logging.disable(logging.INFO)
+    
+    results = asyncio.run(run(args.requests, args.concurrency, args.batch_size, args.seed))
+    path = save_results(
+        "load", results, args.output,
+        requests=args.requests, concurrency=args.concurrency,
+        batch_size=args.batch_size, seed=args.seed
+    )
+    print(f"Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Microbenchmarks of each service class
+
+Usage (from the backend directory):
+    python -m benchmarks.micro [--quick] [--filter NAME] [--output FILE]
+"""
+from typing import Dict, List
+import argparse
+import logging
+import random
+
+from app.services.nli_analyzer import NLIAnalyzer
+from app.services.rubric_matcher import RubricMatcher
+from app.services.score_aggregator import ScoreAggregator
+from app.services.semantic_analyzer import SemanticAnalyzer
+from app.utils.text_preprocessing import clean_text, tokenize
+from benchmarks.corpus import ANSWER_LENGTHS, COHORT_SIZES, RUBRIC_COUNTS, make_cohort, make_question
+from benchmarks.results import measure, save_results
+
+
+def run(quick: bool = False, seed: int = 0, name_filter: str = "") -> List[Dict]:
+    """
+    Run the microbenchmarks
+    
+    Args:
+        quick: Skip essay-length answers and the largest cohort
+        seed: Corpus seed
+        name_filter: Only run benchmarks whose name contains this
+    
+    Returns:
+        One result dict per benchmark
+    """
+    rng = random.Random(seed)
+    lengths = {k: v for k, v in ANSWER_LENGTHS.items() if not (quick and k == "essay")}
+    cohort_sizes = [size for size in COHORT_SIZES if not (quick and size > 1000)]
+    
+    rubric_matcher = RubricMatcher()
+    semantic_analyzer = SemanticAnalyzer()
+    nli_analyzer = NLIAnalyzer()
+    sentence_nli_analyzer = NLIAnalyzer(mode="sentence")
+    score_aggregator = ScoreAggregator()
+    
+    results = []
+    
+    def bench(name: str, func, items: int = 1, **params):
+        if name_filter and name_filter not in name:
+            return
+        result = {"name": name, **params, **measure(func, items=items)}
+        results.append(result)
+        print(f"{name:<60} {result['median_s'] * 1000:10.3f} ms")
+    
+    # Per-answer costs by answer length
+    for label, words in lengths.items():
+        question = make_question(rng, rubric_count=10, answer_words=words)
+        raw_answer = "  " + make_cohort(rng, question, 1, words)[0].replace(". ", " .  ") + "  "
+        answer = clean_text(raw_answer)
+        correct = question["correct_answer"]
+        student_tokens = tokenize(answer)
+        correct_tokens = tokenize(correct)
+        
+        bench(f"clean_text[{label}]", lambda: clean_text(raw_answer), words=words)
+        bench(f"tokenize[{label}]", lambda: tokenize(answer), words=words)
+        bench(
+            f"rubric_matcher.single[{label}]",
+            lambda: rubric_matcher.analyze_rubric_coverage(student_tokens, question["rubrics"], correct_tokens),
+            words=words
+        )
+        bench(
+            f"semantic_analyzer.single[{label}]",
+            lambda: semantic_analyzer.calculate_similarity(student_tokens, correct_tokens),
+            words=words
+        )
+        bench(
+            f"nli_analyzer.document[{label}]",
+            lambda: nli_analyzer.analyze_entailment(student_tokens, correct_tokens),
+            words=words
+        )
+        # Sentence features are cached on TokenizedText, so include tokenizing
+        bench(
+            f"nli_analyzer.sentence[{label}]",
+            lambda: sentence_nli_analyzer.analyze_entailment(tokenize(answer), tokenize(correct)),
+            words=words
+        )
+    
+    # Rubric matching by rubric count
+    for count in RUBRIC_COUNTS:
+        question = make_question(rng, rubric_count=count, answer_words=150)
+        answer = tokenize(make_cohort(rng, question, 1)[0])
+        correct = tokenize(question["correct_answer"])
+        bench(
+            f"rubric_matcher.single[rubrics={count}]",
+            lambda: rubric_matcher.analyze_rubric_coverage(answer, question["rubrics"], correct),
+            rubrics=count
+        )
+    
+    # Batch paths by cohort size
+    question = make_question(rng, rubric_count=10, answer_words=150)
+    correct = tokenize(question["correct_answer"])
+    for size in cohort_sizes:
+        cohort = [tokenize(answer) for answer in make_cohort(rng, question, size)]
+        bench(
+            f"rubric_matcher.batch[cohort={size}]",
+            lambda: rubric_matcher.analyze_rubric_coverage_batch(cohort, question["rubrics"], correct),
+            items=size, cohort=size
+        )
+        bench(
+            f"semantic_analyzer.batch[cohort={size}]",
+            lambda: semantic_analyzer.calculate_similarity_batch(correct, cohort),
+            items=size, cohort=size
+        )
+        bench(
+            f"semantic_analyzer.batch_cohort_idf[cohort={size}]",
+            lambda: semantic_analyzer.calculate_similarity_batch(correct, cohort, cohort_idf=True),
+            items=size, cohort=size
+        )
+        bench(
+            f"nli_analyzer.batch[cohort={size}]",
+            lambda: nli_analyzer.analyze_entailment_batch(cohort, correct),
+            items=size, cohort=size
+        )
+    
+    bench("score_aggregator.aggregate_scores", lambda: score_aggregator.aggregate_scores(0.7, 0.6, 0.9))
+    
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmarks of the evaluation services")
+    parser.add_argument("--quick", action="store_true", help="Skip essays and the 10k cohort")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus seed")
+    parser.add_argument("--filter", default="", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/micro-<commit>.json)")
+    args = parser.parse_args()
+    
+    # Analyzers log every call; keep the benchmark output readable
+    logging.basicConfig(level=logging.WARNING)
+    
+    results = run(quick=args.quick, seed=args.seed, name_filter=args.filter)
+    path = save_results("micro", results, args.output, seed=args.seed, quick=args.quick)
+    print(f"Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
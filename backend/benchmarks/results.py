@@ -0,0 +1,110 @@
+"""
+Timing statistics and JSON result files shared by the benchmark suites
+"""
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Linear-interpolated percentile (q in 0-100) of a list of values"""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(samples: List[float], items: int = 1) -> Dict:
+    """
+    Statistics of per-call durations
+    
+    Args:
+        samples: Seconds per call
+        items: Items processed per call (e.g. answers in a batch)
+    
+    Returns:
+        Dict of seconds per call and items per second
+    """
+    median = statistics.median(samples)
+    return {
+        "samples": len(samples),
+        "min_s": min(samples),
+        "median_s": median,
+        "mean_s": statistics.fmean(samples),
+        "p95_s": percentile(samples, 95),
+        "items_per_call": items,
+        "items_per_second": items / median if median > 0 else None
+    }
+
+
+def measure(func: Callable[[], object], min_time: float = 0.2, max_samples: int = 50, items: int = 1) -> Dict:
+    """
+    Time repeated calls of func after one warm-up call
+    
+    Calls are repeated until min_time seconds have passed or max_samples
+    calls were timed, whichever comes first (at least three calls).
+    """
+    func()
+    samples = []
+    deadline = time.perf_counter() + min_time
+    while len(samples) < 3 or (len(samples) < max_samples and time.perf_counter() < deadline):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return summarize(samples, items)
+
+
+def _git_commit() -> Optional[str]:
+    """Commit the benchmarks ran on, if inside a git checkout"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(__file__)
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def metadata(**extra) -> Dict:
+    """Environment the results were measured in"""
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        **extra
+    }
+
+
+def save_results(suite: str, benchmarks: List[Dict], output: Optional[str] = None, **extra) -> str:
+    """
+    Write benchmark results as JSON
+    
+    Args:
+        suite: Suite name, used in the default file name
+        benchmarks: One dict per benchmark, each with a unique "name"
+        output: File to write (default: results/<suite>-<commit>.json)
+        **extra: Additional metadata, e.g. the suite's parameters
+    
+    Returns:
+        Path of the written file
+    """
+    info = metadata(suite=suite, **extra)
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{suite}-{info['commit'] or 'local'}.json")
+    with open(output, "w") as f:
+        json.dump({"metadata": info, "benchmarks": benchmarks}, f, indent=2)
+    return output
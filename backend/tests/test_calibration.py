@@ -0,0 +1,67 @@
+"""
+Grade thresholds fitted to small or skewed sets of teacher marks
+"""
+import numpy as np
+import pytest
+
+from app.services.calibration import (
+    MIN_BAND_EXAMPLES,
+    ScoreWeightsFile,
+    calibrate,
+    check_grade_thresholds,
+    fit_grade_thresholds
+)
+from app.services.score_aggregator import DEFAULT_GRADE_THRESHOLDS, DEFAULT_SCORE_WEIGHTS
+
+
+def test_few_answers_keep_the_default_thresholds():
+    result = calibrate(
+        rubric_scores=[0.4, 0.45, 0.5],
+        semantic_scores=[0.4, 0.42, 0.38],
+        nli_scores=[0.5, 0.45, 0.4],
+        teacher_marks=[9.0, 8.5, 4.0],
+        total_marks=10.0
+    )
+    assert result["weights"]["grade_thresholds"] == list(DEFAULT_GRADE_THRESHOLDS)
+
+
+def test_skewed_marks_only_move_the_thresholds_they_reach():
+    # Every teacher mark is Excellent or Good: only the threshold between them has examples on both sides
+    rng = np.random.default_rng(0)
+    teacher = np.concatenate([rng.uniform(86, 100, 20), rng.uniform(70, 84, 20)])
+    percentages = teacher - 10
+    fitted = fit_grade_thresholds(percentages, teacher, DEFAULT_GRADE_THRESHOLDS)
+    assert fitted[0] < DEFAULT_GRADE_THRESHOLDS[0]
+    assert fitted[1:] == DEFAULT_GRADE_THRESHOLDS[1:]
+    check_grade_thresholds(fitted)
+
+
+def test_band_needs_min_examples():
+    teacher = np.array([95.0] * (MIN_BAND_EXAMPLES - 1) + [75.0] * 10)
+    percentages = teacher - 20
+    assert fit_grade_thresholds(percentages, teacher, DEFAULT_GRADE_THRESHOLDS) == DEFAULT_GRADE_THRESHOLDS
+    teacher = np.append(teacher, 95.0)
+    percentages = teacher - 20
+    assert fit_grade_thresholds(percentages, teacher, DEFAULT_GRADE_THRESHOLDS)[0] == 75.0
+
+
+def test_fit_on_every_band_is_strictly_decreasing():
+    rng = np.random.default_rng(1)
+    teacher = rng.uniform(0, 100, 500)
+    percentages = np.clip(teacher * 0.8 + rng.normal(0, 3, 500), 0, 100)
+    fitted = fit_grade_thresholds(percentages, teacher, DEFAULT_GRADE_THRESHOLDS)
+    assert fitted != DEFAULT_GRADE_THRESHOLDS
+    check_grade_thresholds(fitted)
+
+
+@pytest.mark.parametrize("thresholds", [
+    [41.71, 41.71, 41.71, 41.7],
+    [85.0, 70.0, 72.0, 40.0],
+    [85.0, 84.5, 55.0, 40.0]
+])
+def test_save_refuses_collapsed_thresholds(tmp_path, thresholds):
+    weights = ScoreWeightsFile(str(tmp_path / "score_weights.json"), DEFAULT_SCORE_WEIGHTS)
+    with pytest.raises(ValueError):
+        weights.save(dict(DEFAULT_SCORE_WEIGHTS, grade_thresholds=thresholds))
+    assert not (tmp_path / "score_weights.json").exists()
+    assert weights.aggregator(check=True).grade_thresholds == DEFAULT_GRADE_THRESHOLDS
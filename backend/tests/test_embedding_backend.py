@@ -0,0 +1,82 @@
+"""
+The embedding backend end to end, offline, with the deterministic hashing encoder
+"""
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.services.embedding_backend import EmbeddingBackend, EmbeddingCache, HashingEncoder
+from app.services.semantic_analyzer import create_semantic_analyzer
+from app.utils.text_preprocessing import clean_text
+
+REQUEST = json.loads((Path(__file__).parent.parent / "sample_request.json").read_text())
+
+
+class CountingEncoder(HashingEncoder):
+    """Hashing encoder recording every text it encodes"""
+    
+    def __init__(self):
+        super().__init__()
+        self.encoded = []
+    
+    def encode(self, texts):
+        self.encoded.extend(texts)
+        return super().encode(texts)
+
+
+@pytest.fixture
+def analyzer(tmp_path):
+    analyzer = create_semantic_analyzer(
+        backend="embedding", model_name="hashing", cache_path=str(tmp_path / "embeddings.sqlite3")
+    )
+    yield analyzer
+    analyzer.close()
+
+
+def test_hashing_embedding_scores(analyzer):
+    correct_answer = clean_text(REQUEST["correct_answer"])
+    student_answer = clean_text(REQUEST["student_answer"])
+    unrelated = "The recipe needs two cups of flour, three eggs and a pinch of salt."
+    
+    assert analyzer.version == "embedding-1:hashing-256"
+    assert analyzer.calculate_similarity(correct_answer, correct_answer) == pytest.approx(1.0)
+    related_score = analyzer.calculate_similarity(student_answer, correct_answer)
+    assert 0.0 <= analyzer.calculate_similarity(unrelated, correct_answer) < related_score < 1.0
+    
+    # Deterministic across instances, and batches score like single answers
+    other = create_semantic_analyzer(backend="embedding", model_name="hashing")
+    assert other.calculate_similarity(student_answer, correct_answer) == pytest.approx(related_score, abs=1e-6)
+    batch = analyzer.calculate_similarity_batch(correct_answer, [student_answer, unrelated, correct_answer])
+    assert list(batch) == pytest.approx([
+        related_score,
+        analyzer.calculate_similarity(unrelated, correct_answer),
+        analyzer.calculate_similarity(correct_answer, correct_answer)
+    ], abs=1e-6)
+
+
+def test_embedding_cache_reuses_repeated_texts(tmp_path):
+    path = str(tmp_path / "embeddings.sqlite3")
+    texts = [REQUEST["student_answer"], REQUEST["correct_answer"], REQUEST["student_answer"]]
+    
+    encoder = CountingEncoder()
+    backend = EmbeddingBackend(encoder, cache=EmbeddingCache(path))
+    first = backend.embed(texts)
+    # A text repeated within a call is encoded once
+    assert encoder.encoded == texts[:2]
+    np.testing.assert_array_equal(first[0], first[2])
+    
+    # Repeated in a later call, it comes from the cache
+    second = backend.embed([REQUEST["student_answer"]])
+    assert encoder.encoded == texts[:2]
+    np.testing.assert_array_equal(second[0], first[0])
+    backend.close()
+    
+    # ...also after a restart, from the database file
+    restarted_encoder = CountingEncoder()
+    restarted = EmbeddingBackend(restarted_encoder, cache=EmbeddingCache(path))
+    np.testing.assert_array_equal(restarted.embed([REQUEST["correct_answer"]])[0], first[1])
+    assert restarted_encoder.encoded == []
+    assert len(restarted.cache) == 2
+    restarted.close()
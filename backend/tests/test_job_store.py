@@ -0,0 +1,70 @@
+"""
+Requeueing answers of dead job workers, up to the claim attempt cap
+"""
+import threading
+
+import pytest
+
+from app.services.job_queue import JobQueue, JobStore
+
+DEAD_WORKER = 999999999
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    yield store
+    store.close()
+
+
+def add_job(store, answers=3):
+    return store.add_job(
+        question="What is photosynthesis?",
+        rubrics=["light energy"],
+        correct_answer="Photosynthesis converts light energy into chemical energy",
+        total_marks=5.0,
+        cohort_idf=False,
+        answers=[(f"answer {position}", None) for position in range(answers)],
+        max_queued=100
+    )
+
+
+def test_requeue_only_dead_workers(store):
+    job_id = add_job(store, answers=4)
+    store.claim(DEAD_WORKER, 2)
+    live = store.claim(DEAD_WORKER - 1, 2)
+    assert store.requeue([DEAD_WORKER]) == 2
+    assert store.claiming_workers() == [DEAD_WORKER - 1]
+    store.finish(DEAD_WORKER - 1, live, results=["{}", "{}"])
+    assert store.get_job(job_id)["completed"] == 2
+
+
+def test_job_fails_after_max_attempts(store):
+    job_id = add_job(store, answers=3)
+    for _ in range(2):
+        assert store.claim(DEAD_WORKER, 2).positions == [0, 1]
+        assert store.requeue([DEAD_WORKER], max_attempts=3) == 2
+    chunk = store.claim(DEAD_WORKER, 2)
+    assert store.requeue([DEAD_WORKER], max_attempts=3) == 0
+    
+    job = store.get_job(job_id)
+    assert job["status"] == "failed"
+    assert job["failed"] == 3
+    assert store.claim(DEAD_WORKER, 2) is None
+    errors = [error for _, _, error in store.get_results(job_id)]
+    assert len(errors) == 3 and all(error.startswith("Job failed") for error in errors)
+    # A late result of the failed chunk neither counts nor completes the job
+    store.finish(DEAD_WORKER, chunk, results=["{}", "{}"])
+    assert store.get_job(job_id)["status"] == "failed"
+
+
+def test_supervisor_checks_workers_periodically(tmp_path, monkeypatch):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"), workers=1, supervise_interval=0.01)
+    checked = threading.Event()
+    monkeypatch.setattr(queue, "supervise", checked.set)
+    try:
+        queue.start()
+        checked.clear()
+        assert checked.wait(5)
+    finally:
+        queue.shutdown()
@@ -0,0 +1,105 @@
+"""
+Callers of a micro-batch are resolved however the batch ends
+"""
+import asyncio
+
+import pytest
+
+from app.services.analysis_executor import AnalysisExecutor
+from app.services.metrics import metrics, request_timings
+from app.services.micro_batcher import MicroBatcher
+
+
+async def double(items):
+    await asyncio.sleep(0)
+    return [item * 2 for item in items]
+
+
+async def fail(items):
+    raise ValueError("broken batch")
+
+
+async def never(items):
+    await asyncio.Event().wait()
+
+
+def busy_batcher(max_batch_size):
+    """Micro-batcher that has seen requests arrive close together, so its window is open"""
+    batcher = MicroBatcher(max_batch_size=max_batch_size, max_window=0.05)
+    batcher._arrival_gap = 0.0
+    return batcher
+
+
+def test_concurrent_items_share_a_batch():
+    batcher = busy_batcher(8)
+    batches = []
+    
+    async def evaluate(items):
+        batches.append(list(items))
+        return await double(items)
+    
+    async def main():
+        return await asyncio.gather(*(batcher.submit("question", item, evaluate) for item in range(3)))
+    
+    assert asyncio.run(main()) == [0, 2, 4]
+    assert batches == [[0, 1, 2]]
+
+
+def test_batch_error_reaches_every_caller():
+    batcher = busy_batcher(2)
+    
+    async def main():
+        return await asyncio.gather(
+            *(batcher.submit("question", item, fail) for item in range(2)),
+            return_exceptions=True
+        )
+    
+    assert all(isinstance(result, ValueError) for result in asyncio.run(main()))
+
+
+def test_cancelled_batch_cancels_its_callers():
+    batcher = busy_batcher(2)
+    
+    async def main():
+        callers = [asyncio.ensure_future(batcher.submit("question", item, never)) for item in range(2)]
+        await asyncio.sleep(0.01)
+        assert len(batcher._tasks) == 1
+        for task in list(batcher._tasks):
+            task.cancel()
+        done, pending = await asyncio.wait(callers, timeout=1)
+        assert not pending
+        for caller in done:
+            with pytest.raises(asyncio.CancelledError):
+                caller.result()
+    
+    asyncio.run(main())
+
+
+def test_batch_timings_reach_every_caller():
+    batcher = busy_batcher(3)
+    executor = AnalysisExecutor({}, max_workers=2)
+    
+    def rubric(items):
+        # Timed on a pool thread
+        with metrics.stage("rubric"):
+            return list(items)
+    
+    async def evaluate(items):
+        with metrics.stage("tokenize"):
+            await asyncio.sleep(0)
+        return await executor.run(rubric, items)
+    
+    async def request(item):
+        timings = {}
+        request_timings.set(timings)
+        assert await batcher.submit("question", item, evaluate) == item
+        return timings
+    
+    async def main():
+        return await asyncio.gather(*(request(item) for item in range(3)))
+    
+    try:
+        for timings in asyncio.run(main()):
+            assert set(timings) == {"tokenize", "rubric"}
+    finally:
+        executor.shutdown()
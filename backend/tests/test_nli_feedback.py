@@ -0,0 +1,32 @@
+"""
+Feedback quoting the sentences that sentence-mode NLI found contradicting
+"""
+from app.services.nli_analyzer import NLIAnalyzer
+
+REFERENCE = "Plants absorb light energy. They make glucose from carbon dioxide and water."
+
+
+def test_sentence_mode_quotes_contradicting_sentences():
+    analyzer = NLIAnalyzer(mode="sentence")
+    analysis = analyzer.analyze_entailment(
+        "Plants do not absorb light energy. They make glucose from carbon dioxide.",
+        REFERENCE
+    )
+    assert [pair["student_sentence"] for pair in analysis["contradicting_sentences"]] == [
+        "Plants do not absorb light energy"
+    ]
+    feedback = analyzer.get_entailment_feedback(analysis)
+    assert '"Plants do not absorb light energy" contradicts "Plants absorb light energy"' in feedback
+
+
+def test_consistent_answer_quotes_nothing():
+    analyzer = NLIAnalyzer(mode="sentence")
+    analysis = analyzer.analyze_entailment("Plants absorb light energy.", REFERENCE)
+    assert analysis["contradicting_sentences"] == []
+    assert "Contradicting sentences" not in analyzer.get_entailment_feedback(analysis)
+
+
+def test_document_mode_feedback_unchanged():
+    analyzer = NLIAnalyzer()
+    analysis = analyzer.analyze_entailment("Plants do not absorb light energy.", REFERENCE)
+    assert "Contradicting sentences" not in analyzer.get_entailment_feedback(analysis)
@@ -0,0 +1,53 @@
+"""
+NDJSON stream results sent while the request body is still being uploaded
+"""
+import asyncio
+
+from starlette.requests import Request
+
+from app.main import DuplexStreamingResponse, RequestBodyReader
+from app.utils.ndjson import iter_ndjson
+
+SCOPE = {"type": "http", "asgi": {"version": "3.0", "spec_version": "2.3"}, "method": "POST", "headers": []}
+
+
+async def echo(scope, receive, send):
+    """Echo the "n" of every NDJSON line back as soon as it is parsed"""
+    reader = RequestBodyReader(Request(scope, receive))
+    
+    async def lines():
+        async for value, error in iter_ndjson(reader.read):
+            yield f"{value['n']}\n" if not error else "error\n"
+    
+    await DuplexStreamingResponse(lines(), body_read=reader.body_read)(scope, receive, send)
+
+
+async def upload(last_message):
+    inbox = asyncio.Queue()
+    sent = []
+    echoed = asyncio.Event()
+    
+    async def send(message):
+        if message.get("body"):
+            sent.append(message["body"])
+            echoed.set()
+    
+    await inbox.put({"type": "http.request", "body": b'{"n": 1}\n{"n"', "more_body": True})
+    task = asyncio.create_task(echo(SCOPE, inbox.get, send))
+    await asyncio.wait_for(echoed.wait(), 5)
+    first = list(sent)
+    await inbox.put(last_message)
+    await asyncio.wait_for(task, 5)
+    return first, b"".join(sent)
+
+
+def test_results_flow_before_the_body_ends():
+    first, body = asyncio.run(upload({"type": "http.request", "body": b': 2}\n{"n": 3}', "more_body": False}))
+    assert first == [b"1\n"]
+    assert body == b"1\n2\n3\n"
+
+
+def test_disconnect_during_upload_ends_the_input():
+    first, body = asyncio.run(upload({"type": "http.disconnect"}))
+    # The line cut off by the disconnect is reported as malformed
+    assert body == b"1\nerror\n"
@@ -0,0 +1,104 @@
+"""
+Rubric phrase matching with the word-level Aho-Corasick automaton
+"""
+import pytest
+
+from app.services.rubric_matcher import RubricMatcher
+from app.utils.aho_corasick import PhraseAutomaton
+from app.utils.text_preprocessing import tokenize
+
+
+def automaton(*phrases):
+    return PhraseAutomaton((tuple(phrase.split()), phrase) for phrase in phrases)
+
+
+def find(phrase_automaton, text):
+    return phrase_automaton.find(text.split())
+
+
+def test_overlapping_phrases_are_all_found():
+    phrases = automaton("machine learning", "learning algorithm", "algorithm")
+    assert find(phrases, "a machine learning algorithm") == {"machine learning", "learning algorithm", "algorithm"}
+    assert find(phrases, "learning machine") == set()
+
+
+def test_phrase_that_is_a_suffix_of_another():
+    phrases = automaton("deep neural network", "neural network", "network")
+    assert find(phrases, "a deep neural network") == {"deep neural network", "neural network", "network"}
+    # Reached through the failure link of the longer phrase's partial match
+    assert find(phrases, "deep deep neural network") == {"deep neural network", "neural network", "network"}
+    assert find(phrases, "deep neural nets") == set()
+    assert find(phrases, "shallow neural network") == {"neural network", "network"}
+
+
+def test_matches_span_whole_tokens_only():
+    phrases = automaton("learn", "machine learning")
+    assert find(phrases, "learning machines") == set()
+    assert find(phrases, "machinelearning") == set()
+    assert find(phrases, "machine deep learning") == set()
+    assert find(phrases, "we learn machine learning") == {"learn", "machine learning"}
+    # A partial match broken by a token outside every phrase restarts at the root
+    assert find(phrases, "machine x learning learn") == {"learn"}
+
+
+def test_single_token_phrases_ignore_repeats_and_order():
+    phrases = automaton("light", "energy")
+    assert find(phrases, "energy energy light energy") == {"light", "energy"}
+
+
+def test_empty_phrase_list():
+    phrases = PhraseAutomaton([])
+    assert len(phrases) == 1
+    assert find(phrases, "anything at all") == set()
+    assert find(phrases, "") == set()
+
+
+def test_empty_phrases_are_ignored():
+    phrases = PhraseAutomaton([((), "empty"), (("light",), "light")])
+    assert find(phrases, "") == set()
+    assert find(phrases, "light") == {"light"}
+
+
+def coverage(matcher, rubrics, answer):
+    return matcher.compile_rubrics(rubrics).coverage(tokenize(answer))
+
+
+@pytest.mark.parametrize("answer, expected", [
+    ("machine learning models", 1.0),
+    ("models of machine learning", 1.0),
+    ("nothing relevant", 0.0)
+])
+def test_default_credit_scores_keywords_as_a_bag_of_words(answer, expected):
+    assert coverage(RubricMatcher(), ["machine learning models"], answer) == [pytest.approx(expected)]
+
+
+def test_phrase_words_apart_earn_loose_credit():
+    matcher = RubricMatcher(loose_phrase_credit=0.5)
+    rubrics = ["machine learning models", "light energy"]
+    assert coverage(matcher, rubrics, "machine learning models use light energy") == [1.0, 1.0]
+    assert coverage(matcher, rubrics, "learning machine models") == [pytest.approx(0.5), 0.0]
+    assert coverage(matcher, rubrics, "energy from light") == [0.0, pytest.approx(0.5)]
+
+
+def test_synonym_stands_in_for_its_part_of_the_phrase():
+    matcher = RubricMatcher(loose_phrase_credit=0.5, synonyms=[(("machine", "learning"), ("ml",))])
+    rubrics = ["machine learning models"]
+    assert coverage(matcher, rubrics, "machine learning models") == [1.0]
+    assert coverage(matcher, rubrics, "ml models") == [pytest.approx(2.5 / 3)]
+    assert coverage(matcher, rubrics, "models") == [pytest.approx(0.5 / 3)]
+
+
+def test_stemming_matches_variants():
+    rubrics = ["machine learning models"]
+    assert coverage(RubricMatcher(), rubrics, "machine learns models") == [pytest.approx(2 / 3)]
+    assert coverage(RubricMatcher(stemming=True), rubrics, "machine learns models") == [1.0]
+
+
+def test_rubric_without_keywords_is_covered():
+    assert coverage(RubricMatcher(), ["the", "light"], "nothing") == [1.0, 0.0]
+
+
+def test_version_only_changes_with_non_default_options():
+    assert RubricMatcher().version == RubricMatcher.version
+    assert RubricMatcher(loose_phrase_credit=0.5).version == f"{RubricMatcher.version}:loose=0.5"
+    assert RubricMatcher(stemming=True).version == f"{RubricMatcher.version}:stem"
@@ -0,0 +1,20 @@
+"""
+Aggregation over the components left when some are skipped under load
+"""
+import pytest
+
+from app.services.score_aggregator import ScoreAggregator
+
+
+def test_without_reuses_one_aggregator_per_skipped_set():
+    aggregator = ScoreAggregator()
+    assert aggregator.without(()) is aggregator
+    reduced = aggregator.without(["semantic"])
+    assert aggregator.without(("semantic",)) is reduced
+    assert aggregator.without(["semantic", "nli"]) is aggregator.without(["nli", "semantic"])
+    assert reduced.aggregate_scores(0.5, 1.0, 0.5) == pytest.approx(0.5)
+
+
+def test_without_refuses_skipping_every_weighted_component():
+    with pytest.raises(ValueError):
+        ScoreAggregator(rubric_weight=0.0, semantic_weight=1.0, nli_weight=0.0).without(["semantic"])
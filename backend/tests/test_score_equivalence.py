@@ -0,0 +1,110 @@
+"""
+Scores must not drift when the text processing behind them is optimized
+
+data/baseline_scores.json holds semantic, NLI and rubric results recorded
+with the original analyzers, which scanned every text with their own
+regexes. The current analyzers (shared TokenizedText, vectorized batches,
+chunked tokenization of long answers, phrase matching at the default loose
+phrase credit of 1) must reproduce them.
+"""
+import json
+import random
+import re
+from pathlib import Path
+
+import pytest
+
+import app.utils.text_preprocessing as text_preprocessing
+from app.services.nli_analyzer import NLIAnalyzer
+from app.services.rubric_matcher import RubricMatcher
+from app.services.semantic_analyzer import SemanticAnalyzer
+from app.utils.text_preprocessing import clean_text, tokenize
+
+BASELINE = json.loads((Path(__file__).parent / "data" / "baseline_scores.json").read_text())
+CASES = BASELINE["cases"]
+RUBRIC_SETS = BASELINE["rubric_sets"]
+
+
+@pytest.fixture(scope="module")
+def analyzers():
+    return RubricMatcher(), SemanticAnalyzer(), NLIAnalyzer()
+
+
+@pytest.fixture(scope="module")
+def correct_answer():
+    return clean_text(BASELINE["correct_answer"])
+
+
+def assert_nli_equal(result, expected):
+    assert result["label"] == expected["label"]
+    for key in ("score", "support_score", "contradict_score"):
+        assert result[key] == pytest.approx(expected[key], abs=1e-12)
+
+
+def assert_rubric_equal(result, expected):
+    assert result["score"] == pytest.approx(expected["score"], abs=1e-12)
+    for key in ("covered_concepts", "partial_concepts", "missing_concepts", "total_rubrics"):
+        assert result[key] == expected[key]
+
+
+@pytest.mark.parametrize("case", CASES, ids=[f"answer{i}" for i in range(len(CASES))])
+def test_single_answer_matches_baseline(analyzers, correct_answer, case):
+    rubric_matcher, semantic_analyzer, nli_analyzer = analyzers
+    answer = clean_text(case["student_answer"])
+    
+    assert semantic_analyzer.calculate_similarity(answer, correct_answer) == pytest.approx(
+        case["semantic_score"], abs=1e-12
+    )
+    assert_nli_equal(nli_analyzer.analyze_entailment(answer, correct_answer), case["nli"])
+    for rubrics, expected in zip(RUBRIC_SETS, case["rubrics"]):
+        assert_rubric_equal(rubric_matcher.analyze_rubric_coverage(answer, rubrics, correct_answer), expected)
+
+
+def test_batch_matches_baseline(analyzers, correct_answer):
+    rubric_matcher, semantic_analyzer, nli_analyzer = analyzers
+    answers = [tokenize(clean_text(case["student_answer"])) for case in CASES]
+    reference = tokenize(correct_answer)
+    
+    semantic_scores = semantic_analyzer.calculate_similarity_batch(reference, answers)
+    assert list(semantic_scores) == pytest.approx([case["semantic_score"] for case in CASES], abs=1e-12)
+    for result, case in zip(nli_analyzer.analyze_entailment_batch(answers, reference), CASES):
+        assert_nli_equal(result, case["nli"])
+    for i, rubrics in enumerate(RUBRIC_SETS):
+        compiled = rubric_matcher.compile_rubrics(rubrics)
+        results = rubric_matcher.analyze_rubric_coverage_batch(answers, compiled, reference)
+        for result, case in zip(results, CASES):
+            assert_rubric_equal(result, case["rubrics"][i])
+
+
+def test_chunked_tokenize_matches_whole(monkeypatch):
+    long_answers = [clean_text(case["student_answer"]) for case in CASES]
+    long_answers = [answer for answer in long_answers if len(answer) > text_preprocessing.TOKENIZE_CHUNK_CHARS]
+    assert long_answers, "the baseline should hold answers long enough to be tokenized in chunks"
+    rng = random.Random(5)
+    pieces = ["word", "don't", "Never", "İstanbul", "...", ".", "!", "?", " ", "  ", "\n", "can't", "x", "ab.cd", "no"]
+    texts = long_answers + ["".join(rng.choices(pieces, k=rng.randint(0, 200))) for _ in range(500)]
+    
+    chunked = [tokenize(text) for text in long_answers]
+    for chunk_chars in (7, 50, 1000):
+        monkeypatch.setattr(text_preprocessing, "TOKENIZE_CHUNK_CHARS", chunk_chars)
+        chunked.extend(tokenize(text) for text in texts)
+    monkeypatch.setattr(text_preprocessing, "TOKENIZE_CHUNK_CHARS", 10 ** 9)
+    whole = [tokenize(text) for text in long_answers] + [tokenize(text) for text in texts] * 3
+    
+    assert chunked == whole
+
+
+def _regex_clean_text(text):
+    """clean_text as originally written, with three regex passes"""
+    text = re.sub(r'\s+', ' ', text)
+    text = text.strip()
+    return re.sub(r'\s+([.,!?;:])', r'\1', text)
+
+
+def test_clean_text_matches_regex_implementation():
+    rng = random.Random(3)
+    alphabet = list("ab .,!?;:\t\n\r\x0b\x0c 　\x1c\x1d\x85'")
+    texts = ["".join(rng.choices(alphabet, k=rng.randint(0, 20))) for _ in range(20000)]
+    texts.extend(case["student_answer"] for case in CASES)
+    for text in texts:
+        assert clean_text(text) == _regex_clean_text(text), repr(text)
@@ -3,7 +3,10 @@ import './ResultsDisplay.css';
 const ResultsDisplay = ({ results }) => {
   if (!results) return null;
 
-  const { scores, suggested_grade, total_marks, percentage, feedback, rubric_analysis } = results;
+  const { scores, suggested_grade, total_marks, percentage, feedback, rubric_analysis, skipped_components } = results;
+
+  // Analyses the server skipped under load; their score is 0 and carries no weight
+  const isSkipped = (component) => (skipped_components || []).includes(component);
 
   const getGradeColor = (percentage) => {
     if (percentage >= 85) return '#4ade80';
@@ -57,7 +60,7 @@ const ResultsDisplay = ({ results }) => {
         <div className="score-item">
           <div className="score-header">
             <span className="score-name">🎯 Semantic Similarity</span>
-            <span className="score-value">{(scores.semantic_score * 100).toFixed(1)}%</span>
+            <span className="score-value">{isSkipped('semantic') ? 'Skipped' : `${(scores.semantic_score * 100).toFixed(1)}%`}</span>
           </div>
           <div className="progress-bar">
             <div 
@@ -65,13 +68,15 @@ const ResultsDisplay = ({ results }) => {
               style={{ width: `${scores.semantic_score * 100}%` }}
             ></div>
           </div>
-          <div className="score-label-text">{getScoreLabel(scores.semantic_score)}</div>
+          <div className="score-label-text">
+            {isSkipped('semantic') ? 'Not assessed (server busy)' : getScoreLabel(scores.semantic_score)}
+          </div>
         </div>
 
         <div className="score-item">
           <div className="score-header">
             <span className="score-name">✓ Consistency Check</span>
-            <span className="score-value">{(scores.nli_score * 100).toFixed(1)}%</span>
+            <span className="score-value">{isSkipped('nli') ? 'Skipped' : `${(scores.nli_score * 100).toFixed(1)}%`}</span>
           </div>
           <div className="progress-bar">
             <div 
@@ -79,7 +84,9 @@ const ResultsDisplay = ({ results }) => {
               style={{ width: `${scores.nli_score * 100}%` }}
             ></div>
           </div>
-          <div className="score-label-text">{getScoreLabel(scores.nli_score)}</div>
+          <div className="score-label-text">
+            {isSkipped('nli') ? 'Not assessed (server busy)' : getScoreLabel(scores.nli_score)}
+          </div>
         </div>
 
         <div className="score-item final">
@@ -30,7 +30,12 @@ source venv/bin/activate
 pip install -q -r requirements.txt
 
 echo "Starting FastAPI server..."
-uvicorn app.main:app --reload &
+if [ "$1" = "--production" ]; then
+    # Preloaded models shared by forked workers (SERVER_WORKERS in .env)
+    python -m app.server &
+else
+    uvicorn app.main:app --reload &
+fi
 BACKEND_PID=$!
 
 cd ..